@@ -0,0 +1,153 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Dispatch cost of a bot with many command handlers.
+
+"regex" matches every command of every handler with a regular expression built on each message, as
+filters.command did before; "indexed" looks the first word of the message up in each filter's command set;
+"routed" also lets the dispatcher look it up once and skip the handlers of other commands.
+
+Usage: python -m benchmarks.commands
+"""
+
+import asyncio
+import re
+import time
+from io import BytesIO
+
+from pyrogram import Client, filters, raw, types
+from pyrogram.dispatcher import CommandRouter, Dispatcher
+from pyrogram.handlers import MessageHandler
+from pyrogram.raw.core import TLObject
+
+COMMANDS = 300
+UPDATES = 2000
+USER_ID = 777000
+
+
+def regex_command(commands: list, prefixes: str = "/") -> filters.Filter:
+    command_re = re.compile(pattern=r"([\"'])(.*?)(?<!\\)\1|(\S+)")
+
+    async def func(flt, client, message) -> bool:
+        username = (client.me and client.me.username) or ""
+        text = message.text or message.caption
+        message.command = None
+
+        if not text:
+            return False
+
+        for prefix in flt.prefixes:
+            if not text.startswith(prefix):
+                continue
+
+            without_prefix = text[len(prefix):]
+
+            for cmd in flt.commands:
+                if not re.match(rf"^(?:{cmd}(?:@?{username})?)(?:\s|$)", without_prefix, flags=re.IGNORECASE):
+                    continue
+
+                without_command = re.sub(rf"{cmd}(?:@?{username})?\s?", "", without_prefix, count=1, flags=re.IGNORECASE)
+                message.command = [cmd] + [
+                    re.sub(r"\\([\"'])", r"\1", m.group(2) or m.group(3) or "")
+                    for m in command_re.finditer(without_command)
+                ]
+
+                return True
+
+        return False
+
+    def raw_func(flt, _, update, __, ___) -> bool:
+        text = getattr(filters.get_raw_message(update), "message", None)
+
+        return bool(text) and any(text.startswith(prefix) for prefix in flt.prefixes)
+
+    return filters.create(func, "CommandFilter", check_raw=raw_func, commands=set(commands), prefixes={prefixes})
+
+
+class UnroutedDispatcher(Dispatcher):
+    def get_handlers(self, handler_type) -> tuple:
+        groups, needs_parsing, _ = super().get_handlers(handler_type)
+
+        return groups, needs_parsing, CommandRouter([])
+
+
+def read(obj: TLObject) -> TLObject:
+    # Go through the wire format, like real updates do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(obj.write()))
+
+
+def make_update(text: str, message_id: int) -> tuple:
+    update = raw.types.UpdateNewMessage(
+        message=raw.types.Message(
+            id=message_id,
+            peer_id=raw.types.PeerUser(user_id=USER_ID),
+            from_id=raw.types.PeerUser(user_id=USER_ID),
+            date=0,
+            message=text,
+            entities=[]
+        ),
+        pts=0,
+        pts_count=0
+    )
+    user = raw.types.User(id=USER_ID, access_hash=0, first_name="User")
+
+    return read(update), {USER_ID: read(user)}, {}
+
+
+async def measure(command_filter, dispatcher_class) -> float:
+    handled = []
+
+    async def callback(client, message):
+        handled.append(message.command)
+
+    client = Client("benchmark", in_memory=True)
+    client.me = types.User(id=1, is_self=True, is_bot=True, username="benchmark_bot")
+    client.dispatcher = dispatcher_class(client)
+    await client.storage.open()
+
+    for i in range(COMMANDS):
+        client.dispatcher.add_handler(MessageHandler(callback, command_filter([f"cmd{i}"]) & filters.private), 0)
+
+    packets = [make_update(f"/cmd{i * 7 % COMMANDS}@benchmark_bot some args", i) for i in range(UPDATES)]
+
+    start = time.perf_counter()
+
+    for packet in packets:
+        await client.dispatcher.handle_update(packet)
+
+    elapsed = time.perf_counter() - start
+
+    await client.storage.close()
+
+    assert len(handled) == UPDATES and handled[1] == ["cmd7", "some", "args"], handled[:2]
+
+    return elapsed / UPDATES
+
+
+async def main():
+    print(f"{UPDATES} commands, {COMMANDS} command handlers")
+
+    for name, command_filter, dispatcher_class in (
+        ("regex", regex_command, UnroutedDispatcher),
+        ("indexed", filters.command, UnroutedDispatcher),
+        ("routed", filters.command, Dispatcher),
+    ):
+        print(f"{name:>8}: {await measure(command_filter, dispatcher_class) * 1e6:8.1f} us/update")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Cost of mtproto.pack/unpack run inline versus through the crypto executor, per packet size.
+
+Usage: python -m benchmarks.crypto_inline
+"""
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1, sha256
+
+from pyrogram import raw
+from pyrogram.crypto import aes, mtproto
+from pyrogram.raw.core import Long, Message
+
+SIZES = (128, 512, 2048, 16 * 1024, 512 * 1024)
+BYTES_PER_SIZE = 64 * 1024 * 1024
+
+AUTH_KEY = os.urandom(256)
+AUTH_KEY_ID = sha1(AUTH_KEY).digest()[-8:]
+SESSION_ID = os.urandom(8)
+
+
+def server_pack(message: Message) -> bytes:
+    data = Long(0) + SESSION_ID + message.write()
+    padding = os.urandom(-(len(data) + 12) % 16 + 12)
+    msg_key = sha256(AUTH_KEY[96: 96 + 32] + data + padding).digest()[8:24]
+    aes_key, aes_iv = mtproto.kdf(AUTH_KEY, msg_key, False)
+
+    return AUTH_KEY_ID + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+
+
+def unpack(packet: bytes) -> Message:
+    return mtproto.unpack(packet, SESSION_ID, AUTH_KEY, AUTH_KEY_ID)
+
+
+async def measure(func, executor, rounds: int) -> float:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+
+    for _ in range(rounds):
+        if executor is None:
+            func()
+        else:
+            await loop.run_in_executor(executor, func)
+
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+async def main():
+    executor = ThreadPoolExecutor(1)
+
+    print(f"{'size':>8}  {'pack inline':>12}  {'pack pool':>10}  {'unpack inline':>14}  {'unpack pool':>12}  (us/op)")
+
+    for size in SIZES:
+        rounds = min(5000, BYTES_PER_SIZE // size)
+
+        body = raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=os.urandom(size))
+        pack = functools.partial(mtproto.pack, Message(body, 1, 1, len(body)), 0, SESSION_ID, AUTH_KEY, AUTH_KEY_ID)
+        packet = server_pack(Message(body, 2 ** 32 + 1, 1, len(body)))
+
+        print(
+            f"{size:>8}  "
+            f"{await measure(pack, None, rounds):>12.1f}  "
+            f"{await measure(pack, executor, rounds):>10.1f}  "
+            f"{await measure(functools.partial(unpack, packet), None, rounds):>14.1f}  "
+            f"{await measure(functools.partial(unpack, packet), executor, rounds):>12.1f}"
+        )
+
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
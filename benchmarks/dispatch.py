@@ -0,0 +1,139 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Dispatcher overhead per update with 1, 50 and 500 registered handlers.
+
+"linear" is the previous lookup, which walked every handler of every group for each update and always parsed it;
+"indexed" is the current one, which goes through the handlers registered for the update type only and skips parsing
+when none of them needs the parsed object. Handlers do nothing, so the numbers are the dispatch cost alone.
+
+Usage: python -m benchmarks.dispatch
+"""
+
+import asyncio
+import inspect
+import itertools
+import time
+
+import pyrogram
+from pyrogram import Client, raw
+from pyrogram.dispatcher import Dispatcher, log
+from pyrogram.handlers import (
+    CallbackQueryHandler, ChosenInlineResultHandler, InlineQueryHandler, MessageHandler,
+    PollHandler, RawUpdateHandler, UserStatusHandler
+)
+
+HANDLERS = (1, 50, 500)
+UPDATES = 2000
+
+OTHER_HANDLERS = (MessageHandler, CallbackQueryHandler, InlineQueryHandler, ChosenInlineResultHandler, PollHandler)
+
+UPDATE = raw.types.UpdateUserStatus(user_id=1, status=raw.types.UserStatusOnline(expires=0))
+
+
+class LinearDispatcher(Dispatcher):
+    async def handle_update(self, packet):
+        try:
+            update, users, chats = packet
+            parser = self.update_parsers.get(type(update), None)
+
+            parsed_update, handler_type = (
+                await parser(update, users, chats)
+                if parser is not None
+                else (None, type(None))
+            )
+
+            for group in self.groups.values():
+                for handler in group:
+                    args = None
+
+                    if isinstance(handler, handler_type):
+                        try:
+                            if await handler.check(self.client, parsed_update):
+                                args = (parsed_update,)
+                        except Exception as e:
+                            log.exception(e)
+                            continue
+
+                    elif isinstance(handler, RawUpdateHandler):
+                        args = (update, users, chats)
+
+                    if args is None:
+                        continue
+
+                    try:
+                        if inspect.iscoroutinefunction(handler.callback):
+                            await handler.callback(self.client, *args)
+                        else:
+                            await self.loop.run_in_executor(
+                                self.client.executor,
+                                handler.callback,
+                                self.client,
+                                *args
+                            )
+                    except pyrogram.StopPropagation:
+                        raise
+                    except pyrogram.ContinuePropagation:
+                        continue
+                    except Exception as e:
+                        log.exception(e)
+
+                    break
+        except pyrogram.StopPropagation:
+            pass
+        except Exception as e:
+            log.exception(e)
+
+
+async def callback(client, *args):
+    pass
+
+
+async def measure(dispatcher_class, count: int, handled: bool) -> float:
+    client = Client("benchmark", in_memory=True)
+    dispatcher = dispatcher_class(client)
+
+    # Every handler in its own group, the one receiving the updates (if any) is the last one
+    handler_types = itertools.cycle(OTHER_HANDLERS)
+
+    for group in range(count - 1):
+        dispatcher.add_handler(next(handler_types)(callback), group)
+
+    dispatcher.add_handler((UserStatusHandler if handled else next(handler_types))(callback), count)
+
+    packet = (UPDATE, {}, {})
+    start = time.perf_counter()
+
+    for _ in range(UPDATES):
+        await dispatcher.handle_update(packet)
+
+    return (time.perf_counter() - start) / UPDATES
+
+
+async def main():
+    for handled in (True, False):
+        print("handled updates" if handled else "updates without a handler")
+
+        for count in HANDLERS:
+            linear = await measure(LinearDispatcher, count, handled)
+            indexed = await measure(Dispatcher, count, handled)
+
+            print(f"  {count:>4} handlers: linear {linear * 1e6:8.1f} us, indexed {indexed * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Media download throughput of a single session fetching 1 MiB upload.GetFile chunks from a local fake DC.
+
+Usage: python -m benchmarks.download
+"""
+
+import asyncio
+import os
+import time
+
+from pyrogram import raw
+from pyrogram.session import Session
+from .fake_server import AUTH_KEY, FakeServer, start_session
+
+CHUNK_SIZE = 1024 * 1024
+CHUNKS = 128
+
+CHUNK = os.urandom(CHUNK_SIZE)
+
+
+def get_file(query):
+    return raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=CHUNK)
+
+
+async def main():
+    server = FakeServer(handler=get_file)
+    await server.start()
+
+    session = Session(None, 2, AUTH_KEY, False, is_media=True)
+    await start_session(session, server.port)
+
+    location = raw.types.InputDocumentFileLocation(id=0, access_hash=0, file_reference=b"", thumb_size="")
+
+    start = time.perf_counter()
+
+    for i in range(CHUNKS):
+        await session.send(
+            raw.functions.upload.GetFile(location=location, offset=i * CHUNK_SIZE, limit=CHUNK_SIZE)
+        )
+
+    elapsed = time.perf_counter() - start
+
+    await session.stop()
+    await server.stop()
+
+    print(f"{CHUNKS} MiB in {elapsed:.2f}s: {CHUNKS / elapsed:.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
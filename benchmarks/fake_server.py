@@ -0,0 +1,205 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""A minimal in-process MTProto server used by the benchmarks.
+
+It speaks the abridged TCP transport, decrypts incoming packets with a shared auth key and answers every
+query through a user supplied handler. Pings are answered with pongs and acks are ignored.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from hashlib import sha1, sha256
+from io import BytesIO
+from typing import Callable, Optional
+
+from pyrogram import raw
+from pyrogram.connection import Connection
+from pyrogram.crypto import aes
+from pyrogram.crypto.mtproto import kdf
+from pyrogram.raw.core import Message, MsgContainer, TLObject, Long
+from pyrogram.session import Session
+
+AUTH_KEY = os.urandom(256)
+
+
+class FakeServer:
+    MAX_CONTAINER_SIZE = 32 * 1024
+
+    def __init__(
+        self,
+        handler: Callable[[TLObject], TLObject] = None,
+        auth_key: bytes = AUTH_KEY,
+        latency: float = 0
+    ):
+        self.handler = handler
+        self.auth_key = auth_key
+        self.auth_key_id = sha1(auth_key).digest()[-8:]
+        self.server = None  # type: Optional[asyncio.AbstractServer]
+        self.port = None
+        self.packets_received = 0
+        self.messages_received = 0
+        self.last_msg_id = 0
+        # Delay (in seconds) applied to every answer, to emulate the round-trip to a real DC
+        self.latency = latency
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.serve, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def msg_id(self) -> int:
+        # Server message ids are odd and strictly increasing
+        self.last_msg_id = max(self.last_msg_id + 4, int(time.time()) * 2 ** 32 + 1)
+        return self.last_msg_id
+
+    def unpack(self, packet: bytes):
+        b = BytesIO(packet)
+        assert b.read(8) == self.auth_key_id
+
+        msg_key = b.read(16)
+        aes_key, aes_iv = kdf(self.auth_key, msg_key, True)
+        data = BytesIO(aes.ige256_decrypt(b.read(), aes_key, aes_iv))
+        data.read(8)  # Salt
+        session_id = data.read(8)
+
+        return session_id, Message.read(data)
+
+    def pack(self, body: TLObject, session_id: bytes) -> bytes:
+        message = Message(body, self.msg_id(), 1, len(body))
+        data = Long(0) + session_id + message.write()
+        padding = os.urandom(-(len(data) + 12) % 16 + 12)
+
+        msg_key = sha256(self.auth_key[96: 96 + 32] + data + padding).digest()[8:24]
+        aes_key, aes_iv = kdf(self.auth_key, msg_key, False)
+
+        return self.auth_key_id + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+
+    def answer(self, message: Message) -> Optional[TLObject]:
+        body = message.body
+
+        if isinstance(body, (raw.functions.Ping, raw.functions.PingDelayDisconnect)):
+            return raw.types.Pong(msg_id=message.msg_id, ping_id=body.ping_id)
+
+        if isinstance(body, raw.types.MsgsAck) or self.handler is None:
+            return None
+
+        return raw.types.RpcResult(req_msg_id=message.msg_id, result=self.handler(body))
+
+    def group(self, answers: list):
+        """Pack small answers together in containers and send big ones on their own."""
+        batch = []
+        size = 0
+
+        for answer in answers + [None]:
+            if answer is None or size + len(answer) > self.MAX_CONTAINER_SIZE:
+                if len(batch) == 1:
+                    yield batch[0]
+                elif batch:
+                    yield MsgContainer([Message(a, self.msg_id(), 1, len(a)) for a in batch])
+
+                batch, size = [], 0
+
+            if answer is not None:
+                batch.append(answer)
+                size += len(answer)
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            assert await reader.readexactly(1) == b"\xef"
+
+            while True:
+                length = await reader.readexactly(1)
+
+                if length == b"\x7f":
+                    length = await reader.readexactly(3)
+
+                session_id, message = self.unpack(await reader.readexactly(int.from_bytes(length, "little") * 4))
+
+                messages = message.body.messages if isinstance(message.body, MsgContainer) else [message]
+
+                self.packets_received += 1
+                self.messages_received += len(messages)
+
+                answers = [a for a in map(self.answer, messages) if a is not None]
+
+                if not answers or writer.is_closing():
+                    continue
+
+                for body in self.group(answers):
+                    payload = self.pack(body, session_id)
+                    length = len(payload) // 4
+                    packet = (bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")) + payload
+
+                    if self.latency:
+                        # Every answer is delayed by the same amount, so they still go out in order
+                        asyncio.get_running_loop().call_later(self.latency, self.write, writer, packet)
+                    else:
+                        writer.write(packet)
+                        await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def write(writer: asyncio.StreamWriter, packet: bytes):
+        if not writer.is_closing():
+            writer.write(packet)
+
+
+async def start_session(session: Session, port: int, mode: int = 1):
+    """Connect a session to a local fake server, skipping the InitConnection handshake.
+
+    The server only speaks the abridged framing, so *mode* must be 1 (TCPAbridged) or 6 (TCPAbridgedBuffered).
+    """
+    session.connection = Connection(session.dc_id, session.test_mode, False, None, session.is_media, mode=mode)
+    session.connection.address = ("127.0.0.1", port)
+
+    await session.connection.connect()
+
+    session.network_task = session.loop.create_task(session.network_worker())
+    session.send_task = session.loop.create_task(session.send_worker())
+    session.is_connected.set()
+
+
+def run_server(handler: Callable[[TLObject], TLObject], latency: float, ports):
+    async def main():
+        server = FakeServer(handler=handler, latency=latency)
+        await server.start()
+        ports.put(server.port)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def start_server_process(handler: Callable[[TLObject], TLObject] = None, latency: float = 0):
+    """Run a fake server in a child process, so that its work doesn't show up in the measurements.
+
+    The handler must be picklable (a module level function). Returns the process and the port it listens on.
+    """
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_server, args=(handler, latency, ports), daemon=True)
+    process.start()
+
+    return process, ports.get()
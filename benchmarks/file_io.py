@@ -0,0 +1,123 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Event loop lag during 50 parallel downloads and uploads of files on disk, against a local fake DC.
+
+Downloads are run twice: writing each chunk with a plain blocking write on the event loop (as handle_download
+used to do) and through handle_download. Lag is how late a 1ms timer fires, the worst case and the 99th
+percentile are reported.
+
+Usage: python -m benchmarks.file_io [directory]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from pyrogram import Client, raw
+from pyrogram.file_id import FileId, FileType
+from pyrogram.session import Session
+from .fake_server import AUTH_KEY, start_server_process, start_session
+from .save_file import LocalSessionPool
+
+TRANSFERS = 50
+FILE_SIZE = 4 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+CHUNK = os.urandom(CHUNK_SIZE)
+
+
+def handler(query):
+    if isinstance(query, raw.functions.upload.GetFile):
+        return raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=CHUNK)
+
+    return raw.types.NearestDc(country="", this_dc=2, nearest_dc=2)
+
+
+async def measure_lag(stop: asyncio.Event) -> list:
+    lags = []
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+    return lags
+
+
+async def run(name: str, transfers: list):
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_lag(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*transfers)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    lags = sorted(await lag)
+
+    print(
+        f"{name:<20} {TRANSFERS * FILE_SIZE / elapsed / 1024 / 1024:6.1f} MiB/s  "
+        f"lag max {lags[-1] * 1000:6.1f}ms  p99 {lags[int(len(lags) * 0.99)] * 1000:6.1f}ms"
+    )
+
+
+async def blocking_download(client: Client, file_id: FileId, path: str):
+    with open(path, "wb") as f:
+        async for chunk in client.get_file(file_id, FILE_SIZE):
+            f.write(chunk)
+
+
+async def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp()
+
+    # The fake DC runs in its own process, its crypto would otherwise dominate the lag
+    server, port = start_server_process(handler)
+    LocalSessionPool.port = port
+
+    client = Client("benchmark", in_memory=True, max_concurrent_transmissions=TRANSFERS)
+    await client.storage.open()
+
+    session = client.media_sessions[2] = Session(client, 2, AUTH_KEY, False, is_media=True)
+    await start_session(session, port)
+    client.upload_pools[2] = LocalSessionPool(client, 2, client.max_upload_sessions)
+
+    file_id = FileId(file_type=FileType.DOCUMENT, dc_id=2, media_id=0, access_hash=0, file_reference=b"")
+    paths = [os.path.join(directory, f"file_{i}") for i in range(TRANSFERS)]
+
+    await run("blocking download", [blocking_download(client, file_id, path) for path in paths])
+    await run("download", [
+        client.handle_download((file_id, directory, f"file_{i}", False, FILE_SIZE, None, (), None))
+        for i in range(TRANSFERS)
+    ])
+    await run("upload", [client.save_file(path) for path in paths])
+
+    for path in paths:
+        os.remove(path)
+
+    await client.upload_pools[2].stop()
+    await session.stop()
+    server.terminate()
+
+    client.crypto_executor.shutdown()
+    client.file_io_executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
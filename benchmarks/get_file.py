@@ -0,0 +1,87 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Client.get_file throughput against a local fake DC for several in-flight depths.
+
+The fake DC delays every answer to emulate the round-trip to a real one, which is what bounds a download that
+waits for each chunk before asking for the next.
+
+Usage: python -m benchmarks.get_file
+"""
+
+import asyncio
+import os
+import time
+
+from pyrogram import Client, raw
+from pyrogram.file_id import FileId, FileType
+from pyrogram.session import Session
+from .fake_server import AUTH_KEY, FakeServer, start_session
+
+CHUNK_SIZE = 1024 * 1024
+FILE_SIZE = 64 * CHUNK_SIZE + 12345
+LATENCY = 0.05
+
+CHUNK = os.urandom(CHUNK_SIZE)
+LAST_CHUNK = CHUNK[:FILE_SIZE % CHUNK_SIZE]
+
+
+def get_file(query):
+    return raw.types.upload.File(
+        type=raw.types.storage.FilePartial(),
+        mtime=0,
+        bytes=CHUNK if query.offset + CHUNK_SIZE <= FILE_SIZE else LAST_CHUNK
+    )
+
+
+async def run(depth: int, port: int):
+    client = Client("benchmark", in_memory=True, download_inflight_requests=depth)
+    session = client.media_sessions[2] = Session(client, 2, AUTH_KEY, False, is_media=True)
+    await start_session(session, port)
+
+    file_id = FileId(file_type=FileType.DOCUMENT, dc_id=2, media_id=0, access_hash=0, file_reference=b"")
+
+    size = 0
+    start = time.perf_counter()
+
+    async for chunk in client.get_file(file_id, FILE_SIZE):
+        size += len(chunk)
+
+    elapsed = time.perf_counter() - start
+
+    assert size == FILE_SIZE, size
+
+    await session.stop()
+    client.crypto_executor.shutdown()
+
+    print(f"depth={depth:<3} {size / elapsed / CHUNK_SIZE:6.1f} MiB/s")
+
+
+async def main():
+    server = FakeServer(handler=get_file, latency=LATENCY)
+    await server.start()
+
+    print(f"{FILE_SIZE / CHUNK_SIZE:.1f} MiB, {LATENCY * 1000:.0f}ms simulated latency")
+
+    for depth in (1, 2, 4, 8):
+        await run(depth, server.port)
+
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
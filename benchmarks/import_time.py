@@ -0,0 +1,73 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Time and memory taken by ``import pyrogram`` in a fresh interpreter.
+
+"eager" also imports every generated raw class, like pyrogram/raw did at import time before;
+"lazy" imports only the raw classes the rest of the library touches while being imported.
+
+Usage: python -m benchmarks.import_time
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+SCRIPT = """
+import json, resource, sys, time
+
+start = time.perf_counter()
+import pyrogram
+
+if {eager}:
+    from pyrogram.raw.all import objects, paths
+
+    for constructor_id in paths:
+        objects[constructor_id]
+
+elapsed = time.perf_counter() - start
+
+print(json.dumps({{
+    "time": elapsed,
+    "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": sum(1 for name in sys.modules if name.startswith("pyrogram.raw."))
+}}))
+"""
+
+
+def measure(eager: bool) -> dict:
+    results = [
+        json.loads(subprocess.check_output([sys.executable, "-c", SCRIPT.format(eager=eager)]))
+        for _ in range(RUNS)
+    ]
+
+    return {key: statistics.median(r[key] for r in results) for key in results[0]}
+
+
+def main():
+    print(f"import pyrogram, median of {RUNS} runs")
+
+    for name, eager in (("eager", True), ("lazy", False)):
+        r = measure(eager)
+        print(f"{name:>6}: {r['time'] * 1e3:7.1f} ms, {r['max_rss'] / 1024:6.1f} MiB max RSS, {r['modules']:5} raw modules")
+
+
+if __name__ == "__main__":
+    main()
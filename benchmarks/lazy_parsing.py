@@ -0,0 +1,104 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Dispatch cost in a busy chat list where a handler only cares about one chat out of twenty.
+
+"eager" parses every update before running the filters, as the dispatcher did before raw pre-checks existed;
+"lazy" runs the filters' raw pre-checks first and parses only the updates at least one handler may accept.
+
+Usage: python -m benchmarks.lazy_parsing
+"""
+
+import asyncio
+import time
+from io import BytesIO
+
+from pyrogram import Client, filters, raw, utils
+from pyrogram.handlers import MessageHandler
+from pyrogram.raw.core import TLObject
+
+CHATS = 20
+UPDATES = 2000
+USER_ID = 777000
+
+
+def read(obj: TLObject) -> TLObject:
+    # Go through the wire format, like real updates do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(obj.write()))
+
+
+def make_update(channel_id: int, message_id: int) -> tuple:
+    update = raw.types.UpdateNewChannelMessage(
+        message=raw.types.Message(
+            id=message_id,
+            peer_id=raw.types.PeerChannel(channel_id=channel_id),
+            from_id=raw.types.PeerUser(user_id=USER_ID),
+            date=0,
+            message="hello",
+            entities=[]
+        ),
+        pts=0,
+        pts_count=0
+    )
+    user = raw.types.User(id=USER_ID, access_hash=0, first_name="User")
+    channel = raw.types.Channel(
+        id=channel_id, title="Group", photo=raw.types.ChatPhotoEmpty(), date=0, access_hash=0, megagroup=True
+    )
+
+    return read(update), {USER_ID: read(user)}, {channel_id: read(channel)}
+
+
+class EagerMessageHandler(MessageHandler):
+    def check_raw(self, client, update, users, chats) -> bool:
+        return True
+
+
+async def measure(handler_class) -> float:
+    handled = []
+
+    async def callback(client, message):
+        handled.append(message)
+
+    client = Client("benchmark", in_memory=True)
+    await client.storage.open()
+
+    packets = [make_update(1000 + i % CHATS, i) for i in range(UPDATES)]
+    client.dispatcher.add_handler(handler_class(callback, filters.chat(utils.get_channel_id(1000)) & filters.text), 0)
+
+    start = time.perf_counter()
+
+    for packet in packets:
+        await client.dispatcher.handle_update(packet)
+
+    elapsed = time.perf_counter() - start
+
+    await client.storage.close()
+
+    assert len(handled) == UPDATES // CHATS, len(handled)
+
+    return elapsed / UPDATES
+
+
+async def main():
+    print(f"{UPDATES} updates from {CHATS} chats, one chat handled")
+
+    for name, handler_class in (("eager", EagerMessageHandler), ("lazy", MessageHandler)):
+        print(f"{name:>6}: {await measure(handler_class) * 1e6:8.1f} us/update")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Hit rate and memory of the message cache for a stream of supergroup messages replying to earlier ones.
+
+Most messages reply to one of the last few hundred messages of their chat, some to a handful of pinned-like
+messages the chats keep coming back to. "halving" drops the oldest half of the entries when the cache is full, as
+the message cache did before it was a least recently used one; "lru" is Client.message_cache.
+
+The memory taken by a full cache is measured with parsed messages and with compact_message_cache.
+
+Usage: python -m benchmarks.message_cache
+"""
+
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+from io import BytesIO
+
+from pyrogram import Client, raw, types
+from pyrogram.raw.core import TLObject
+
+MESSAGES = 100000
+CAPACITY = 10000
+CHATS = 20
+HOT = 10
+USER_ID = 777000
+
+
+class HalvingCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.store = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key):
+        value = self.store.get(key, None)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.store:
+            del self.store[key]
+
+        self.store[key] = value
+
+        if len(self.store) > self.capacity:
+            for _ in range(self.capacity // 2 + 1):
+                del self.store[next(iter(self.store))]
+
+
+def make_stream():
+    rng = random.Random(0)
+    stream = []
+
+    for i in range(1, MESSAGES + 1):
+        chat_id = rng.randrange(CHATS)
+        message_id = i // CHATS + 1
+
+        if rng.random() < 0.2:
+            reply_to = rng.randrange(1, HOT + 1)
+        else:
+            reply_to = max(message_id - int(rng.expovariate(1 / 100)) - 1, 1)
+
+        stream.append((chat_id, message_id, reply_to))
+
+    return stream
+
+
+def hit_rate(cache, stream) -> float:
+    for chat_id, message_id, reply_to in stream:
+        cache[(chat_id, reply_to)]
+        cache[(chat_id, message_id)] = True
+
+    return cache.hits / (cache.hits + cache.misses)
+
+
+def make_messages(count: int) -> raw.types.messages.Messages:
+    r = raw.types.messages.Messages(
+        messages=[
+            raw.types.Message(
+                id=i,
+                peer_id=raw.types.PeerChannel(channel_id=1000 + i % CHATS),
+                from_id=raw.types.PeerUser(user_id=USER_ID + i % 100),
+                date=1700000000 + i,
+                message="Hello @someone, see https://example.com for details",
+                entities=[
+                    raw.types.MessageEntityMention(offset=6, length=8),
+                    raw.types.MessageEntityUrl(offset=20, length=19)
+                ],
+                reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=max(i - 1, 1))
+            )
+            for i in range(1, count + 1)
+        ],
+        chats=[
+            raw.types.Channel(
+                id=1000 + i, title="Group", photo=raw.types.ChatPhotoEmpty(), date=0, access_hash=1, megagroup=True
+            )
+            for i in range(CHATS)
+        ],
+        users=[
+            raw.types.User(id=USER_ID + i, access_hash=1, first_name="User", username=f"user{i}")
+            for i in range(100)
+        ]
+    )
+
+    # Go through the wire format, like real responses do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(r.write()))
+
+
+async def fill(compact: bool, r: raw.types.messages.Messages) -> Client:
+    client = Client("benchmark", in_memory=True, compact_message_cache=compact)
+    users = {i.id: i for i in r.users}
+    chats = {i.id: i for i in r.chats}
+
+    for message in r.messages:
+        await types.Message._parse(client, message, users, chats, replies=0, resolve_replies=False)
+
+    return client
+
+
+async def measure(compact: bool, r: raw.types.messages.Messages):
+    start = time.perf_counter()
+    client = await fill(compact, r)
+    parse = (time.perf_counter() - start) / len(r.messages)
+
+    keys = list(client.message_cache.store)
+
+    start = time.perf_counter()
+
+    for key in keys:
+        await client.message_cache.get(key)
+
+    get = (time.perf_counter() - start) / len(keys)
+
+    del client
+    gc.collect()
+    tracemalloc.start()
+
+    client = await fill(compact, r)
+
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] / len(client.message_cache)
+    tracemalloc.stop()
+
+    name = "compact" if compact else "parsed"
+    print(f"{name:>8}: {size:8.0f} bytes/message, {parse * 1e6:6.1f} us/parse, {get * 1e6:6.1f} us/get")
+
+
+async def main():
+    stream = make_stream()
+
+    print(f"{MESSAGES} messages in {CHATS} chats, {CAPACITY} cached")
+
+    for name, cache in (("halving", HalvingCache(CAPACITY)), ("lru", Client("benchmark").message_cache)):
+        cache.capacity = CAPACITY
+        print(f"{name:>8}: {hit_rate(cache, stream):8.1%} of the replied messages cached")
+
+    r = make_messages(CAPACITY)
+
+    for compact in (False, True):
+        await measure(compact, r)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
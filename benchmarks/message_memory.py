@@ -0,0 +1,143 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Memory taken by 100k parsed supergroup messages, as a history export keeps them.
+
+Only the high-level objects are measured: the raw messages they were parsed from are built beforehand.
+"dense" keeps every field of every object in its __dict__, as pyrogram.types.Object did before unset fields were
+left to the class attributes; "sparse" is the current behaviour.
+
+Usage: python -m benchmarks.message_memory
+"""
+
+import asyncio
+import gc
+import time
+import tracemalloc
+from io import BytesIO
+
+from pyrogram import Client, raw, types
+from pyrogram.raw.core import TLObject
+from pyrogram.types.object import Meta
+
+MESSAGES = 100000
+# Messages parsed without tracing allocations, to time the parsing
+TIMED = 10000
+CHATS = 20
+USERS = 1000
+
+
+def make_messages() -> raw.types.messages.Messages:
+    r = raw.types.messages.Messages(
+        messages=[
+            raw.types.Message(
+                id=i,
+                peer_id=raw.types.PeerChannel(channel_id=1000 + i % CHATS),
+                from_id=raw.types.PeerUser(user_id=i % USERS + 1),
+                date=1700000000 + i,
+                message="Hello @someone, see https://example.com for **details**",
+                entities=[
+                    raw.types.MessageEntityMention(offset=6, length=8),
+                    raw.types.MessageEntityUrl(offset=20, length=19),
+                    raw.types.MessageEntityBold(offset=44, length=11)
+                ],
+                reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=i - 1) if i % 3 == 0 else None,
+                edit_date=1700000100 + i if i % 5 == 0 else None
+            )
+            for i in range(1, MESSAGES + 1)
+        ],
+        chats=[
+            raw.types.Channel(
+                id=1000 + i,
+                title="Supergroup",
+                photo=raw.types.ChatPhotoEmpty(),
+                date=1600000000,
+                access_hash=42,
+                megagroup=True,
+                username=f"supergroup{i}"
+            )
+            for i in range(CHATS)
+        ],
+        users=[
+            raw.types.User(
+                id=i,
+                access_hash=i * 7919,
+                first_name="User",
+                last_name=str(i),
+                username=f"user{i}",
+                status=raw.types.UserStatusRecently()
+            )
+            for i in range(1, USERS + 1)
+        ]
+    )
+
+    # Go through the wire format, like real responses do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(r.write()))
+
+
+async def parse(client: Client, r: raw.types.messages.Messages, count: int) -> list:
+    users = {i.id: i for i in r.users}
+    chats = {i.id: i for i in r.chats}
+
+    return [
+        await types.Message._parse(client, message, users, chats, replies=0, resolve_replies=False, cache=False)
+        for message in r.messages[:count]
+    ]
+
+
+async def measure(client: Client, r: raw.types.messages.Messages):
+    start = time.perf_counter()
+    await parse(client, r, TIMED)
+    elapsed = (time.perf_counter() - start) / TIMED
+
+    gc.collect()
+    tracemalloc.start()
+
+    messages = await parse(client, r, MESSAGES)
+
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del messages
+
+    return size, elapsed
+
+
+async def main():
+    client = Client("benchmark", in_memory=True)
+    r = make_messages()
+    call = Meta.__call__
+
+    print(f"{MESSAGES} messages")
+
+    for name in ("dense", "sparse"):
+        if name == "dense":
+            Meta.__call__ = type.__call__
+
+        size, elapsed = await measure(client, r)
+
+        Meta.__call__ = call
+
+        print(
+            f"{name:>7}: {size / 2 ** 20:8.1f} MiB, {size / MESSAGES:6.0f} bytes/message, "
+            f"{elapsed * 1e6:6.1f} us/message"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Parse time of 4096-character messages with nested entities, in HTML and Markdown.
+
+"quadratic" grows the text and every open entity on each chunk of data and rewrites the whole Markdown text
+on each delimiter, as the parsers did before; "linear" collects text chunks and counts UTF-16 offsets as it goes;
+"cached" parses the same template again.
+
+Usage: python -m benchmarks.parser
+"""
+
+import asyncio
+import html
+import re
+import time
+
+from pyrogram import enums
+from pyrogram.parser import Parser, utils
+from pyrogram.parser.html import HTML, Parser as HTMLParser
+from pyrogram.parser.markdown import Markdown, MARKDOWN_RE, FIXED_WIDTH_DELIMS, PRE_DELIM, URL_MARKUP, OPENING_TAG, \
+    CLOSING_TAG
+
+MESSAGES = 50
+LENGTH = 4096
+
+
+class QuadraticHTMLParser(HTMLParser):
+    def __init__(self):
+        super().__init__(None)
+        self.text = ""
+
+    def handle_starttag(self, tag, attrs):
+        super().handle_starttag(tag, attrs)
+
+        if tag in self.tag_entities:
+            self.tag_entities[tag][-1].offset = len(self.text)
+
+    def handle_data(self, data):
+        data = html.unescape(data)
+
+        for entities in self.tag_entities.values():
+            for entity in entities:
+                entity.length += len(data)
+
+        self.text += data
+
+    def handle_endtag(self, tag):
+        try:
+            self.entities.append(self.tag_entities[tag].pop())
+        except (KeyError, IndexError):
+            pass
+        else:
+            if not self.tag_entities[tag]:
+                self.tag_entities.pop(tag)
+
+
+def quadratic_html(text: str) -> tuple:
+    parser = QuadraticHTMLParser()
+    parser.feed(utils.add_surrogates(text))
+    parser.close()
+
+    entities = tuple(sorted((e for e in parser.entities if e.length > 0), key=lambda e: e.offset))
+
+    return utils.remove_surrogates(parser.text), entities
+
+
+def quadratic_markdown(text: str) -> tuple:
+    text = Markdown._parse_blockquotes(Markdown._parse_blockquotes(text))
+    delims = set()
+    is_fixed_width = False
+    tags = {"**": "b", "__": "i", "--": "u", "~~": "s", "`": "code", "```": "pre", "||": "spoiler"}
+
+    for match in re.finditer(MARKDOWN_RE, text):
+        start, _ = match.span()
+        delim, is_emoji, text_url, url = match.groups()
+
+        if delim in FIXED_WIDTH_DELIMS:
+            is_fixed_width = not is_fixed_width
+
+        if is_fixed_width and delim not in FIXED_WIDTH_DELIMS:
+            continue
+
+        if not is_emoji and text_url:
+            text = utils.replace_once(text, match.group(0), URL_MARKUP.format(url, text_url), start)
+            continue
+
+        if delim not in delims:
+            delims.add(delim)
+            tag = OPENING_TAG.format(tags[delim])
+        else:
+            delims.remove(delim)
+            tag = CLOSING_TAG.format(tags[delim])
+
+        if delim == PRE_DELIM and delim in delims:
+            delim_and_language = text[text.find(PRE_DELIM):].split("\n")[0]
+            language = delim_and_language[len(PRE_DELIM):]
+            text = utils.replace_once(text, delim_and_language, f'<pre language="{language}">', start)
+            continue
+
+        text = utils.replace_once(text, delim, tag, start)
+
+    return quadratic_html(text)
+
+
+def make_html(seed: int) -> str:
+    chunks = []
+    i = seed
+
+    while sum(map(len, chunks)) < LENGTH - 100:
+        i += 1
+        chunks.append(
+            f"<b>bold {i} <i>italic <u>under <s>strike &amp; 😀</s></u></i></b> "
+            f'<a href="https://example.org/{i}">link <code>code</code></a> plain text here, '
+        )
+
+    return "".join(chunks)
+
+
+def make_markdown(seed: int) -> str:
+    chunks = []
+    i = seed
+
+    while sum(map(len, chunks)) < LENGTH - 100:
+        i += 1
+        chunks.append(f"**bold {i} __italic --under ~~strike 😀~~--__** [link {i}](https://example.org/{i}) `code` text, ")
+
+    return "".join(chunks)
+
+
+def measure(func, texts: list) -> float:
+    start = time.perf_counter()
+
+    for text in texts:
+        func(text)
+
+    return (time.perf_counter() - start) / len(texts)
+
+
+async def measure_cached(parser: Parser, texts: list, mode: enums.ParseMode) -> float:
+    for text in texts:
+        await parser.parse(text, mode)
+
+    start = time.perf_counter()
+
+    for text in texts:
+        await parser.parse(text, mode)
+
+    return (time.perf_counter() - start) / len(texts)
+
+
+async def main():
+    html_texts = [make_html(i * 1000) for i in range(MESSAGES)]
+    markdown_texts = [make_markdown(i * 1000) for i in range(MESSAGES)]
+    parser = Parser(None)
+
+    assert quadratic_html(html_texts[0]) == HTML.parse_entities.__wrapped__(html_texts[0])
+    assert quadratic_markdown(markdown_texts[0]) == HTML.parse_entities.__wrapped__(
+        Markdown.to_html.__wrapped__(markdown_texts[0])
+    )
+
+    print(f"{MESSAGES} messages of ~{LENGTH} characters")
+
+    for mode, texts, quadratic, linear in (
+        ("html", html_texts, quadratic_html, HTML.parse_entities.__wrapped__),
+        ("markdown", markdown_texts, quadratic_markdown,
+         lambda text: HTML.parse_entities.__wrapped__(Markdown.to_html.__wrapped__(text))),
+    ):
+        print(f"{mode}:")
+        print(f"{'quadratic':>10}: {measure(quadratic, texts) * 1e3:7.2f} ms/message")
+        print(f"{'linear':>10}: {measure(linear, texts) * 1e3:7.2f} ms/message")
+        print(f"{'cached':>10}: {await measure_cached(parser, texts, getattr(enums.ParseMode, mode.upper())) * 1e3:7.2f} ms/message")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
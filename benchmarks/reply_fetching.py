@@ -0,0 +1,146 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Requests made to attach the replied and pinned messages of a page of supergroup messages.
+
+The server is faked: every request takes LATENCY seconds and answers with the messages the ids reply to.
+"one by one" parses each message on its own and waits for its replied message, as Message._parse did before
+replies were fetched in batches; "page" parses the page with utils.parse_messages, like get_chat_history does;
+"updates" parses the messages concurrently, like the dispatcher workers do with a burst of new messages.
+
+Usage: python -m benchmarks.reply_fetching
+"""
+
+import asyncio
+import time
+from io import BytesIO
+
+from pyrogram import Client, raw, types, utils
+from pyrogram.raw.core import TLObject
+
+PAGE = 100
+REPLIES = 60
+PINS = 5
+LATENCY = 0.02
+CHANNEL_ID = 1234567890
+USER_ID = 777000
+# Messages of the page reply to the one OFFSET ids older, which is not in the page
+OFFSET = 1000
+
+
+def make_message(message_id: int) -> raw.base.Message:
+    peer_id = raw.types.PeerChannel(channel_id=CHANNEL_ID)
+    reply_to = raw.types.MessageReplyHeader(reply_to_msg_id=message_id - OFFSET)
+
+    if message_id % (PAGE // PINS) == 0:
+        return raw.types.MessageService(
+            id=message_id,
+            peer_id=peer_id,
+            from_id=raw.types.PeerUser(user_id=USER_ID),
+            date=message_id,
+            action=raw.types.MessageActionPinMessage(),
+            reply_to=reply_to
+        )
+
+    return raw.types.Message(
+        id=message_id,
+        peer_id=peer_id,
+        from_id=raw.types.PeerUser(user_id=USER_ID),
+        date=message_id,
+        message="hello",
+        reply_to=reply_to if message_id % PAGE < REPLIES else None
+    )
+
+
+def make_messages(messages: list) -> raw.types.messages.Messages:
+    r = raw.types.messages.Messages(
+        messages=messages,
+        chats=[
+            raw.types.Channel(
+                id=CHANNEL_ID, title="Group", photo=raw.types.ChatPhotoEmpty(), date=0, access_hash=1, megagroup=True
+            )
+        ],
+        users=[raw.types.User(id=USER_ID, access_hash=1, first_name="User")]
+    )
+
+    # Go through the wire format, like real responses do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(r.write()))
+
+
+async def main():
+    client = Client("benchmark", in_memory=True)
+    client.is_connected = True
+    await client.storage.open()
+
+    page = make_messages([make_message(i) for i in range(OFFSET + PAGE, OFFSET, -1)])
+    await client.fetch_peers(page.chats)
+
+    requests = 0
+
+    async def invoke(query, *args, **kwargs):
+        nonlocal requests
+        requests += 1
+
+        await asyncio.sleep(LATENCY)
+
+        return make_messages([
+            raw.types.Message(
+                id=i.id - OFFSET,
+                peer_id=raw.types.PeerChannel(channel_id=CHANNEL_ID),
+                from_id=raw.types.PeerUser(user_id=USER_ID),
+                date=i.id - OFFSET,
+                message="replied"
+            )
+            for i in query.id
+        ])
+
+    client.invoke = invoke
+
+    users = {i.id: i for i in page.users}
+    chats = {i.id: i for i in page.chats}
+
+    async def one_by_one():
+        return [await types.Message._parse(client, m, users, chats, replies=1) for m in page.messages]
+
+    async def updates():
+        return await asyncio.gather(*[types.Message._parse(client, m, users, chats, replies=1) for m in page.messages])
+
+    expected = sum(1 for m in page.messages if m.reply_to)
+
+    print(f"{PAGE} messages, {expected - PINS} replies and {PINS} pins, {LATENCY * 1000:.0f} ms per request")
+
+    for name, parse in (
+        ("one by one", one_by_one),
+        ("page", lambda: utils.parse_messages(client, page)),
+        ("updates", updates)
+    ):
+        client.message_cache.clear()
+        requests = 0
+
+        start = time.perf_counter()
+        messages = await parse()
+        elapsed = time.perf_counter() - start
+
+        assert sum(bool(m.reply_to_message or m.pinned_message) for m in messages) == expected
+
+        print(f"{name:>10}: {requests:4} requests, {elapsed * 1000:8.1f} ms")
+
+    await client.storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
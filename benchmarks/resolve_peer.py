@@ -0,0 +1,97 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Latency of resolve_peer and cost of fetch_peers with a file session holding a few thousand peers.
+
+"storage" queries the session file on the storage thread, as resolve_peer did before the peer cache existed, and
+writes every peer of a response; "cache" goes through Client.peer_cache, which answers from memory and only writes the
+peers that changed.
+
+Usage: python -m benchmarks.resolve_peer
+"""
+
+import asyncio
+import tempfile
+import time
+from io import BytesIO
+
+from pyrogram import Client, raw
+from pyrogram.raw.core import TLObject
+
+PEERS = 5000
+CALLS = 20000
+BATCH = 20
+
+
+def make_user(user_id: int) -> raw.types.User:
+    user = raw.types.User(id=user_id, access_hash=user_id * 7919, first_name="User", username=f"user{user_id}")
+
+    # Go through the wire format, like real responses do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(user.write()))
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        client = Client("benchmark", workdir=workdir)
+        client.is_connected = True
+        await client.storage.open()
+
+        users = [make_user(user_id) for user_id in range(1, PEERS + 1)]
+        await client.fetch_peers(users)
+        await client.peer_cache.flush()
+
+        ids = [(i * 7) % PEERS + 1 for i in range(CALLS)]
+        usernames = [f"user{user_id}" for user_id in ids]
+
+        print(f"{PEERS} peers, {CALLS} calls")
+
+        for name, resolve in (
+            ("storage id", client.storage.get_peer_by_id),
+            ("cache id", client.resolve_peer),
+            ("storage username", client.storage.get_peer_by_username),
+            ("cache username", client.resolve_peer)
+        ):
+            start = time.perf_counter()
+
+            for peer_id in (usernames if "username" in name else ids):
+                await resolve(peer_id)
+
+            print(f"{name:>17}: {(time.perf_counter() - start) / CALLS * 1e6:8.1f} us/call")
+
+        batches = [users[i:i + BATCH] for i in range(0, PEERS, BATCH)]
+
+        for name, update_peers in (("storage", client.storage.update_peers), ("cache", None)):
+            start = time.perf_counter()
+
+            for batch in batches:
+                if update_peers is None:
+                    await client.fetch_peers(batch)
+                else:
+                    # Same rows fetch_peers builds, written straight to the storage
+                    await update_peers([(u.id, u.access_hash, "user", [u.username], None) for u in batch])
+
+            await client.peer_cache.flush()
+
+            elapsed = (time.perf_counter() - start) / len(batches)
+            print(f"{name + ' fetch_peers':>17}: {elapsed * 1e6:8.1f} us/batch of {BATCH} unchanged peers")
+
+        await client.peer_cache.stop()
+        await client.storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
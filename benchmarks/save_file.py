@@ -0,0 +1,97 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Client.save_file against a local fake DC, with upload sessions kept in the pool or recreated for each file.
+
+Recreating sessions is emulated by emptying the pool after every upload. New sessions pay a connect and one
+round-trip, standing in for the Ping and InitConnection exchanged by Session.start.
+
+Usage: python -m benchmarks.save_file
+"""
+
+import asyncio
+import io
+import os
+import time
+
+from pyrogram import Client, raw
+from pyrogram.session import Session, SessionPool
+from .fake_server import AUTH_KEY, FakeServer, start_session
+
+LATENCY = 0.02
+SMALL_FILES = 50
+SMALL_FILE_SIZE = 200 * 1024
+BIG_FILE_SIZE = 64 * 1024 * 1024
+
+
+def save_file_part(query):
+    return raw.types.NearestDc(country="", this_dc=2, nearest_dc=2)
+
+
+class LocalSessionPool(SessionPool):
+    port = None
+
+    async def create_session(self) -> Session:
+        session = Session(self.client, self.dc_id, AUTH_KEY, False, is_media=True)
+        await start_session(session, self.port)
+        await session.send(raw.functions.Ping(ping_id=0))
+
+        return session
+
+
+async def upload(client: Client, size: int, count: int, persistent: bool) -> float:
+    data = os.urandom(size)
+    start = time.perf_counter()
+
+    for _ in range(count):
+        await client.save_file(io.BytesIO(data))
+
+        if not persistent:
+            await client.upload_pools[2].close_sessions()
+
+    return time.perf_counter() - start
+
+
+async def main():
+    server = FakeServer(handler=save_file_part, latency=LATENCY)
+    await server.start()
+    LocalSessionPool.port = server.port
+
+    print(f"{LATENCY * 1000:.0f}ms simulated latency")
+
+    for persistent in (False, True):
+        client = Client("benchmark", in_memory=True)
+        await client.storage.open()
+        client.upload_pools[2] = LocalSessionPool(client, 2, client.max_upload_sessions)
+
+        small = await upload(client, SMALL_FILE_SIZE, SMALL_FILES, persistent)
+        big = await upload(client, BIG_FILE_SIZE, 1, persistent)
+
+        await client.upload_pools[2].stop()
+        client.crypto_executor.shutdown()
+
+        print(
+            f"{'pooled' if persistent else 'per-file'} sessions: "
+            f"{SMALL_FILES} x {SMALL_FILE_SIZE // 1024} KiB in {small:.2f}s, "
+            f"{BIG_FILE_SIZE // 1024 // 1024} MiB in {big:.2f}s"
+        )
+
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
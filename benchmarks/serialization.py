@@ -0,0 +1,128 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Serialization cost of the generated raw classes on update batches shaped like a busy supergroup's.
+
+Each batch is an Updates container with new and edited channel messages (entities, reply headers, reply
+counters), read receipts, user statuses and a bulk message deletion, plus the users and chats they mention.
+"write" serializes a batch, "read" parses it back from its wire format.
+
+Run it against a tree generated before and after a compiler change to compare the generated code.
+
+Usage: python -m benchmarks.serialization
+"""
+
+import time
+from io import BytesIO
+
+from pyrogram import raw
+from pyrogram.raw.core import TLObject
+
+BATCHES = 2000
+CHANNEL_ID = 1234567890
+
+
+def make_message(message_id: int, user_id: int) -> raw.types.Message:
+    return raw.types.Message(
+        id=message_id,
+        peer_id=raw.types.PeerChannel(channel_id=CHANNEL_ID),
+        from_id=raw.types.PeerUser(user_id=user_id),
+        date=1700000000 + message_id,
+        message="Hello @someone, see https://example.com for **details**",
+        entities=[
+            raw.types.MessageEntityMention(offset=6, length=8),
+            raw.types.MessageEntityUrl(offset=20, length=19),
+            raw.types.MessageEntityBold(offset=44, length=11)
+        ],
+        reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=message_id - 1),
+        replies=raw.types.MessageReplies(replies=0, replies_pts=message_id),
+        edit_date=1700000100 + message_id if message_id % 2 else None
+    )
+
+
+def make_batch(n: int) -> raw.types.Updates:
+    user_ids = [100000 + n * 3 + i for i in range(3)]
+
+    return raw.types.Updates(
+        updates=[
+            raw.types.UpdateNewChannelMessage(
+                message=make_message(n * 10 + 1, user_ids[0]), pts=n * 10 + 1, pts_count=1
+            ),
+            raw.types.UpdateNewChannelMessage(
+                message=make_message(n * 10 + 2, user_ids[1]), pts=n * 10 + 2, pts_count=1
+            ),
+            raw.types.UpdateEditChannelMessage(
+                message=make_message(n * 10 + 3, user_ids[2]), pts=n * 10 + 3, pts_count=1
+            ),
+            raw.types.UpdateReadChannelInbox(
+                channel_id=CHANNEL_ID, max_id=n * 10 + 2, still_unread_count=0, pts=n * 10 + 3
+            ),
+            raw.types.UpdateUserStatus(
+                user_id=user_ids[0], status=raw.types.UserStatusOnline(expires=1700000300 + n)
+            ),
+            raw.types.UpdateDeleteChannelMessages(
+                channel_id=CHANNEL_ID, messages=list(range(n * 10 - 100, n * 10)), pts=n * 10 + 4, pts_count=100
+            )
+        ],
+        users=[
+            raw.types.User(
+                id=user_id,
+                access_hash=user_id * 7919,
+                first_name="User",
+                last_name=str(user_id),
+                username=f"user{user_id}",
+                status=raw.types.UserStatusRecently()
+            )
+            for user_id in user_ids
+        ],
+        chats=[
+            raw.types.Channel(
+                id=CHANNEL_ID,
+                title="Supergroup",
+                photo=raw.types.ChatPhotoEmpty(),
+                date=1600000000,
+                access_hash=42,
+                megagroup=True,
+                username="supergroup"
+            )
+        ],
+        date=1700000000 + n,
+        seq=0
+    )
+
+
+def main():
+    batches = [make_batch(n) for n in range(BATCHES)]
+
+    start = time.perf_counter()
+    payloads = [batch.write() for batch in batches]
+    write = (time.perf_counter() - start) / BATCHES
+
+    start = time.perf_counter()
+
+    for payload in payloads:
+        TLObject.read(BytesIO(payload))
+
+    read = (time.perf_counter() - start) / BATCHES
+
+    print(f"{BATCHES} update batches, {sum(map(len, payloads)) // BATCHES} bytes each")
+    print(f" write: {write * 1e6:8.1f} us/batch")
+    print(f"  read: {read * 1e6:8.1f} us/batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput of concurrent RPCs through Session.send, with and without MsgContainer batching.
+
+Usage: python -m benchmarks.session_send
+"""
+
+import asyncio
+import time
+
+from pyrogram import raw
+from pyrogram.session import Session
+from .fake_server import AUTH_KEY, FakeServer, start_session
+
+REQUESTS = 20000
+CONCURRENCY = 500
+
+
+async def run(batching: bool) -> None:
+    server = FakeServer(handler=lambda query: raw.types.NearestDc(country="US", this_dc=2, nearest_dc=2))
+    await server.start()
+
+    session = Session(None, 2, AUTH_KEY, False, is_media=True)
+
+    if not batching:
+        session.MAX_CONTAINER_LENGTH = 1
+        session.SEND_FLUSH_INTERVAL = 0
+
+    await start_session(session, server.port)
+
+    query = raw.functions.help.GetNearestDc()
+
+    async def worker(count: int):
+        for _ in range(count):
+            await session.send(query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(REQUESTS // CONCURRENCY) for _ in range(CONCURRENCY)])
+    elapsed = time.perf_counter() - start
+
+    await session.stop()
+    await server.stop()
+
+    print(
+        f"batching={'on ' if batching else 'off'} "
+        f"{REQUESTS / elapsed:10.0f} rpc/s  "
+        f"{server.packets_received:6d} packets for {server.messages_received} messages"
+    )
+
+
+async def main():
+    await run(False)
+    await run(True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Cost of the session accessors (dc_id, auth_key, ...) of the SQLite storages.
+
+"stack" is the previous implementation, which found the column by walking the call stack with inspect.stack() and
+queried SQLite on the storage thread for every call; "cached" is the current one, which serves reads from the
+in-memory session row and writes through to SQLite.
+
+Usage: python -m benchmarks.storage_accessors
+"""
+
+import asyncio
+import inspect
+import tempfile
+import time
+from pathlib import Path
+
+from pyrogram.storage import FileStorage, MemoryStorage
+
+READS = 1000
+WRITES = 100
+
+
+class StackAccessorMixin:
+    def _get_impl(self, attr: str):
+        with self.conn:
+            return self.conn.execute(f"SELECT {attr} FROM sessions").fetchone()[0]
+
+    async def _stack_get(self):
+        attr = inspect.stack()[2].function
+        return await self.loop.run_in_executor(self.executor, self._get_impl, attr)
+
+    async def _stack_set(self, value):
+        attr = inspect.stack()[2].function
+        return await self.loop.run_in_executor(self.executor, self._set_impl, attr, value)
+
+    async def _accessor(self, attr: str, value=object):
+        return await self._stack_get() if value == object else await self._stack_set(value)
+
+
+class StackMemoryStorage(StackAccessorMixin, MemoryStorage):
+    pass
+
+
+class StackFileStorage(StackAccessorMixin, FileStorage):
+    pass
+
+
+async def measure(storage):
+    await storage.open()
+
+    try:
+        start = time.perf_counter()
+
+        for _ in range(READS // 4):
+            await storage.dc_id()
+            await storage.auth_key()
+            await storage.test_mode()
+            await storage.api_id()
+
+        read = (time.perf_counter() - start) / READS
+
+        start = time.perf_counter()
+
+        for i in range(WRITES):
+            await storage.date(i)
+
+        write = (time.perf_counter() - start) / WRITES
+
+        assert await storage.date() == WRITES - 1
+    finally:
+        await storage.close()
+
+    return read, write
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        storages = [
+            ("memory", "stack", StackMemoryStorage("stack")),
+            ("memory", "cached", MemoryStorage("cached")),
+            ("file", "stack", StackFileStorage("stack", Path(workdir))),
+            ("file", "cached", FileStorage("cached", Path(workdir))),
+        ]
+
+        for engine, accessor, storage in storages:
+            read, write = await measure(storage)
+            print(f"{engine:>6} {accessor:>6}: read {read * 1e6:8.1f} us/call, write {write * 1e6:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Stream transport (mode 1) against the buffered transport (mode 6) on a local fake DC.
+
+Measures the time to connect many sessions at once, the worst event loop stall while doing so, the round-trips
+per second of concurrent small requests and the throughput of 1 MiB upload.GetFile chunks.
+
+Usage: python -m benchmarks.transport
+"""
+
+import asyncio
+import os
+import time
+
+from pyrogram import raw
+from pyrogram.session import Session
+from .fake_server import AUTH_KEY, FakeServer, start_session
+
+SESSIONS = 50
+REQUESTS = 200
+CHUNK_SIZE = 1024 * 1024
+CHUNKS = 64
+
+CHUNK = os.urandom(CHUNK_SIZE)
+
+
+def handler(query):
+    if isinstance(query, raw.functions.upload.GetFile):
+        return raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=CHUNK)
+
+    return raw.types.NearestDc(country="", this_dc=2, nearest_dc=2)
+
+
+async def measure_lag(stop: asyncio.Event) -> float:
+    worst = 0
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        worst = max(worst, time.perf_counter() - start)
+
+    return worst
+
+
+async def run(mode: int, port: int):
+    sessions = [Session(None, 2, AUTH_KEY, False, is_media=True) for _ in range(SESSIONS)]
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_lag(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[start_session(session, port, mode) for session in sessions])
+    connect = time.perf_counter() - start
+
+    stop.set()
+    lag = await lag
+
+    async def ping(session: Session):
+        for _ in range(REQUESTS):
+            await session.send(raw.functions.help.GetNearestDc())
+
+    start = time.perf_counter()
+    await asyncio.gather(*[ping(session) for session in sessions])
+    rps = SESSIONS * REQUESTS / (time.perf_counter() - start)
+
+    location = raw.types.InputDocumentFileLocation(id=0, access_hash=0, file_reference=b"", thumb_size="")
+
+    start = time.perf_counter()
+
+    for i in range(CHUNKS):
+        await sessions[0].send(
+            raw.functions.upload.GetFile(location=location, offset=i * CHUNK_SIZE, limit=CHUNK_SIZE)
+        )
+
+    throughput = CHUNKS / (time.perf_counter() - start)
+
+    await asyncio.gather(*[session.stop() for session in sessions])
+
+    print(
+        f"mode {mode}: {SESSIONS} connects in {connect * 1000:.1f}ms (worst loop stall {lag * 1000:.1f}ms), "
+        f"{rps:.0f} rpc/s, {throughput:.1f} MiB/s"
+    )
+
+
+async def main():
+    server = FakeServer(handler=handler)
+    await server.start()
+
+    # The first round warms up the loop and the server
+    for mode in (1, 6, 1, 6):
+        await run(mode, server.port)
+
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
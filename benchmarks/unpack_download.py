@@ -0,0 +1,61 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput and peak memory of decrypting and parsing 1 MiB upload.File responses (one media download chunk).
+
+Usage: python -m benchmarks.unpack_download
+"""
+
+import os
+import time
+import tracemalloc
+
+from pyrogram import raw
+from pyrogram.crypto import mtproto
+from pyrogram.raw.core import Message
+from .crypto_inline import AUTH_KEY, AUTH_KEY_ID, SESSION_ID, server_pack
+
+CHUNK_SIZE = 1024 * 1024
+CHUNKS = 64
+
+
+def main():
+    body = raw.types.RpcResult(
+        req_msg_id=1,
+        result=raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=os.urandom(CHUNK_SIZE))
+    )
+    packet = server_pack(Message(body, 2 ** 32 + 1, 1, len(body)))
+
+    start = time.perf_counter()
+
+    for _ in range(CHUNKS):
+        mtproto.unpack(packet, SESSION_ID, AUTH_KEY, AUTH_KEY_ID)
+
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    mtproto.unpack(packet, SESSION_ID, AUTH_KEY, AUTH_KEY_ID)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"throughput: {CHUNKS * CHUNK_SIZE / elapsed / 1024 / 1024:8.1f} MiB/s")
+    print(f"peak memory per 1 MiB chunk: {peak / 1024 / 1024:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
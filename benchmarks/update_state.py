@@ -0,0 +1,102 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+"""Throughput of Client.handle_updates for a busy supergroup with update state persistence enabled.
+
+"write-through" commits the state of every update to the session file before handling it, as handle_updates did
+before the update state tracker existed; "write-behind" records it in the tracker, which commits the latest state
+of each channel once per flush.
+
+Usage: python -m benchmarks.update_state
+"""
+
+import asyncio
+import tempfile
+import time
+from io import BytesIO
+
+from pyrogram import Client, raw, utils
+from pyrogram.raw.core import TLObject
+
+UPDATES = 2000
+CHANNEL_ID = 1234567890
+USER_ID = 777000
+
+
+def make_updates(pts: int) -> raw.types.Updates:
+    updates = raw.types.Updates(
+        updates=[
+            raw.types.UpdateNewChannelMessage(
+                message=raw.types.Message(
+                    id=pts,
+                    peer_id=raw.types.PeerChannel(channel_id=CHANNEL_ID),
+                    from_id=raw.types.PeerUser(user_id=USER_ID),
+                    date=pts,
+                    message="hello"
+                ),
+                pts=pts,
+                pts_count=1
+            )
+        ],
+        users=[raw.types.User(id=USER_ID, access_hash=1, first_name="User")],
+        chats=[
+            raw.types.Channel(
+                id=CHANNEL_ID, title="Group", photo=raw.types.ChatPhotoEmpty(), date=0, access_hash=1, megagroup=True
+            )
+        ],
+        date=pts,
+        seq=0
+    )
+
+    # Go through the wire format, like real updates do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(updates.write()))
+
+
+async def measure(workdir: str, write_behind: bool) -> float:
+    client = Client("benchmark", workdir=workdir, skip_updates=not write_behind)
+    await client.storage.open()
+
+    batches = [make_updates(pts) for pts in range(1, UPDATES + 1)]
+    channel_id = utils.get_channel_id(CHANNEL_ID)
+
+    start = time.perf_counter()
+
+    for updates in batches:
+        if not write_behind:
+            await client.storage.update_state((channel_id, updates.updates[0].pts, None, updates.date, updates.seq))
+
+        await client.handle_updates(updates)
+
+    await client.update_state_tracker.stop()
+
+    elapsed = time.perf_counter() - start
+
+    assert (await client.storage.update_state())[0][1] == UPDATES
+
+    await client.storage.delete()
+
+    return UPDATES / elapsed
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, write_behind in (("write-through", False), ("write-behind", True)):
+            print(f"{name:>13}: {await measure(workdir, write_behind):8.0f} updates/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
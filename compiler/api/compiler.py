@@ -22,6 +22,7 @@ import re
 import shutil
 from functools import partial
 from pathlib import Path
+from struct import calcsize
 from typing import NamedTuple, List, Tuple
 
 # from autoflake import fix_code
@@ -41,6 +42,8 @@ FLAGS_RE_3 = re.compile(r"flags(\d?):#")
 INT_RE = re.compile(r"int(\d+)")
 
 CORE_TYPES = ["int", "long", "int128", "int256", "double", "bytes", "string", "Bool", "true"]
+# Fixed-width core types, packed and unpacked with struct
+STRUCT_FORMATS = {"int": "i", "long": "q", "double": "d", "Bool": "I"}
 
 WARNING = """
 # # # # # # # # # # # # # # # # # # # # # # # #
@@ -50,6 +53,20 @@ WARNING = """
 # # # # # # # # # # # # # # # # # # # # # # # #
 """.strip()
 
+OBJECTS = """
+class Objects(dict):
+    \"\"\"Constructor ID -> class, imported the first time the ID is looked up.\"\"\"
+
+    def __missing__(self, key: int):
+        path, name = paths[key].rsplit(".", 1)
+        value = self[key] = getattr(import_module(path), name)
+
+        return value
+
+
+objects = Objects()
+""".lstrip()
+
 # noinspection PyShadowingBuiltins
 open = partial(open, encoding="utf-8")
 
@@ -153,6 +170,83 @@ def sort_args(args):
     return args + flags
 
 
+def get_struct(fmt: str, structs: dict) -> str:
+    """Name of the module level struct.Struct of *fmt*, added to *structs* (format -> name) when new."""
+    if fmt not in structs:
+        structs[fmt] = f"STRUCT_{len(structs)}"
+
+    return structs[fmt]
+
+
+def get_fixed_runs(ops: list) -> list:
+    """Merge consecutive ("fixed", format, value) operations into ("run", format, [values])."""
+    merged = []
+
+    for op in ops:
+        if op[0] == "fixed" and merged and merged[-1][0] == "run":
+            merged[-1] = ("run", merged[-1][1] + op[1], merged[-1][2] + [op[2]])
+        elif op[0] == "fixed":
+            merged.append(("run", op[1], [op[2]]))
+        else:
+            merged.append(op)
+
+    return merged
+
+
+def get_write_types(write_flags: list, write_ops: list, structs: dict) -> str:
+    parts = []
+
+    for op in get_fixed_runs(write_ops):
+        if op[0] == "run":
+            parts.append(("bytes", f"{get_struct('<' + op[1], structs)}.pack({', '.join(op[2])})"))
+        else:
+            parts.append(op)
+
+    lines = list(write_flags) + ([""] if write_flags else [])
+
+    if all(kind == "bytes" for kind, *_ in parts):
+        values = [value for _, value in parts]
+
+        if len(values) == 1:
+            lines.append(f"return {values[0]}")
+        else:
+            lines.append("return b\"\".join([")
+            lines.extend(f"    {value}," for value in values)
+            lines.append("])")
+    else:
+        lines.append("b = []")
+
+        for kind, *value in parts:
+            if kind == "bytes":
+                lines.append(f"b.append({value[0]})")
+            else:
+                lines.append(f"\nif {value[0]}:\n    b.append({value[1]})\n")
+
+        lines.append("return b\"\".join(b)")
+
+    return "\n        ".join("\n".join(lines).split("\n"))
+
+
+def get_read_types(read_ops: list, read_flags: list, structs: dict) -> str:
+    lines = []
+
+    for op in get_fixed_runs(read_ops):
+        if op[0] == "run":
+            fmt = "<" + op[1]
+            name = get_struct(fmt, structs)
+
+            if len(op[2]) == 1:
+                lines.append(f"{op[2][0]} = {name}.unpack(b.read({calcsize(fmt)}))[0]")
+            else:
+                lines.append(f"{', '.join(op[2])} = {name}.unpack(b.read({calcsize(fmt)}))")
+        else:
+            lines.append(op[1])
+
+    lines.extend(read_flags)
+
+    return "".join(f"{line}\n        " for line in lines)
+
+
 def remove_whitespaces(source: str) -> str:
     """Remove whitespaces from blank lines"""
     lines = source.split("\n")
@@ -215,9 +309,11 @@ def start(format: bool = False):
         schema = (f1.read() + f2.read() + f3.read()).splitlines()
 
     with open(HOME_PATH / "template/type.txt") as f1, \
-        open(HOME_PATH / "template/combinator.txt") as f2:
+        open(HOME_PATH / "template/combinator.txt") as f2, \
+        open(HOME_PATH / "template/namespace.txt") as f3:
         type_tmpl = f1.read()
         combinator_tmpl = f2.read()
+        namespace_tmpl = f3.read()
 
     with open(NOTICE_PATH, encoding="utf-8") as f:
         notice = []
@@ -452,13 +548,18 @@ def start(format: bool = False):
                              f"            :nosignatures:\n\n" \
                              f"            " + references
 
-        write_types = read_types = "" if c.has_flags else "# No flags\n        "
+        # Fields are laid out as write/read operations first, runs of fixed-width fields are then merged
+        # and packed or unpacked with a single precompiled struct
+        write_flags = []
+        write_ops = [("fixed", "I", "self.ID")]
+        read_ops = []
+        read_flags = []
 
         for arg_name, arg_type in c.args:
             flag = FLAGS_RE_2.match(arg_type)
 
             if re.match(r"flags\d?", arg_name) and arg_type == "#":
-                write_flags = []
+                write_flags.append(f"{arg_name} = 0")
 
                 for i in c.args:
                     flag = FLAGS_RE_2.match(i[1])
@@ -473,14 +574,8 @@ def start(format: bool = False):
                             write_flags.append(
                                 f"{arg_name} |= (1 << {flag.group(2)}) if self.{i[0]} is not None else 0")
 
-                write_flags = "\n        ".join([
-                    f"{arg_name} = 0",
-                    "\n        ".join(write_flags),
-                    f"b.write(Int({arg_name}))\n        "
-                ])
-
-                write_types += write_flags
-                read_types += f"\n        {arg_name} = Int.read(b)\n        "
+                write_ops.append(("fixed", "i", arg_name))
+                read_ops.append(("fixed", "i", arg_name))
 
                 continue
 
@@ -488,60 +583,64 @@ def start(format: bool = False):
                 number, index, flag_type = flag.groups()
 
                 if flag_type == "true":
-                    read_types += "\n        "
-                    read_types += f"{arg_name} = True if flags{number} & (1 << {index}) else False"
+                    read_flags.append(f"{arg_name} = True if flags{number} & (1 << {index}) else False")
                 elif flag_type in CORE_TYPES:
-                    write_types += "\n        "
-                    write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write({flag_type.title()}(self.{arg_name}))\n        "
-
-                    read_types += "\n        "
-                    read_types += f"{arg_name} = {flag_type.title()}.read(b) if flags{number} & (1 << {index}) else None"
+                    write_ops.append((
+                        "optional", f"self.{arg_name} is not None", f"{flag_type.title()}(self.{arg_name})"
+                    ))
+                    read_ops.append((
+                        "statement",
+                        f"{arg_name} = {flag_type.title()}.read(b) if flags{number} & (1 << {index}) else None"
+                    ))
                 elif "vector" in flag_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
-
-                    write_types += "\n        "
-                    write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
-                    )
-
-                    read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{}) if flags{} & (1 << {}) else []\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else "", number, index
-                    )
+                    core_type = f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
+
+                    # Same condition as the flag bit, so that empty vectors are left out along with their flag
+                    write_ops.append(("optional", f"self.{arg_name}", f"Vector(self.{arg_name}{core_type})"))
+                    read_ops.append((
+                        "statement",
+                        f"{arg_name} = TLObject.read(b{core_type}) if flags{number} & (1 << {index}) else []"
+                    ))
                 else:
-                    write_types += "\n        "
-                    write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
-
-                    read_types += "\n        "
-                    read_types += f"{arg_name} = TLObject.read(b) if flags{number} & (1 << {index}) else None\n        "
+                    write_ops.append(("optional", f"self.{arg_name} is not None", f"self.{arg_name}.write()"))
+                    read_ops.append((
+                        "statement",
+                        f"{arg_name} = TLObject.read(b) if flags{number} & (1 << {index}) else None"
+                    ))
             else:
-                if arg_type in CORE_TYPES:
-                    write_types += "\n        "
-                    write_types += f"b.write({arg_type.title()}(self.{arg_name}))\n        "
+                if arg_type in STRUCT_FORMATS:
+                    value = f"self.{arg_name}"
+
+                    if arg_type == "Bool":
+                        value = f"BOOL_TRUE if self.{arg_name} else BOOL_FALSE"
 
-                    read_types += "\n        "
-                    read_types += f"{arg_name} = {arg_type.title()}.read(b)\n        "
+                    write_ops.append(("fixed", STRUCT_FORMATS[arg_type], value))
+                    read_ops.append(("fixed", STRUCT_FORMATS[arg_type], arg_name))
+
+                    if arg_type == "Bool":
+                        read_ops.append(("statement", f"{arg_name} = {arg_name} == BOOL_TRUE"))
+                elif arg_type in CORE_TYPES:
+                    write_ops.append(("bytes", f"{arg_type.title()}(self.{arg_name})"))
+                    read_ops.append(("statement", f"{arg_name} = {arg_type.title()}.read(b)"))
                 elif "vector" in arg_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
+                    core_type = f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
 
-                    write_types += "\n        "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
-                    )
-
-                    read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{})\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
-                    )
+                    write_ops.append(("bytes", f"Vector(self.{arg_name}{core_type})"))
+                    read_ops.append(("statement", f"{arg_name} = TLObject.read(b{core_type})"))
                 else:
-                    write_types += "\n        "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
+                    write_ops.append(("bytes", f"self.{arg_name}.write()"))
+                    read_ops.append(("statement", f"{arg_name} = TLObject.read(b)"))
+
+        structs = {}
+        write_types = get_write_types(write_flags, write_ops, structs)
+        read_types = get_read_types(read_ops, read_flags, structs)
 
-                    read_types += "\n        "
-                    read_types += f"{arg_name} = TLObject.read(b)\n        "
+        if not c.has_flags:
+            read_types = "# No flags\n        " + read_types
+
+        structs = "\n".join(f'{name} = Struct("{fmt}")' for fmt, name in structs.items())
 
         slots = ", ".join([f'"{i[0]}"' for i in sorted_args])
         return_arguments = ", ".join([f"{i[0]}={i[0]}" for i in sorted_args])
@@ -558,7 +657,8 @@ def start(format: bool = False):
             fields=fields,
             read_types=read_types,
             write_types=write_types,
-            return_arguments=return_arguments
+            return_arguments=return_arguments,
+            structs=structs
         )
 
         directory = "types" if c.section == "types" else c.section
@@ -582,10 +682,13 @@ def start(format: bool = False):
 
         d[c.namespace].append(c.name)
 
-    for namespace, types in namespaces_to_types.items():
-        with open(DESTINATION_PATH / "base" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
+    for directory, namespaces in (
+        ("base", namespaces_to_types),
+        ("types", namespaces_to_constructors),
+        ("functions", namespaces_to_functions)
+    ):
+        for namespace, types in namespaces.items():
+            modules = {}
 
             for t in types:
                 module = t
@@ -593,48 +696,32 @@ def start(format: bool = False):
                 if module == "Updates":
                     module = "UpdatesT"
 
-                f.write(f"from .{snake(module)} import {t}\n")
+                modules[t] = f".{snake(module)}"
 
             if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_types))}")
-
-    for namespace, types in namespaces_to_constructors.items():
-        with open(DESTINATION_PATH / "types" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
-
-            for t in types:
-                module = t
-
-                if module == "Updates":
-                    module = "UpdatesT"
-
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_constructors))}\n")
-
-    for namespace, types in namespaces_to_functions.items():
-        with open(DESTINATION_PATH / "functions" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
-
-            for t in types:
-                module = t
-
-                if module == "Updates":
-                    module = "UpdatesT"
-
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_functions))}")
+                for n in filter(bool, namespaces):
+                    modules[n] = f".{n}"
+
+            with open(DESTINATION_PATH / directory / namespace / "__init__.py", "w") as f:
+                f.write(
+                    namespace_tmpl.format(
+                        notice=notice,
+                        warning=WARNING,
+                        imports="\n".join(
+                            f"    from . import {name}" if module == f".{name}"
+                            else f"    from {module} import {name}"
+                            for name, module in modules.items()
+                        ),
+                        modules="\n".join(f'    "{name}": "{module}",' for name, module in modules.items())
+                    )
+                )
 
     with open(DESTINATION_PATH / "all.py", "w", encoding="utf-8") as f:
         f.write(notice + "\n\n")
         f.write(WARNING + "\n\n")
+        f.write("from importlib import import_module\n\n")
         f.write(f"layer = {layer}\n\n")
-        f.write("objects = {")
+        f.write("paths = {")
 
         for c in combinators:
             f.write(f'\n    {c.id}: "pyrogram.raw.{c.section}.{c.qualname}",')
@@ -648,7 +735,8 @@ def start(format: bool = False):
         f.write('\n    0x3072cfa1: "pyrogram.raw.core.GzipPacked",')
         f.write('\n    0x5bb8e511: "pyrogram.raw.core.Message",')
 
-        f.write("\n}\n")
+        f.write("\n}\n\n\n")
+        f.write(OBJECTS)
 
 
 if "__main__" == __name__:
@@ -25,6 +25,7 @@ import platform
 import re
 import shutil
 import sys
+from collections import OrderedDict, deque
 from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from hashlib import sha256
@@ -32,32 +33,35 @@ from importlib import import_module
 from io import StringIO, BytesIO
 from mimetypes import MimeTypes
 from pathlib import Path
-from typing import Union, List, Optional, Callable, AsyncGenerator, Type, Tuple
+from typing import Union, List, Optional, Callable, AsyncGenerator, Awaitable, Type, Tuple
 
 import pyrogram
 from pyrogram import __version__, __license__
 from pyrogram import enums
 from pyrogram import raw
 from pyrogram import utils
-from pyrogram.crypto import aes
+from pyrogram.crypto import aes, rsa
 from pyrogram.errors import CDNFileHashMismatch
 from pyrogram.errors import (
     SessionPasswordNeeded,
     VolumeLocNotFound, ChannelPrivate,
-    BadRequest, AuthBytesInvalid,
+    BadRequest, AuthBytesInvalid, AuthKeyUnregistered,
     FloodWait, FloodPremiumWait,
     ChannelInvalid, PersistentTimestampInvalid, PersistentTimestampOutdated
 )
 from pyrogram.handlers.handler import Handler
 from pyrogram.methods import Methods
-from pyrogram.session import Auth, Session
+from pyrogram.session import Auth, Session, SessionPool
 from pyrogram.storage import Storage, FileStorage, MemoryStorage
+from pyrogram.storage.peer_cache import PeerCache
+from pyrogram.storage.update_state_tracker import UpdateStateTracker
 from pyrogram.types import User, TermsOfService
 from pyrogram.utils import ainput
 from .connection import Connection
 from .connection.transport import TCP, TCPAbridged, TCPFull
 from .dispatcher import Dispatcher
 from .file_id import FileId, FileType, ThumbnailSource
+from .file_io import FileWriter, load_state, save_state, remove
 from .mime_types import mime_types
 from .parser import Parser
 from .session.internals import MsgId
@@ -198,10 +202,31 @@ class Client(Methods):
             Set the maximum size of the message cache.
             Defaults to 10000.
 
+        max_message_cache_bytes (``int``, *optional*):
+            Set the maximum amount of bytes of the message cache, counted as the wire size of the cached messages.
+            Parsed messages take several times their wire size in memory, unless *compact_message_cache* is True.
+            Defaults to None (no limit).
+
+        max_message_cache_chat_size (``int``, *optional*):
+            Set the maximum amount of messages of the same chat in the message cache, so that a busy chat does not
+            evict the messages of all the other ones.
+            Defaults to None (no limit).
+
+        compact_message_cache (``bool``, *optional*):
+            Pass True to keep the cached messages as the raw bytes they were parsed from, together with the users and
+            chats they mention, and to parse them again when they are needed.
+            Rehydrated messages have no replied or pinned message attached.
+            Defaults to False.
+
         max_business_user_connection_cache_size (``int``, *optional*):
-            Set the maximum size of the message cache.
+            Set the maximum size of the business user connection cache.
             Defaults to 10000.
 
+        max_peer_cache_size (``int``, *optional*):
+            Set the maximum number of peers kept in memory in front of the session storage, used to resolve peers
+            without querying the storage and to skip rewriting the peers that did not change.
+            Defaults to 100000.
+
         storage_engine (:obj:`~pyrogram.storage.Storage`, *optional*):
             Pass an instance of your own implementation of session storage engine.
             Useful when you want to store your session in databases like Mongo, Redis, etc.
@@ -223,6 +248,38 @@ class Client(Methods):
             Set the number of replies to be fetched when parsing the :obj:`~pyrogram.types.Message` object. Defaults to 1.
             :doc:`More on Errors <../../api/errors/index>`
 
+        crypto_executor_workers (``int``, *optional*):
+            Number of threads used to encrypt and decrypt MTProto packets bigger than *crypto_inline_threshold*.
+            Defaults to ``os.cpu_count()``.
+
+        crypto_inline_threshold (``int``, *optional*):
+            Size in bytes up to which MTProto packets are encrypted and decrypted directly in the event loop,
+            skipping the round-trip to the crypto executor. Pass 0 to always use the executor.
+            The same threshold applies to the AES-CTR layer of the obfuscated transports.
+            Received packets are handled in order whatever their size.
+            Defaults to 2048.
+
+        connection_mode (``int``, *optional*):
+            Transport used to talk to Telegram, see ``Connection.MODES``. Modes 0-4 use a blocking socket (TCPFull,
+            TCPAbridged, TCPIntermediate, TCPAbridgedO, TCPIntermediateO); modes 5-9 are the same framings on a
+            buffered event loop transport, which connects and performs the proxy handshake without threads and
+            coalesces writes. Defaults to 3.
+
+        download_inflight_requests (``int``, *optional*):
+            Number of file chunk requests kept in flight while downloading a file. Chunks are still yielded in
+            order, at most this many megabytes are buffered ahead of the consumer. Pass 1 to fetch one chunk at a
+            time. Defaults to 4.
+
+        max_upload_sessions (``int``, *optional*):
+            Maximum number of media sessions kept open per DC for uploads. Big files are uploaded through all of
+            them, small files through one. Idle sessions are closed after a few minutes. Defaults to 3.
+
+        sharded_updates (``bool``, *optional*):
+            Pass True to spread incoming updates over *workers* queues by chat: the updates of a chat are handled
+            one at a time and in order, while different chats are handled in parallel, so a slow handler only
+            delays its own chat. Per-queue metrics are available from ``client.dispatcher.get_shard_metrics()``.
+            Defaults to False.
+
     """
 
     APP_VERSION = f"Pyrogram {__version__}"
@@ -246,6 +303,23 @@ class Client(Methods):
 
     MAX_CONCURRENT_TRANSMISSIONS = 1
     MAX_CACHE_SIZE = 10000
+    MAX_PEER_CACHE_SIZE = 100000
+
+    CRYPTO_EXECUTOR_WORKERS = os.cpu_count() or 1
+    CRYPTO_INLINE_THRESHOLD = 2048
+    CONNECTION_MODE = 3
+    DOWNLOAD_INFLIGHT_REQUESTS = 4
+    MAX_UPLOAD_SESSIONS = 3
+    FILE_IO_WORKERS = 4
+
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    # Save the progress of disk downloads every this many chunks, so that they can be resumed
+    DOWNLOAD_STATE_INTERVAL = 8
+    # The errors without index share their class name with the indexed ones, which shadow them in pyrogram.errors
+    FILE_REFERENCE_ERRORS = (
+        "FILE_REFERENCE_EXPIRED", "FILE_REFERENCE_INVALID",
+        "FILE_REFERENCE_X_EXPIRED", "FILE_REFERENCE_X_INVALID"
+    )
 
     mimetypes = MimeTypes()
     mimetypes.readfp(StringIO(mime_types))
@@ -281,12 +355,22 @@ class Client(Methods):
         hide_password: bool = False,
         max_concurrent_transmissions: int = MAX_CONCURRENT_TRANSMISSIONS,
         max_message_cache_size: int = MAX_CACHE_SIZE,
+        max_message_cache_bytes: int = None,
+        max_message_cache_chat_size: int = None,
+        compact_message_cache: bool = False,
         max_business_user_connection_cache_size: int = MAX_CACHE_SIZE,
+        max_peer_cache_size: int = MAX_PEER_CACHE_SIZE,
         storage_engine: Storage = None,
         no_joined_notifications: bool = False,
         client_platform: enums.ClientPlatform = enums.ClientPlatform.OTHER,
         link_preview_options: "types.LinkPreviewOptions" = None,
         fetch_replies: int = 1,
+        crypto_executor_workers: int = CRYPTO_EXECUTOR_WORKERS,
+        crypto_inline_threshold: int = CRYPTO_INLINE_THRESHOLD,
+        connection_mode: int = CONNECTION_MODE,
+        download_inflight_requests: int = DOWNLOAD_INFLIGHT_REQUESTS,
+        max_upload_sessions: int = MAX_UPLOAD_SESSIONS,
+        sharded_updates: bool = False,
         _un_docu_gnihts: List = []
     ):
         super().__init__()
@@ -320,14 +404,26 @@ class Client(Methods):
         self.hide_password = hide_password
         self.max_concurrent_transmissions = max_concurrent_transmissions
         self.max_message_cache_size = max_message_cache_size
+        self.max_message_cache_bytes = max_message_cache_bytes
+        self.max_message_cache_chat_size = max_message_cache_chat_size
+        self.compact_message_cache = compact_message_cache
         self.max_business_user_connection_cache_size = max_business_user_connection_cache_size
+        self.max_peer_cache_size = max_peer_cache_size
         self.no_joined_notifications = no_joined_notifications
         self.client_platform = client_platform
         self._un_docu_gnihts = _un_docu_gnihts
         self.link_preview_options = link_preview_options
         self.fetch_replies = fetch_replies
+        self.crypto_executor_workers = crypto_executor_workers
+        self.crypto_inline_threshold = crypto_inline_threshold
+        self.connection_mode = connection_mode
+        self.download_inflight_requests = download_inflight_requests
+        self.max_upload_sessions = max_upload_sessions
+        self.sharded_updates = sharded_updates
 
         self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="Handler")
+        self.crypto_executor = ThreadPoolExecutor(self.crypto_executor_workers, thread_name_prefix="CryptoWorker")
+        self.file_io_executor = ThreadPoolExecutor(self.FILE_IO_WORKERS, thread_name_prefix="FileIOWorker")
 
         if self.session_string:
             self.storage = MemoryStorage(self.name, self.session_string)
@@ -338,6 +434,9 @@ class Client(Methods):
         else:
             self.storage = FileStorage(self.name, self.WORKDIR)
 
+        self.update_state_tracker = UpdateStateTracker(self.storage)
+        self.peer_cache = PeerCache(self.storage, self.max_peer_cache_size)
+
         self.dispatcher = Dispatcher(self)
         self.rnd_id = MsgId
         self.parser = Parser(self)
@@ -345,6 +444,9 @@ class Client(Methods):
 
         self.media_sessions = {}
         self.media_sessions_lock = asyncio.Lock()
+        self.upload_pools = {}
+        self.cdn_pools = {}
+        self.cdn_public_keys = None
 
         self.save_file_semaphore = asyncio.Semaphore(self.max_concurrent_transmissions)
         self.get_file_semaphore = asyncio.Semaphore(self.max_concurrent_transmissions)
@@ -359,7 +461,14 @@ class Client(Methods):
         # TODO: fix conditions here
         self.me: Optional[User] = None
 
-        self.message_cache = Cache(self.max_message_cache_size)
+        self.message_cache = Cache(
+            self.max_message_cache_size,
+            max_bytes=self.max_message_cache_bytes,
+            max_group_size=self.max_message_cache_chat_size,
+            unpack=functools.partial(utils.unpack_message, self)
+        )
+        # (chat id, depth) -> reply message ids to fetch together and their result, see utils.get_reply_messages
+        self.reply_message_batches = {}
         self.business_user_connection_cache = Cache(self.max_business_user_connection_cache_size)
 
         # Sometimes, for some reason, the server will stop sending updates and will only respond to pings.
@@ -604,7 +713,7 @@ class Client(Methods):
 
             parsed_peers.append((peer_id, access_hash, peer_type, usernames, phone_number))
 
-        await self.storage.update_peers(parsed_peers)
+        self.peer_cache.update_peers(parsed_peers)
 
         return is_min
 
@@ -633,7 +742,7 @@ class Client(Methods):
                 pts_count = getattr(update, "pts_count", None)
 
                 if pts and not self.skip_updates:
-                    await self.storage.update_state(
+                    self.update_state_tracker.set(
                         (
                             utils.get_channel_id(channel_id) if channel_id else 0,
                             pts,
@@ -675,7 +784,7 @@ class Client(Methods):
                 self.dispatcher.updates_queue.put_nowait((update, users, chats))
         elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
             if not self.skip_updates:
-                await self.storage.update_state(
+                self.update_state_tracker.set(
                     (
                         0,
                         updates.pts,
@@ -712,7 +821,7 @@ class Client(Methods):
             log.info(updates)
 
     async def recover_gaps(self) -> Tuple[int, int]:
-        states = await self.storage.update_state()
+        states = await self.update_state_tracker.get()
 
         message_updates_counter = 0
         other_updates_counter = 0
@@ -795,7 +904,7 @@ class Client(Methods):
                 if isinstance(diff, (raw.types.updates.Difference, raw.types.updates.ChannelDifference)):
                     break
 
-            await self.storage.update_state(id)
+            await self.update_state_tracker.delete(id)
 
         log.info("Recovered %s messages and %s updates.", message_updates_counter, other_updates_counter)
         return (message_updates_counter, other_updates_counter)
@@ -966,34 +1075,211 @@ class Client(Methods):
                 log.warning('[%s] No plugin loaded from "%s"', self.name, root)
 
     async def handle_download(self, packet):
-        file_id, directory, file_name, in_memory, file_size, progress, progress_args = packet
+        (
+            file_id, directory, file_name, in_memory, file_size, progress, progress_args, buffer,
+            refresh_file_id
+        ) = packet
+
+        run = functools.partial(self.loop.run_in_executor, self.file_io_executor)
+        chunk_size = self.DOWNLOAD_CHUNK_SIZE
+        temp_file_path = None
+        state_path = None
+        offset = 0
+
+        if buffer is not None:
+            file = buffer
+        elif in_memory:
+            file = BytesIO()
+        else:
+            temp_file_path = os.path.abspath(re.sub("\\\\", "/", os.path.join(directory, file_name))) + ".temp"
+
+            await run(functools.partial(os.makedirs, directory, exist_ok=True))
+
+            # Chunks already written by an interrupted download of the same file to the same path are kept and skipped
+            state_path = os.path.splitext(temp_file_path)[0] + ".download"
+            state_key = f"{file_id.media_id}:{file_id.file_type}:{file_id.thumbnail_source}:{file_id.thumbnail_size}"
+            state = await run(load_state, state_path)
+
+            if (
+                state
+                and state.get("key") == state_key
+                and state.get("file_size") == file_size
+                and state.get("temp_file") == temp_file_path
+                and await run(os.path.isfile, temp_file_path)
+            ):
+                offset = state["offset"]
+                file = await run(open, temp_file_path, "r+b")
+
+                log.info("Resuming the download of %s from %s bytes", file_id.media_id, offset)
+            else:
+                file = await run(open, temp_file_path, "wb")
 
-        os.makedirs(directory, exist_ok=True) if not in_memory else None
-        temp_file_path = os.path.abspath(re.sub("\\\\", "/", os.path.join(directory, file_name))) + ".temp"
-        file = BytesIO() if in_memory else open(temp_file_path, "wb")
+                if file_size:
+                    # Allocate the whole (sparse) file upfront, chunks are then written in place at their offsets
+                    await run(file.truncate, file_size)
+
+        writer = FileWriter(file, self.file_io_executor)
+        writer.size = writer.written = offset
+
+        async def save_download_state():
+            await writer.flush()
+            await run(save_state, state_path, {
+                "key": state_key,
+                "file_size": file_size,
+                "temp_file": temp_file_path,
+                # Only the chunks whose write completed, chunks are requested again from a multiple of chunk_size
+                "offset": writer.written - writer.written % chunk_size
+            })
 
         try:
-            async for chunk in self.get_file(file_id, file_size, 0, 0, progress, progress_args):
-                file.write(chunk)
+            while True:
+                try:
+                    async for chunk in self.get_file(
+                        file_id, file_size, 0, offset // chunk_size, progress, progress_args
+                    ):
+                        await writer.write(chunk, offset)
+                        offset += len(chunk)
+
+                        if state_path and offset % (chunk_size * self.DOWNLOAD_STATE_INTERVAL) == 0:
+                            await save_download_state()
+                except BadRequest as e:
+                    if e.ID not in self.FILE_REFERENCE_ERRORS or refresh_file_id is None:
+                        raise
+
+                    # Only one refresh per download, a fresh file reference doesn't expire right away
+                    file_id, refresh_file_id = await refresh_file_id(), None
+                    continue
+
+                break
+
+            await writer.flush()
+
+            if file_size and offset < file_size:
+                raise ConnectionError(f"Download interrupted at {offset} of {file_size} bytes")
+
+            if temp_file_path and writer.size != file_size:
+                await run(file.truncate, writer.size)
         except BaseException as e:
-            if not in_memory:
-                file.close()
-                os.remove(temp_file_path)
+            if temp_file_path:
+                try:
+                    await writer.flush()
+                except Exception:
+                    pass
+
+                # A failed write may have left holes anywhere in the file, the next download starts over
+                resumable = writer.written >= chunk_size and not writer.failed
+
+                if resumable and not isinstance(e, pyrogram.StopTransmission):
+                    try:
+                        await save_download_state()
+                    except Exception:
+                        pass
+
+                    await run(file.close)
+                else:
+                    await run(file.close)
+                    await run(remove, temp_file_path)
+                    await run(remove, state_path)
 
             if isinstance(e, asyncio.CancelledError):
                 raise e
 
             return None
         else:
-            if in_memory:
+            if buffer is not None:
+                return writer.buffer[:writer.size]
+            elif in_memory:
                 file.name = file_name
                 return file
             else:
-                file.close()
+                await run(file.close)
                 file_path = os.path.splitext(temp_file_path)[0]
-                shutil.move(temp_file_path, file_path)
+                await run(shutil.move, temp_file_path, file_path)
+                await run(remove, state_path)
                 return file_path
 
+    async def get_cdn_public_keys(self) -> dict:
+        """Fetch the public keys of the CDN DCs once and make them known to the auth key exchange."""
+        if self.cdn_public_keys is None:
+            cdn_config = await self.invoke(raw.functions.help.GetCdnConfig())
+            public_keys = {}
+
+            for cdn_public_key in cdn_config.public_keys:
+                public_key = rsa.load_public_key(cdn_public_key.public_key)
+                public_keys[rsa.get_fingerprint(public_key)] = public_key
+
+            rsa.server_public_keys.update(public_keys)
+            self.cdn_public_keys = public_keys
+
+        return self.cdn_public_keys
+
+    async def create_media_session(self, dc_id: int, is_cdn: bool = False, renew: bool = False) -> Session:
+        """Start a media session to *dc_id*, reusing the auth key stored for that DC.
+
+        A new key is negotiated (and authorized by importing the current authorization, unless *is_cdn*) only when
+        no key is stored yet, the DC doesn't know the stored one anymore or *renew* is True.
+        """
+        test_mode = await self.storage.test_mode()
+
+        if dc_id == await self.storage.dc_id():
+            session = Session(self, dc_id, await self.storage.auth_key(), test_mode, is_media=True)
+            await session.start()
+
+            return session
+
+        auth_key = None if renew else await self.storage.dc_auth_key(dc_id)
+
+        if auth_key is not None:
+            session = Session(self, dc_id, auth_key, test_mode, is_media=True, is_cdn=is_cdn)
+
+            try:
+                await session.start()
+            except AuthKeyUnregistered:
+                log.info("The stored auth key for DC%s is not valid anymore", dc_id)
+            else:
+                return session
+
+        await self.storage.dc_auth_key(dc_id, None)
+
+        if is_cdn:
+            await self.get_cdn_public_keys()
+
+        session = Session(
+            self, dc_id, await Auth(self, dc_id, test_mode).create(),
+            test_mode, is_media=True, is_cdn=is_cdn
+        )
+        await session.start()
+
+        if not is_cdn:
+            try:
+                for _ in range(3):
+                    exported_auth = await self.invoke(
+                        raw.functions.auth.ExportAuthorization(
+                            dc_id=dc_id
+                        )
+                    )
+
+                    try:
+                        await session.invoke(
+                            raw.functions.auth.ImportAuthorization(
+                                id=exported_auth.id,
+                                bytes=exported_auth.bytes
+                            )
+                        )
+                    except AuthBytesInvalid:
+                        continue
+                    else:
+                        break
+                else:
+                    raise AuthBytesInvalid
+            except BaseException:
+                await session.stop()
+                raise
+
+        await self.storage.dc_auth_key(dc_id, session.auth_key)
+
+        return session
+
     async def get_file(
         self,
         file_id: FileId,
@@ -1043,64 +1329,198 @@ class Client(Methods):
                     thumb_size=file_id.thumbnail_size
                 )
 
-            current = 0
             total = abs(limit) or (1 << 31) - 1
-            chunk_size = 1024 * 1024
+            chunk_size = self.DOWNLOAD_CHUNK_SIZE
             offset_bytes = abs(offset) * chunk_size
 
             dc_id = file_id.dc_id
+            cdn_pool = None
+            hash_requests = {}  # type: dict[int, asyncio.Task]
 
             try:
                 session = self.media_sessions.get(dc_id)
                 if not session:
-                    session = self.media_sessions[dc_id] = Session(
-                        self, dc_id,
-                        await Auth(self, dc_id, await self.storage.test_mode()).create()
-                        if dc_id != await self.storage.dc_id()
-                        else await self.storage.auth_key(),
-                        await self.storage.test_mode(),
-                        is_media=True
+                    session = self.media_sessions[dc_id] = await self.create_media_session(dc_id)
+
+                try:
+                    r = await session.invoke(
+                        raw.functions.upload.GetFile(
+                            location=location,
+                            offset=offset_bytes,
+                            limit=chunk_size
+                        ),
+                        sleep_threshold=self.sleep_threshold
+                    )
+                except AuthKeyUnregistered:
+                    if dc_id == await self.storage.dc_id():
+                        raise
+
+                    await session.stop()
+                    session = self.media_sessions[dc_id] = await self.create_media_session(dc_id, renew=True)
+
+                    r = await session.invoke(
+                        raw.functions.upload.GetFile(
+                            location=location,
+                            offset=offset_bytes,
+                            limit=chunk_size
+                        ),
+                        sleep_threshold=self.sleep_threshold
                     )
-                    await session.start()
 
-                    if dc_id != await self.storage.dc_id():
-                        for _ in range(3):
-                            exported_auth = await self.invoke(
-                                raw.functions.auth.ExportAuthorization(
-                                    dc_id=dc_id
+                # Number of chunks left to fetch, including the current one
+                parts = total
+
+                if file_size:
+                    parts = min(parts, -(-(file_size - offset_bytes) // chunk_size))
+
+                if isinstance(r, raw.types.upload.File):
+                    async def get_chunk(chunk_offset: int) -> bytes:
+                        r2 = await session.invoke(
+                            raw.functions.upload.GetFile(
+                                location=location,
+                                offset=chunk_offset,
+                                limit=chunk_size
+                            ),
+                            sleep_threshold=self.sleep_threshold
+                        )
+
+                        return r2.bytes
+
+                    chunks = self.get_chunks(get_chunk, offset_bytes, chunk_size, parts, first=r.bytes)
+                elif isinstance(r, raw.types.upload.FileCdnRedirect):
+                    pool = self.cdn_pools.get(r.dc_id)
+
+                    if pool is None:
+                        pool = self.cdn_pools[r.dc_id] = SessionPool(self, r.dc_id, 1, is_cdn=True)
+
+                    cdn_session, = await pool.acquire(1)
+                    cdn_pool = pool
+
+                    # Hashes of the file parts by offset, seeded by the redirect and filled by GetCdnFileHashes
+                    file_hashes = {h.offset: h for h in r.file_hashes}
+
+                    async def request_hashes(hashes_offset: int):
+                        try:
+                            for h in await session.invoke(
+                                raw.functions.upload.GetCdnFileHashes(
+                                    file_token=r.file_token,
+                                    offset=hashes_offset
                                 )
+                            ):
+                                file_hashes[h.offset] = h
+                        except BaseException:
+                            hash_requests.pop(hashes_offset, None)
+                            raise
+
+                    def hashes_end(hashes_offset: int) -> int:
+                        while hashes_offset in file_hashes and file_hashes[hashes_offset].limit:
+                            hashes_offset += file_hashes[hashes_offset].limit
+
+                        return hashes_offset
+
+                    async def get_hashes(chunk_offset: int) -> list:
+                        chunk_end = chunk_offset + chunk_size
+                        # The last chunk is cut short by the end of the file, there are no hashes past it
+                        hashes_limit = min(chunk_end, file_size) if file_size else chunk_end
+
+                        while True:
+                            hashes_offset = hashes_end(chunk_offset)
+
+                            if hashes_offset >= hashes_limit:
+                                break
+
+                            task = hash_requests.get(hashes_offset)
+
+                            if task is None:
+                                task = hash_requests[hashes_offset] = self.loop.create_task(
+                                    request_hashes(hashes_offset)
+                                )
+                            elif task.done():
+                                # Nothing past this offset, the file ends before the chunk does
+                                break
+
+                            # Other chunks may wait for the same request, don't cancel it on their behalf
+                            await asyncio.shield(task)
+
+                        # Ask for the hashes of the chunks that will be requested next before they are needed
+                        prefetch_offset = hashes_end(chunk_end)
+
+                        if (
+                            prefetch_offset < chunk_end + chunk_size * self.download_inflight_requests
+                            and not (file_size and prefetch_offset >= file_size)
+                            and prefetch_offset not in hash_requests
+                        ):
+                            hash_requests[prefetch_offset] = self.loop.create_task(request_hashes(prefetch_offset))
+
+                        return [
+                            h for h in file_hashes.values()
+                            if chunk_offset <= h.offset < chunk_end
+                        ]
+
+                    def decrypt_cdn_chunk(chunk: bytes, chunk_offset: int, hashes: list) -> bytes:
+                        # https://core.telegram.org/cdn#decrypting-files
+                        decrypted_chunk = aes.ctr256_decrypt(
+                            chunk,
+                            r.encryption_key,
+                            bytearray(
+                                r.encryption_iv[:-4]
+                                + (chunk_offset // 16).to_bytes(4, "big")
                             )
+                        )
+
+                        # https://core.telegram.org/cdn#verifying-files
+                        for h in hashes:
+                            if chunk_offset <= h.offset < chunk_offset + len(decrypted_chunk):
+                                cdn_chunk = decrypted_chunk[h.offset - chunk_offset: h.offset - chunk_offset + h.limit]
+                                CDNFileHashMismatch.check(
+                                    h.hash == sha256(cdn_chunk).digest(),
+                                    "h.hash == sha256(cdn_chunk).digest()"
+                                )
+
+                        return decrypted_chunk
 
-                            try:
-                                await session.invoke(
-                                    raw.functions.auth.ImportAuthorization(
-                                        id=exported_auth.id,
-                                        bytes=exported_auth.bytes
+                    async def get_chunk(chunk_offset: int) -> Optional[bytes]:
+                        # The hashes come from the main DC, fetch them while the CDN serves the chunk
+                        hashes = self.loop.create_task(get_hashes(chunk_offset))
+
+                        try:
+                            while True:
+                                r2 = await cdn_session.invoke(
+                                    raw.functions.upload.GetCdnFile(
+                                        file_token=r.file_token,
+                                        offset=chunk_offset,
+                                        limit=chunk_size
                                     )
                                 )
-                            except AuthBytesInvalid:
-                                continue
-                            else:
-                                break
-                        else:
-                            raise AuthBytesInvalid
 
-                r = await session.invoke(
-                    raw.functions.upload.GetFile(
-                        location=location,
-                        offset=offset_bytes,
-                        limit=chunk_size
-                    ),
-                    sleep_threshold=self.sleep_threshold
-                )
+                                if not isinstance(r2, raw.types.upload.CdnFileReuploadNeeded):
+                                    break
 
-                if isinstance(r, raw.types.upload.File):
-                    while True:
-                        chunk = r.bytes
+                                try:
+                                    for h in await session.invoke(
+                                        raw.functions.upload.ReuploadCdnFile(
+                                            file_token=r.file_token,
+                                            request_token=r2.request_token
+                                        )
+                                    ):
+                                        file_hashes[h.offset] = h
+                                except VolumeLocNotFound:
+                                    return None
+
+                            return await self.loop.run_in_executor(
+                                self.crypto_executor, decrypt_cdn_chunk, r2.bytes, chunk_offset, await hashes
+                            )
+                        finally:
+                            hashes.cancel()
 
+                    chunks = self.get_chunks(get_chunk, offset_bytes, chunk_size, parts)
+                else:
+                    return
+
+                try:
+                    async for chunk in chunks:
                         yield chunk
 
-                        current += 1
                         offset_bytes += chunk_size
 
                         if progress:
@@ -1117,104 +1537,71 @@ class Client(Methods):
                                 await func()
                             else:
                                 await self.loop.run_in_executor(self.executor, func)
+                finally:
+                    await chunks.aclose()
 
-                        if len(chunk) < chunk_size or current >= total:
-                            break
+                    for task in hash_requests.values():
+                        task.cancel()
 
-                        r = await session.invoke(
-                            raw.functions.upload.GetFile(
-                                location=location,
-                                offset=offset_bytes,
-                                limit=chunk_size
-                            )
-                        )
-
-                elif isinstance(r, raw.types.upload.FileCdnRedirect):
-                    cdn_session = Session(
-                        self, r.dc_id, await Auth(self, r.dc_id, await self.storage.test_mode()).create(),
-                        await self.storage.test_mode(), is_media=True, is_cdn=True
-                    )
+                    if cdn_pool:
+                        cdn_pool.release()
+            except pyrogram.StopTransmission:
+                raise
+            except BadRequest as e:
+                if e.ID in self.FILE_REFERENCE_ERRORS:
+                    raise
 
-                    try:
-                        await cdn_session.start()
+                log.exception(e)
+            except Exception as e:
+                log.exception(e)
 
-                        while True:
-                            r2 = await cdn_session.invoke(
-                                raw.functions.upload.GetCdnFile(
-                                    file_token=r.file_token,
-                                    offset=offset_bytes,
-                                    limit=chunk_size
-                                )
-                            )
+    async def get_chunks(
+        self,
+        get_chunk: Callable[[int], Awaitable[Optional[bytes]]],
+        offset: int,
+        chunk_size: int,
+        parts: int,
+        first: bytes = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Yield up to *parts* consecutive chunks starting at *offset*, in order.
+
+        Up to *download_inflight_requests* calls to *get_chunk* run ahead of the consumer. The generator stops
+        after a chunk shorter than *chunk_size* or when *get_chunk* returns None; requests still in flight are
+        cancelled. *first* is the already fetched chunk at *offset*, if any.
+        """
+        pending = deque()
 
-                            if isinstance(r2, raw.types.upload.CdnFileReuploadNeeded):
-                                try:
-                                    await session.invoke(
-                                        raw.functions.upload.ReuploadCdnFile(
-                                            file_token=r.file_token,
-                                            request_token=r2.request_token
-                                        )
-                                    )
-                                except VolumeLocNotFound:
-                                    break
-                                else:
-                                    continue
-
-                            chunk = r2.bytes
-
-                            # https://core.telegram.org/cdn#decrypting-files
-                            decrypted_chunk = aes.ctr256_decrypt(
-                                chunk,
-                                r.encryption_key,
-                                bytearray(
-                                    r.encryption_iv[:-4]
-                                    + (offset_bytes // 16).to_bytes(4, "big")
-                                )
-                            )
+        if first is not None:
+            pending.append(self.loop.create_future())
+            pending[0].set_result(first)
+            offset += chunk_size
+            # Don't speculatively request chunks past a short first one
+            parts = parts - 1 if len(first) == chunk_size else 0
 
-                            hashes = await session.invoke(
-                                raw.functions.upload.GetCdnFileHashes(
-                                    file_token=r.file_token,
-                                    offset=offset_bytes
-                                )
-                            )
+        try:
+            while True:
+                while parts > 0 and len(pending) < max(self.download_inflight_requests, 1):
+                    pending.append(self.loop.create_task(get_chunk(offset)))
+                    offset += chunk_size
+                    parts -= 1
 
-                            # https://core.telegram.org/cdn#verifying-files
-                            for i, h in enumerate(hashes):
-                                cdn_chunk = decrypted_chunk[h.limit * i: h.limit * (i + 1)]
-                                CDNFileHashMismatch.check(
-                                    h.hash == sha256(cdn_chunk).digest(),
-                                    "h.hash == sha256(cdn_chunk).digest()"
-                                )
+                if not pending:
+                    break
 
-                            yield decrypted_chunk
+                chunk = await pending.popleft()
 
-                            current += 1
-                            offset_bytes += chunk_size
+                if chunk is None:
+                    break
 
-                            if progress:
-                                func = functools.partial(
-                                    progress,
-                                    min(offset_bytes, file_size) if file_size != 0 else offset_bytes,
-                                    file_size,
-                                    *progress_args
-                                )
+                yield chunk
 
-                                if inspect.iscoroutinefunction(progress):
-                                    await func()
-                                else:
-                                    await self.loop.run_in_executor(self.executor, func)
+                if len(chunk) < chunk_size:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
 
-                            if len(chunk) < chunk_size or current >= total:
-                                break
-                    except Exception as e:
-                        raise e
-                    finally:
-                        await cdn_session.stop()
-            except pyrogram.StopTransmission:
-                raise
-            except Exception as e:
-                log.exception(e)
+            await asyncio.gather(*pending, return_exceptions=True)
 
     def guess_mime_type(self, filename: str) -> Optional[str]:
         return self.mimetypes.guess_type(filename)[0]
@@ -1224,19 +1611,143 @@ class Client(Methods):
 
 
 class Cache:
-    def __init__(self, capacity: int):
+    """Least recently used cache, with O(1) lookups, insertions and evictions.
+
+    Besides *capacity* entries, the cache can be bounded to *max_bytes*, counted as the wire size of the raw object
+    each entry was parsed from (or the length of the entries stored as bytes), and to *max_group_size* entries per
+    group, the group of a key being its first item (e.g. the chat id of a message).
+
+    Entries stored as bytes are packed objects: item access skips them, :meth:`get` rehydrates them with *unpack*.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_bytes: int = None,
+        max_group_size: int = None,
+        unpack: Callable[[bytes], Awaitable] = None
+    ):
         self.capacity = capacity
-        self.store = {}
+        self.max_bytes = max_bytes
+        self.max_group_size = max_group_size
+        self.unpack = unpack
+
+        self.store = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        # group -> its keys, least recently used first
+        self.groups = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    def __contains__(self, key):
+        return key in self.store
 
     def __getitem__(self, key):
-        return self.store.get(key, None)
+        value = self.store.get(key, None)
+
+        if value is None or isinstance(value, bytes):
+            self.misses += 1
+            return None
+
+        self.touch(key)
+        self.hits += 1
+
+        return value
 
     def __setitem__(self, key, value):
         if key in self.store:
-            del self.store[key]
+            self.remove(key)
 
         self.store[key] = value
 
-        if len(self.store) > self.capacity:
-            for _ in range(self.capacity // 2 + 1):
-                del self.store[next(iter(self.store))]
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            self.sizes[key] = size
+            self.bytes += size
+
+        if self.max_group_size is not None:
+            group = self.groups.setdefault(key[0], OrderedDict())
+            group[key] = None
+
+            if len(group) > self.max_group_size:
+                self.evict(next(iter(group)))
+
+        while len(self.store) > self.capacity or self.max_bytes is not None and self.bytes > self.max_bytes:
+            self.evict(next(iter(self.store)))
+
+    async def get(self, key):
+        """Same as item access, but packed entries are rehydrated. An entry that can't be is dropped, as a miss."""
+        value = self.store.get(key, None)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        if isinstance(value, bytes):
+            try:
+                unpacked = await self.unpack(value)
+            except Exception as e:
+                log.warning("Dropping cache entry %s that could not be unpacked: %s", key, e)
+
+                # It may have been replaced meanwhile
+                if self.store.get(key, None) is value:
+                    self.evict(key)
+
+                self.misses += 1
+                return None
+
+            if key in self.store:
+                self.touch(key)
+
+            self.hits += 1
+
+            return unpacked
+
+        self.touch(key)
+        self.hits += 1
+
+        return value
+
+    def touch(self, key):
+        self.store.move_to_end(key)
+
+        if self.max_group_size is not None:
+            self.groups[key[0]].move_to_end(key)
+
+    def remove(self, key):
+        del self.store[key]
+
+        if self.max_bytes is not None:
+            self.bytes -= self.sizes.pop(key)
+
+        if self.max_group_size is not None:
+            group = self.groups[key[0]]
+            del group[key]
+
+            if not group:
+                del self.groups[key[0]]
+
+    def evict(self, key):
+        self.remove(key)
+        self.evictions += 1
+
+    def clear(self):
+        self.store.clear()
+        self.sizes.clear()
+        self.bytes = 0
+        self.groups.clear()
+
+    @staticmethod
+    def sizeof(value) -> int:
+        if isinstance(value, bytes):
+            return len(value)
+
+        raw_value = getattr(value, "_raw", None)
+
+        return len(raw_value.write()) if raw_value is not None else sys.getsizeof(value)
@@ -18,6 +18,7 @@
 
 import asyncio
 import logging
+from concurrent.futures import Executor
 from typing import Optional
 
 from .transport import *
@@ -34,10 +35,26 @@ class Connection:
         1: TCPAbridged,
         2: TCPIntermediate,
         3: TCPAbridgedO,
-        4: TCPIntermediateO
+        4: TCPIntermediateO,
+        # Same framings on top of TCPBuffered (event loop connect and proxy handshake, coalesced writes)
+        5: TCPFullBuffered,
+        6: TCPAbridgedBuffered,
+        7: TCPIntermediateBuffered,
+        8: TCPAbridgedOBuffered,
+        9: TCPIntermediateOBuffered
     }
 
-    def __init__(self, dc_id: int, test_mode: bool, ipv6: bool, proxy: dict, media: bool = False, mode: int = 3):
+    def __init__(
+        self,
+        dc_id: int,
+        test_mode: bool,
+        ipv6: bool,
+        proxy: dict,
+        media: bool = False,
+        mode: int = 3,
+        crypto_executor: Executor = None,
+        crypto_inline_threshold: int = None
+    ):
         self.dc_id = dc_id
         self.test_mode = test_mode
         self.ipv6 = ipv6
@@ -45,6 +62,9 @@ class Connection:
         self.media = media
         self.address = DataCenter(dc_id, test_mode, ipv6, media)
         self.mode = self.MODES.get(mode, TCPAbridged)
+        # Used by the obfuscated transports for their AES-CTR layer
+        self.crypto_executor = crypto_executor
+        self.crypto_inline_threshold = crypto_inline_threshold
 
         self.protocol = None  # type: TCP
 
@@ -52,6 +72,12 @@ class Connection:
         for i in range(Connection.MAX_RETRIES):
             self.protocol = self.mode(self.ipv6, self.proxy)
 
+            if self.crypto_executor is not None:
+                self.protocol.crypto_executor = self.crypto_executor
+
+            if self.crypto_inline_threshold is not None:
+                self.protocol.crypto_inline_threshold = self.crypto_inline_threshold
+
             try:
                 log.info("Connecting...")
                 await self.protocol.connect(self.address)
@@ -22,3 +22,7 @@ from .tcp_abridged_o import TCPAbridgedO
 from .tcp_full import TCPFull
 from .tcp_intermediate import TCPIntermediate
 from .tcp_intermediate_o import TCPIntermediateO
+from .tcp_buffered import (
+    TCPBuffered, TCPFullBuffered, TCPAbridgedBuffered, TCPIntermediateBuffered, TCPAbridgedOBuffered,
+    TCPIntermediateOBuffered
+)
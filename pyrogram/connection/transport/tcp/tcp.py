@@ -22,6 +22,7 @@ import logging
 import socket
 import time
 from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Optional
 
 try:
     import socks
@@ -38,6 +39,8 @@ log = logging.getLogger(__name__)
 
 class TCP:
     TIMEOUT = 10
+    # Slowest rate, in bytes per second, a frame is received at before recv gives up on it
+    MIN_RATE = 8 * 1024
 
     def __init__(self, ipv6: bool, proxy: dict):
         self.socket = None
@@ -105,21 +108,23 @@ class TCP:
             self.writer.write(data)
             await self.writer.drain()
 
-    async def recv(self, length: int = 0):
-        data = b""
+    async def read(self, length: int) -> Optional[bytes]:
+        # readexactly accumulates the whole frame in the stream buffer and hands it over with a single copy
+        try:
+            return await self.reader.readexactly(length)
+        except (OSError, asyncio.IncompleteReadError):
+            return None
 
-        while len(data) < length:
-            try:
-                chunk = await asyncio.wait_for(
-                    self.reader.read(length - len(data)),
-                    TCP.TIMEOUT
-                )
-            except (OSError, asyncio.TimeoutError):
-                return None
-            else:
-                if chunk:
-                    data += chunk
-                else:
-                    return None
+    async def recv_within(self, read: Awaitable[Optional[bytes]], length: int) -> Optional[bytes]:
+        """Await *read*, which receives *length* bytes at most, and return None if it doesn't finish in time.
+
+        The deadline grows with the length: a whole frame of up to 1 MiB can't be expected within TIMEOUT on a slow
+        link. Transports receive each frame in two reads, the header and then the rest, whose length is known.
+        """
+        try:
+            return await asyncio.wait_for(read, TCP.TIMEOUT + length / TCP.MIN_RATE)
+        except asyncio.TimeoutError:
+            return None
 
-        return data
+    async def recv(self, length: int = 0) -> Optional[bytes]:
+        return await self.recv_within(self.read(length), length)
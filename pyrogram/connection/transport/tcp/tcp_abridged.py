@@ -42,16 +42,19 @@ class TCPAbridged(TCP):
             + data
         )
 
+    async def read_length(self) -> Optional[bytes]:
+        length = await self.read(1)
+
+        if length == b"\x7f":
+            length = await self.read(3)
+
+        return length
+
     async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(1)
+        # The one or four bytes of the header are received within a single deadline
+        length = await self.recv_within(self.read_length(), 4)
 
         if length is None:
             return None
 
-        if length == b"\x7f":
-            length = await super().recv(3)
-
-            if length is None:
-                return None
-
         return await super().recv(int.from_bytes(length, "little") * 4)
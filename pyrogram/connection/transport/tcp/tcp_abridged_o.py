@@ -29,6 +29,8 @@ log = logging.getLogger(__name__)
 
 class TCPAbridgedO(TCP):
     RESERVED = (b"HEAD", b"POST", b"GET ", b"OPTI", b"\xee" * 4)
+    # Defaults for connections made without a client, Connection passes the ones of the client
+    CRYPTO_INLINE_THRESHOLD = 16 * 1024
 
     def __init__(self, ipv6: bool, proxy: dict):
         super().__init__(ipv6, proxy)
@@ -36,6 +38,9 @@ class TCPAbridgedO(TCP):
         self.encrypt = None
         self.decrypt = None
 
+        self.crypto_executor = pyrogram.crypto_executor
+        self.crypto_inline_threshold = self.CRYPTO_INLINE_THRESHOLD
+
     async def connect(self, address: tuple):
         await super().connect(address)
 
@@ -58,12 +63,16 @@ class TCPAbridgedO(TCP):
     async def send(self, data: bytes, *args):
         length = len(data) // 4
         data = (bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")) + data
-        payload = await self.loop.run_in_executor(pyrogram.crypto_executor, aes.ctr256_encrypt, data, *self.encrypt)
+        payload = (
+            aes.ctr256_encrypt(data, *self.encrypt)
+            if len(data) <= self.crypto_inline_threshold
+            else await self.loop.run_in_executor(self.crypto_executor, aes.ctr256_encrypt, data, *self.encrypt)
+        )
 
         await super().send(payload)
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(1)
+    async def read_length(self) -> Optional[bytes]:
+        length = await self.read(1)
 
         if length is None:
             return None
@@ -71,16 +80,28 @@ class TCPAbridgedO(TCP):
         length = aes.ctr256_decrypt(length, *self.decrypt)
 
         if length == b"\x7f":
-            length = await super().recv(3)
+            length = await self.read(3)
 
             if length is None:
                 return None
 
             length = aes.ctr256_decrypt(length, *self.decrypt)
 
+        return length
+
+    async def recv(self, length: int = 0) -> Optional[bytes]:
+        # The one or four bytes of the header are received within a single deadline
+        length = await self.recv_within(self.read_length(), 4)
+
+        if length is None:
+            return None
+
         data = await super().recv(int.from_bytes(length, "little") * 4)
 
         if data is None:
             return None
 
-        return await self.loop.run_in_executor(pyrogram.crypto_executor, aes.ctr256_decrypt, data, *self.decrypt)
+        if len(data) <= self.crypto_inline_threshold:
+            return aes.ctr256_decrypt(data, *self.decrypt)
+
+        return await self.loop.run_in_executor(self.crypto_executor, aes.ctr256_decrypt, data, *self.decrypt)
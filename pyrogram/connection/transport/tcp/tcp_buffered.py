@@ -0,0 +1,341 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import base64
+import ipaddress
+import logging
+import socket
+import struct
+from typing import Optional
+
+from .tcp import TCP
+from .tcp_abridged import TCPAbridged
+from .tcp_abridged_o import TCPAbridgedO
+from .tcp_full import TCPFull
+from .tcp_intermediate import TCPIntermediate
+from .tcp_intermediate_o import TCPIntermediateO
+
+log = logging.getLogger(__name__)
+
+
+class TCPBufferedProtocol(asyncio.BufferedProtocol):
+    """Receives straight into a reusable buffer and coalesces the writes issued within one loop iteration."""
+
+    BUFFER_SIZE = 64 * 1024
+    # Stop reading from the socket while this many bytes are waiting to be consumed
+    HIGH_WATER = 4 * 1024 * 1024
+
+    def __init__(self):
+        self.loop = asyncio.get_event_loop()
+        self.transport = None  # type: Optional[asyncio.Transport]
+
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self.start = 0  # First unread byte
+        self.end = 0  # End of the received data
+
+        self.waiter = None  # type: Optional[asyncio.Future]
+        self.wanted = 0
+        self.reading_paused = False
+
+        self.pending_writes = []
+        self.writable = asyncio.Event()
+        self.writable.set()
+
+        self.closed = False
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.closed = True
+        self.writable.set()
+        self.wake_up()
+
+    def eof_received(self) -> bool:
+        return False
+
+    def pause_writing(self):
+        self.writable.clear()
+
+    def resume_writing(self):
+        self.writable.set()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self.end == len(self.buffer):
+            if self.start:
+                self.compact()
+            else:
+                self.buffer.extend(bytes(len(self.buffer)))
+
+        return memoryview(self.buffer)[self.end:]
+
+    def buffer_updated(self, nbytes: int):
+        self.end += nbytes
+
+        if self.waiter is not None:
+            if self.end - self.start >= self.wanted:
+                self.wake_up()
+        elif self.end - self.start > self.HIGH_WATER and not self.reading_paused:
+            self.reading_paused = True
+            self.transport.pause_reading()
+
+    def wake_up(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+        self.waiter = None
+
+    def compact(self):
+        size = self.end - self.start
+        self.buffer[:size] = self.buffer[self.start:self.end]
+        self.start, self.end = 0, size
+
+    def reserve(self, length: int):
+        # Make room for a whole frame at once, so that it lands in a single contiguous region
+        if len(self.buffer) - self.start < length:
+            self.compact()
+
+            if len(self.buffer) < length:
+                self.buffer.extend(bytes(length - len(self.buffer)))
+
+    async def wait(self, length: int) -> bool:
+        while self.end - self.start < length:
+            if self.closed:
+                return False
+
+            if self.reading_paused:
+                self.reading_paused = False
+                self.transport.resume_reading()
+
+            self.wanted = length
+            self.waiter = self.loop.create_future()
+
+            await self.waiter
+
+        return True
+
+    async def read(self, length: int) -> Optional[bytes]:
+        self.reserve(length)
+
+        if not await self.wait(length):
+            return None
+
+        with memoryview(self.buffer) as view:
+            data = bytes(view[self.start:self.start + length])
+
+        self.start += length
+
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        return data
+
+    async def readuntil(self, separator: bytes) -> Optional[bytes]:
+        while True:
+            index = self.buffer.find(separator, self.start, self.end)
+
+            if index != -1:
+                return await self.read(index + len(separator) - self.start)
+
+            self.reserve(self.end - self.start + 1)
+
+            if not await self.wait(self.end - self.start + 1):
+                return None
+
+    def write(self, data: bytes):
+        if not self.pending_writes:
+            self.loop.call_soon(self.flush)
+
+        self.pending_writes.append(data)
+
+    def flush(self):
+        if not self.closed:
+            self.transport.writelines(self.pending_writes)
+
+        self.pending_writes.clear()
+
+
+class TCPBuffered(TCP):
+    """TCP connection built on :obj:`TCPBufferedProtocol`, without sockets blocking in executor threads.
+
+    Connecting (proxy handshake included) runs on the event loop and sending needs no lock: writes are queued to the
+    protocol in call order and only wait when the transport asks to pause writing.
+    """
+
+    def __init__(self, ipv6: bool, proxy: dict):
+        self.ipv6 = ipv6
+        self.proxy = proxy
+
+        self.protocol = None  # type: Optional[TCPBufferedProtocol]
+        self.loop = asyncio.get_event_loop()
+
+    async def connect(self, address: tuple):
+        self.protocol = TCPBufferedProtocol()
+
+        try:
+            await asyncio.wait_for(self.open(address), TCP.TIMEOUT)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Connection timed out") from None
+
+    async def open(self, address: tuple):
+        if not self.proxy:
+            await self.loop.create_connection(
+                lambda: self.protocol, *address,
+                family=socket.AF_INET6 if self.ipv6 else socket.AF_INET
+            )
+            return
+
+        hostname = self.proxy.get("hostname")
+        scheme = self.proxy.get("scheme").lower()
+
+        await self.loop.create_connection(lambda: self.protocol, hostname, self.proxy.get("port", None))
+
+        log.info(f"Using proxy {hostname}")
+
+        if scheme == "socks5":
+            await self.socks5_handshake(address)
+        elif scheme == "socks4":
+            await self.socks4_handshake(address)
+        elif scheme == "http":
+            await self.http_handshake(address)
+        else:
+            raise ValueError(f"Unsupported proxy scheme: {scheme}")
+
+    async def handshake_recv(self, length: int) -> bytes:
+        data = await self.protocol.read(length)
+
+        if data is None:
+            raise ConnectionError("The proxy closed the connection")
+
+        return data
+
+    async def socks5_handshake(self, address: tuple):
+        # https://datatracker.ietf.org/doc/html/rfc1928
+        username = self.proxy.get("username", None)
+        password = self.proxy.get("password", None)
+
+        self.protocol.write(b"\x05\x02\x00\x02" if username else b"\x05\x01\x00")
+        version, method = await self.handshake_recv(2)
+
+        if version != 5 or method == 0xFF:
+            raise ConnectionError("The SOCKS5 proxy refused all authentication methods")
+
+        if method == 2:
+            # https://datatracker.ietf.org/doc/html/rfc1929
+            username, password = username.encode(), (password or "").encode()
+            self.protocol.write(b"\x01" + bytes([len(username)]) + username + bytes([len(password)]) + password)
+
+            if (await self.handshake_recv(2))[1] != 0:
+                raise ConnectionError("SOCKS5 proxy authentication failed")
+
+        ip, port = address
+        ip = ipaddress.ip_address(ip)
+
+        self.protocol.write(
+            b"\x05\x01\x00"
+            + (b"\x04" if ip.version == 6 else b"\x01")
+            + ip.packed
+            + struct.pack(">H", port)
+        )
+
+        _, reply, _, address_type = await self.handshake_recv(4)
+
+        if reply != 0:
+            raise ConnectionError(f"The SOCKS5 proxy failed to connect (error {reply})")
+
+        # Skip the bound address and port
+        if address_type == 1:
+            await self.handshake_recv(4 + 2)
+        elif address_type == 4:
+            await self.handshake_recv(16 + 2)
+        else:
+            await self.handshake_recv((await self.handshake_recv(1))[0] + 2)
+
+    async def socks4_handshake(self, address: tuple):
+        ip, port = address
+        username = (self.proxy.get("username", None) or "").encode()
+
+        self.protocol.write(
+            b"\x04\x01"
+            + struct.pack(">H", port)
+            + ipaddress.IPv4Address(ip).packed
+            + username + b"\x00"
+        )
+
+        if (await self.handshake_recv(8))[1] != 0x5A:
+            raise ConnectionError("The SOCKS4 proxy failed to connect")
+
+    async def http_handshake(self, address: tuple):
+        ip, port = address
+        host = f"[{ip}]:{port}" if ":" in ip else f"{ip}:{port}"
+        request = f"CONNECT {host} HTTP/1.1\r\nHost: {host}\r\n"
+
+        username = self.proxy.get("username", None)
+
+        if username:
+            credentials = f"{username}:{self.proxy.get('password', None) or ''}".encode()
+            request += f"Proxy-Authorization: Basic {base64.b64encode(credentials).decode()}\r\n"
+
+        self.protocol.write((request + "\r\n").encode())
+
+        response = await self.protocol.readuntil(b"\r\n\r\n")
+
+        if response is None:
+            raise ConnectionError("The proxy closed the connection")
+
+        status = response.split(b"\r\n", 1)[0].split(b" ")
+
+        if len(status) < 2 or status[1] != b"200":
+            raise ConnectionError(f"The HTTP proxy failed to connect: {b' '.join(status).decode(errors='replace')}")
+
+    def close(self):
+        if self.protocol is not None and self.protocol.transport is not None:
+            self.protocol.transport.close()
+
+    async def send(self, data: bytes):
+        if self.protocol is None or self.protocol.closed:
+            raise ConnectionError("Connection lost")
+
+        self.protocol.write(data)
+
+        if not self.protocol.writable.is_set():
+            await self.protocol.writable.wait()
+
+    async def read(self, length: int) -> Optional[bytes]:
+        return await self.protocol.read(length)
+
+
+class TCPFullBuffered(TCPFull, TCPBuffered):
+    pass
+
+
+class TCPAbridgedBuffered(TCPAbridged, TCPBuffered):
+    pass
+
+
+class TCPIntermediateBuffered(TCPIntermediate, TCPBuffered):
+    pass
+
+
+class TCPAbridgedOBuffered(TCPAbridgedO, TCPBuffered):
+    pass
+
+
+class TCPIntermediateOBuffered(TCPIntermediateO, TCPBuffered):
+    pass
@@ -54,11 +54,8 @@ class TCPFull(TCP):
         if packet is None:
             return None
 
-        packet = length + packet
-        checksum = packet[-4:]
-        packet = packet[:-4]
-
-        if crc32(packet) != unpack("<I", checksum)[0]:
+        # Checksum the length and the packet in place instead of joining them into a new buffer first
+        if crc32(memoryview(packet)[:-4], crc32(length)) != unpack("<I", packet[-4:])[0]:
             return None
 
-        return packet[8:]
+        return packet[4:-4]
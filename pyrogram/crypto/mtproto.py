@@ -19,9 +19,10 @@
 from hashlib import sha256
 from io import BytesIO
 from os import urandom
+from typing import Union
 
 from pyrogram.errors import SecurityCheckMismatch
-from pyrogram.raw.core import Message, Long
+from pyrogram.raw.core import Message, TLObject, Int, Long
 from . import aes
 
 
@@ -51,50 +52,65 @@ def pack(message: Message, salt: int, session_id: bytes, auth_key: bytes, auth_k
 
 
 def unpack(
-    b: BytesIO,
+    packet: Union[bytes, bytearray, memoryview],
     session_id: bytes,
     auth_key: bytes,
     auth_key_id: bytes
 ) -> Message:
-    SecurityCheckMismatch.check(b.read(8) == auth_key_id, "b.read(8) == auth_key_id")
+    # Work on a view of the packet: slicing it doesn't copy the (possibly huge) encrypted payload
+    packet = memoryview(packet)
 
-    msg_key = b.read(16)
+    SecurityCheckMismatch.check(packet[:8] == auth_key_id, "packet[:8] == auth_key_id")
+
+    msg_key = bytes(packet[8:24])
     aes_key, aes_iv = kdf(auth_key, msg_key, False)
-    data = BytesIO(aes.ige256_decrypt(b.read(), aes_key, aes_iv))
-    data.read(8)  # Salt
+
+    # Decrypting is the only full-size copy made here
+    data = aes.ige256_decrypt(packet[24:], aes_key, aes_iv)
+
+    # https://core.telegram.org/mtproto/security_guidelines#checking-sha256-hash-value-of-msg-key
+    # 96 = 88 + 8 (incoming message)
+    msg_key_large = sha256(auth_key[96:96 + 32])
+    msg_key_large.update(data)
+    SecurityCheckMismatch.check(
+        msg_key == msg_key_large.digest()[8:24],
+        "msg_key == sha256(auth_key[96:96 + 32] + data).digest()[8:24]"
+    )
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-session-id
-    SecurityCheckMismatch.check(data.read(8) == session_id, "data.read(8) == session_id")
+    SecurityCheckMismatch.check(data[8:16] == session_id, "data[8:16] == session_id")
+
+    # BytesIO shares the decrypted buffer. Once it holds the only reference to it, truncating the padding away
+    # happens in place and the body can be parsed straight from it, without being copied into another buffer.
+    payload_length = len(data) - 32  # Skip salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
+    b = BytesIO(data)
+    del data
+
+    b.seek(16)
+    msg_id = Long.read(b)
+    seq_no = Int.read(b)
+    length = Int.read(b)
+
+    # https://core.telegram.org/mtproto/security_guidelines#checking-message-length
+    padding_length = payload_length - length
+    SecurityCheckMismatch.check(12 <= padding_length <= 1024, "12 <= len(padding) <= 1024")
+    SecurityCheckMismatch.check(payload_length % 4 == 0, "len(payload) % 4 == 0")
+
+    # https://core.telegram.org/mtproto/security_guidelines#checking-msg-id
+    SecurityCheckMismatch.check(msg_id % 2 != 0, "msg_id % 2 != 0")
+
+    b.truncate(32 + length)
 
     try:
-        message = Message.read(data)
+        return Message(TLObject.read(b), msg_id, seq_no, length)
     except KeyError as e:
         if e.args[0] == 0:
             raise ConnectionError(f"Received empty data. Check your internet connection.")
 
-        left = data.read().hex()
+        left = b.read().hex()
 
         left = [left[i:i + 64] for i in range(0, len(left), 64)]
         left = [[left[i:i + 8] for i in range(0, len(left), 8)] for left in left]
         left = "\n".join(" ".join(x for x in left) for left in left)
 
         raise ValueError(f"The server sent an unknown constructor: {hex(e.args[0])}\n{left}")
-
-    # https://core.telegram.org/mtproto/security_guidelines#checking-sha256-hash-value-of-msg-key
-    # 96 = 88 + 8 (incoming message)
-    SecurityCheckMismatch.check(
-        msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24],
-        "msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24]"
-    )
-
-    # https://core.telegram.org/mtproto/security_guidelines#checking-message-length
-    data.seek(32)  # Get to the payload, skip salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
-    payload = data.read()
-    padding = payload[message.length:]
-    SecurityCheckMismatch.check(12 <= len(padding) <= 1024, "12 <= len(padding) <= 1024")
-    SecurityCheckMismatch.check(len(payload) % 4 == 0, "len(payload) % 4 == 0")
-
-    # https://core.telegram.org/mtproto/security_guidelines#checking-msg-id
-    SecurityCheckMismatch.check(message.msg_id % 2 != 0, "message.msg_id % 2 != 0")
-
-    return message
@@ -16,7 +16,11 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import base64
 from collections import namedtuple
+from hashlib import sha1
+
+from pyrogram.raw.core import Bytes
 
 PublicKey = namedtuple("PublicKey", ["m", "e"])
 
@@ -257,3 +261,37 @@ def encrypt(data: bytes, fingerprint: int) -> bytes:
         server_public_keys[fingerprint].e,
         server_public_keys[fingerprint].m
     ).to_bytes(256, "big")
+
+
+def read_der(data: bytes, offset: int = 0) -> tuple:
+    """Read the DER element at *offset*, return its tag, its contents and the offset right after it."""
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset:offset + size], "big")
+        offset += size
+
+    return tag, data[offset:offset + length], offset + length
+
+
+def load_public_key(pem: str) -> PublicKey:
+    """Parse a PEM encoded PKCS #1 RSA public key, as found in help.CdnConfig."""
+    der = base64.b64decode("".join(line for line in pem.strip().splitlines() if not line.startswith("-----")))
+
+    _, sequence, _ = read_der(der)
+    _, modulus, offset = read_der(sequence)
+    _, exponent, _ = read_der(sequence, offset)
+
+    return PublicKey(int.from_bytes(modulus, "big"), int.from_bytes(exponent, "big"))
+
+
+def get_fingerprint(public_key: PublicKey) -> int:
+    """https://core.telegram.org/mtproto/auth_key#dh-exchange-initiation"""
+    data = b"".join(
+        Bytes(i.to_bytes((i.bit_length() + 7) // 8, "big"))
+        for i in (public_key.m, public_key.e)
+    )
+
+    return int.from_bytes(sha1(data).digest()[-8:], "little", signed=True)
@@ -20,9 +20,10 @@ import asyncio
 import inspect
 import logging
 from collections import OrderedDict
+from typing import List, Optional
 
 import pyrogram
-from pyrogram import errors, utils, raw
+from pyrogram import errors, filters, utils, raw
 from pyrogram.handlers import (
     MessageHandler, EditedMessageHandler,
 
@@ -68,9 +69,95 @@ from pyrogram.raw.types import (
 log = logging.getLogger(__name__)
 
 
+class DispatcherShard:
+    """Queue and metrics of one shard of the sharded dispatch mode."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.queue = asyncio.Queue()
+
+        self.processed = 0
+        self.queue_latency = 0.0
+        self.max_queue_latency = 0.0
+        self.handle_time = 0.0
+        self.max_handle_time = 0.0
+
+    def record(self, queue_latency: float, handle_time: float):
+        self.processed += 1
+        self.queue_latency += queue_latency
+        self.max_queue_latency = max(self.max_queue_latency, queue_latency)
+        self.handle_time += handle_time
+        self.max_handle_time = max(self.max_handle_time, handle_time)
+
+    @property
+    def metrics(self) -> dict:
+        processed = self.processed or 1
+
+        return {
+            "shard": self.index,
+            "queue_size": self.queue.qsize(),
+            "processed": self.processed,
+            "avg_queue_latency": self.queue_latency / processed,
+            "max_queue_latency": self.max_queue_latency,
+            "avg_handle_time": self.handle_time / processed,
+            "max_handle_time": self.max_handle_time
+        }
+
+
+class CommandRouter:
+    """Index of command handlers by the words their :meth:`~pyrogram.filters.command` filter accepts.
+
+    A message is routed by looking up its first word once, so that handlers of other commands are skipped
+    without running their filters. Commands and prefixes are read when the index is built.
+    """
+
+    def __init__(self, handlers: list):
+        # First word of a message (prefix and command) -> handlers that may accept it
+        self.routes = {}
+        # Handlers whose filters require a command
+        self.routed = set()
+
+        for handler in handlers:
+            if not callable(handler.filters):
+                continue
+
+            command = filters.get_command_filter(handler.filters)
+            keys = command.route_keys() if command is not None else None
+
+            if keys is None:
+                continue
+
+            self.routed.add(handler)
+
+            for key in keys:
+                self.routes.setdefault(key, set()).add(handler)
+
+    def route(self, update, username: str) -> Optional[set]:
+        """Routed handlers that may accept *update*, None when the update is not a message."""
+        message = filters.get_raw_message(update)
+
+        if message is None:
+            return None
+
+        token = filters.COMMAND_TOKEN_RE.match(getattr(message, "message", None) or "").group()
+        handlers = set()
+
+        for key in {token, token.lower()}:
+            handlers.update(self.routes.get(key, ()))
+
+            # Also try without the bot username suffix: /start@username or /startusername
+            if key.lower().endswith(username.lower()):
+                key = key[:len(key) - len(username)]
+                handlers.update(self.routes.get(key[:-1] if key.endswith("@") else key, ()))
+
+        return handlers
+
+
 class Dispatcher:
     NEW_MESSAGE_UPDATES = (UpdateNewMessage, UpdateNewChannelMessage, UpdateNewScheduledMessage, UpdateBotNewBusinessMessage)
     EDIT_MESSAGE_UPDATES = (UpdateEditMessage, UpdateEditChannelMessage, UpdateBotEditBusinessMessage)
+    # Updates whose message is cached by Message._parse, see cache_message
+    CACHED_MESSAGE_UPDATES = (UpdateNewMessage, UpdateNewChannelMessage, UpdateEditMessage, UpdateEditChannelMessage)
     DELETE_MESSAGES_UPDATES = (UpdateDeleteMessages, UpdateDeleteChannelMessages, UpdateBotDeleteBusinessMessage)
     CALLBACK_QUERY_UPDATES = (UpdateBotCallbackQuery, UpdateInlineBotCallbackQuery, UpdateBusinessBotCallbackQuery)
     CHAT_MEMBER_UPDATES = (UpdateChatParticipant, UpdateChannelParticipant, UpdateBotStopped,)
@@ -90,10 +177,14 @@ class Dispatcher:
         self.loop = asyncio.get_event_loop()
 
         self.handler_worker_tasks = []
-        self.locks_list = []
+        self.shards = []  # type: List[DispatcherShard]
 
         self.updates_queue = asyncio.Queue()
+        # Copy-on-write: add_handler and remove_handler replace the whole table, workers keep iterating the one
+        # they started with
         self.groups = OrderedDict()
+        # Handler type -> the handlers of self.groups that can receive it, see get_handlers
+        self.handlers_index = {}
 
         async def message_parser(update, users, chats):
             business_connection_id = getattr(update, "connection_id", None)
@@ -226,68 +317,151 @@ class Dispatcher:
 
         self.update_parsers = {key: value for key_tuple, value in self.update_parsers.items() for key in key_tuple}
 
+        # The handler type each parser produces, known before parsing so that updates nobody handles aren't parsed
+        self.update_handler_types = {
+            Dispatcher.NEW_MESSAGE_UPDATES: MessageHandler,
+            Dispatcher.EDIT_MESSAGE_UPDATES: EditedMessageHandler,
+            Dispatcher.DELETE_MESSAGES_UPDATES: DeletedMessagesHandler,
+            Dispatcher.CALLBACK_QUERY_UPDATES: CallbackQueryHandler,
+            Dispatcher.USER_STATUS_UPDATES: UserStatusHandler,
+            Dispatcher.BOT_INLINE_QUERY_UPDATES: InlineQueryHandler,
+            Dispatcher.POLL_UPDATES: PollHandler,
+            Dispatcher.CHOSEN_INLINE_RESULT_UPDATES: ChosenInlineResultHandler,
+            Dispatcher.CHAT_MEMBER_UPDATES: ChatMemberUpdatedHandler,
+            Dispatcher.CHAT_JOIN_REQUEST_UPDATES: ChatJoinRequestHandler,
+            Dispatcher.MESSAGE_BOT_NA_REACTION_UPDATES: MessageReactionUpdatedHandler,
+            Dispatcher.MESSAGE_BOT_A_REACTION_UPDATES: MessageReactionCountUpdatedHandler,
+            Dispatcher.SHIPPING_QUERY_UPDATES: ShippingQueryHandler,
+            Dispatcher.PRE_CHECKOUT_QUERY_UPDATES: PreCheckoutQueryHandler,
+            Dispatcher.NEW_STORY_UPDATES: StoryHandler,
+        }
+
+        self.update_handler_types = {
+            key: value for key_tuple, value in self.update_handler_types.items() for key in key_tuple
+        }
+
 
     async def start(self):
         if not self.client.no_updates:
-            for i in range(self.client.workers):
-                self.locks_list.append(asyncio.Lock())
+            if self.client.sharded_updates:
+                self.shards = [DispatcherShard(i) for i in range(self.client.workers)]
+
+                self.handler_worker_tasks.append(self.loop.create_task(self.shard_router()))
 
-                self.handler_worker_tasks.append(
-                    self.loop.create_task(self.handler_worker(self.locks_list[-1]))
-                )
+                for shard in self.shards:
+                    self.handler_worker_tasks.append(self.loop.create_task(self.shard_worker(shard)))
 
-            log.info("Started %s HandlerTasks", self.client.workers)
+                log.info("Started %s HandlerTasks (sharded by chat)", self.client.workers)
+            else:
+                for i in range(self.client.workers):
+                    self.handler_worker_tasks.append(self.loop.create_task(self.handler_worker()))
+
+                log.info("Started %s HandlerTasks", self.client.workers)
 
             if not self.client.skip_updates:
                 await self.client.recover_gaps()
 
     async def stop(self):
         if not self.client.no_updates:
-            for i in range(self.client.workers):
+            # The shard router forwards its stop signal to every shard
+            for i in range(1 if self.shards else self.client.workers):
                 self.updates_queue.put_nowait(None)
 
             for i in self.handler_worker_tasks:
                 await i
 
             self.handler_worker_tasks.clear()
-            self.groups.clear()
+            self.shards.clear()
+            self.groups = OrderedDict()
+            self.handlers_index = {}
 
             log.info("Stopped %s HandlerTasks", self.client.workers)
 
     def add_handler(self, handler, group: int):
-        async def fn():
-            for lock in self.locks_list:
-                await lock.acquire()
+        handler.compile_filters()
 
-            try:
-                if group not in self.groups:
-                    self.groups[group] = []
-                    self.groups = OrderedDict(sorted(self.groups.items()))
+        groups = OrderedDict((g, list(handlers)) for g, handlers in self.groups.items())
 
-                self.groups[group].append(handler)
-            finally:
-                for lock in self.locks_list:
-                    lock.release()
+        if group not in groups:
+            groups[group] = []
+            groups = OrderedDict(sorted(groups.items()))
+
+        groups[group].append(handler)
 
-        self.loop.create_task(fn())
+        self.groups = groups
+        self.handlers_index = {}
 
     def remove_handler(self, handler, group: int):
-        async def fn():
-            for lock in self.locks_list:
-                await lock.acquire()
+        if group not in self.groups:
+            raise ValueError(f"Group {group} does not exist. Handler was not removed.")
+
+        groups = OrderedDict((g, list(handlers)) for g, handlers in self.groups.items())
+        groups[group].remove(handler)
+
+        self.groups = groups
+        self.handlers_index = {}
+
+    def get_shard_metrics(self) -> List[dict]:
+        """Queue depth, processed updates, queue latency and handling time (in seconds) of each shard."""
+        return [shard.metrics for shard in self.shards]
+
+    @staticmethod
+    def get_chat_id(update) -> int:
+        """Id of the chat (or user) an update belongs to, 0 if there is none."""
+        peer = getattr(getattr(update, "message", None), "peer_id", None) or getattr(update, "peer", None)
+
+        if isinstance(peer, (raw.types.PeerUser, raw.types.PeerChat, raw.types.PeerChannel)):
+            return utils.get_peer_id(peer)
+
+        channel_id = getattr(update, "channel_id", None)
+
+        if channel_id:
+            return utils.get_channel_id(channel_id)
+
+        chat_id = getattr(update, "chat_id", None)
+
+        if isinstance(chat_id, int) and chat_id:
+            return -chat_id
+
+        user_id = getattr(update, "user_id", None)
+
+        return user_id if isinstance(user_id, int) else 0
+
+    async def shard_router(self):
+        while True:
+            packet = await self.updates_queue.get()
 
             try:
-                if group not in self.groups:
-                    raise ValueError(f"Group {group} does not exist. Handler was not removed.")
+                if packet is None:
+                    for shard in self.shards:
+                        shard.queue.put_nowait(None)
 
-                self.groups[group].remove(handler)
+                    break
+
+                shard = self.shards[self.get_chat_id(packet[0]) % len(self.shards)]
+                shard.queue.put_nowait((packet, self.loop.time()))
+            except Exception as e:
+                log.exception(e)
             finally:
-                for lock in self.locks_list:
-                    lock.release()
+                self.updates_queue.task_done()
 
-        self.loop.create_task(fn())
+    async def shard_worker(self, shard: DispatcherShard):
+        while True:
+            item = await shard.queue.get()
+
+            if item is None:
+                break
 
-    async def handler_worker(self, lock):
+            packet, queued_at = item
+            started_at = self.loop.time()
+
+            try:
+                await self.handle_update(packet)
+            finally:
+                shard.queue.task_done()
+                shard.record(started_at - queued_at, self.loop.time() - started_at)
+
+    async def handler_worker(self):
         while True:
             packet = await self.updates_queue.get()
 
@@ -295,55 +469,134 @@ class Dispatcher:
                 break
 
             try:
-                update, users, chats = packet
-                parser = self.update_parsers.get(type(update), None)
-
-                parsed_update, handler_type = (
-                    await parser(update, users, chats)
-                    if parser is not None
-                    else (None, type(None))
-                )
-
-                async with lock:
-                    for group in self.groups.values():
-                        for handler in group:
-                            args = None
-
-                            if isinstance(handler, handler_type):
-                                try:
-                                    if await handler.check(self.client, parsed_update):
-                                        args = (parsed_update,)
-                                except Exception as e:
-                                    log.exception(e)
-                                    continue
-
-                            elif isinstance(handler, RawUpdateHandler):
-                                args = (update, users, chats)
-
-                            if args is None:
-                                continue
-
-                            try:
-                                if inspect.iscoroutinefunction(handler.callback):
-                                    await handler.callback(self.client, *args)
-                                else:
-                                    await self.loop.run_in_executor(
-                                        self.client.executor,
-                                        handler.callback,
-                                        self.client,
-                                        *args
-                                    )
-                            except pyrogram.StopPropagation:
-                                raise
-                            except pyrogram.ContinuePropagation:
-                                continue
-                            except Exception as e:
-                                log.exception(e)
-
-                            break
-            except pyrogram.StopPropagation:
-                pass
-            except Exception as e:
-                log.exception(e)
+                await self.handle_update(packet)
             finally:
                 self.updates_queue.task_done()
+
+    def get_handlers(self, handler_type) -> tuple:
+        """Return the handlers an update of *handler_type* goes through, whether any of them needs it parsed and
+        the :class:`CommandRouter` of its command handlers.
+
+        Handlers are grouped as in :attr:`groups` (empty groups left out) and listed as
+        (handler, is_raw, is_coroutine) tuples. The result is cached until the handlers change.
+        """
+        handlers = self.handlers_index.get(handler_type)
+
+        if handlers is None:
+            groups = []
+            typed = []
+
+            for group in self.groups.values():
+                entries = []
+
+                for handler in group:
+                    if isinstance(handler, handler_type):
+                        typed.append(handler)
+                        entries.append((handler, False, inspect.iscoroutinefunction(handler.callback)))
+                    elif isinstance(handler, RawUpdateHandler):
+                        entries.append((handler, True, inspect.iscoroutinefunction(handler.callback)))
+
+                if entries:
+                    groups.append(entries)
+
+            handlers = self.handlers_index[handler_type] = (groups, bool(typed), CommandRouter(typed))
+
+        return handlers
+
+    def cache_message(self, update, users, chats):
+        """Put the message of an update that is not parsed in the message cache, packed, as parsing it would have.
+
+        Replies to it are then still found in the cache. Scheduled and business messages are left out, like polls.
+        """
+        message = update.message if isinstance(update, self.CACHED_MESSAGE_UPDATES) else None
+
+        if (
+            isinstance(message, (raw.types.Message, raw.types.MessageService))
+            and not isinstance(getattr(message, "media", None), raw.types.MessageMediaPoll)
+        ):
+            self.client.message_cache[(utils.get_peer_id(message.peer_id), message.id)] = utils.pack_message(
+                message, users, chats
+            )
+
+    def check_raw(self, handler, update, users, chats) -> bool:
+        try:
+            return handler.check_raw(self.client, update, users, chats)
+        except Exception as e:
+            log.exception(e)
+            return True
+
+    async def handle_update(self, packet):
+        try:
+            update, users, chats = packet
+            groups, needs_parsing, router = self.get_handlers(self.update_handler_types.get(type(update), type(None)))
+
+            if not groups:
+                self.cache_message(update, users, chats)
+                return
+
+            parsed_update = None
+            # Handlers whose filters may accept the update, parsing is skipped when there are none
+            accepted = set()
+
+            if needs_parsing:
+                routed = None
+
+                if router.routed:
+                    routed = router.route(update, (self.client.me and self.client.me.username) or "")
+
+                for group in groups:
+                    for handler, is_raw, _ in group:
+                        if is_raw:
+                            continue
+
+                        # Command handlers of other commands
+                        if routed is not None and handler in router.routed and handler not in routed:
+                            continue
+
+                        if self.check_raw(handler, update, users, chats):
+                            accepted.add(handler)
+
+                if accepted:
+                    parsed_update, _ = await self.update_parsers[type(update)](update, users, chats)
+
+            if not accepted:
+                self.cache_message(update, users, chats)
+
+            for group in groups:
+                for handler, is_raw, is_coroutine in group:
+                    if is_raw:
+                        args = (update, users, chats)
+                    elif handler not in accepted:
+                        continue
+                    else:
+                        try:
+                            if not await handler.check(self.client, parsed_update):
+                                continue
+                        except Exception as e:
+                            log.exception(e)
+                            continue
+
+                        args = (parsed_update,)
+
+                    try:
+                        if is_coroutine:
+                            await handler.callback(self.client, *args)
+                        else:
+                            await self.loop.run_in_executor(
+                                self.client.executor,
+                                handler.callback,
+                                self.client,
+                                *args
+                            )
+                    except pyrogram.StopPropagation:
+                        raise
+                    except pyrogram.ContinuePropagation:
+                        continue
+                    except Exception as e:
+                        log.exception(e)
+
+                    break
+        except pyrogram.StopPropagation:
+            pass
+        except Exception as e:
+            log.exception(e)
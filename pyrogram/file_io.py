@@ -0,0 +1,224 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+import io
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor
+from typing import BinaryIO, Optional, Union
+
+
+def get_fileno(fp: BinaryIO) -> Optional[int]:
+    """Return the descriptor of a file that supports positioned reads and writes, None for anything else.
+
+    Only plain files qualify: wrappers such as gzip, bz2 and lzma files also have a fileno(), but it is the one of the
+    underlying compressed file.
+    """
+    if not hasattr(os, "pread"):
+        return None
+
+    if isinstance(fp, (io.BufferedReader, io.BufferedWriter, io.BufferedRandom)):
+        fp = fp.raw
+
+    if not isinstance(fp, io.FileIO):
+        return None
+
+    try:
+        return fp.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def pread(fd: int, length: int, offset: int) -> bytes:
+    chunk = os.pread(fd, length, offset)
+
+    # Short reads only happen at the end of a regular file, but loop anyway to be on the safe side
+    while 0 < len(chunk) < length:
+        data = os.pread(fd, length - len(chunk), offset + len(chunk))
+
+        if not data:
+            break
+
+        chunk += data
+
+    return chunk
+
+
+def pwrite(fd: int, data: bytes, offset: int):
+    with memoryview(data) as view:
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+
+
+def load_state(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(path: str, state: dict):
+    # Replace the state atomically, a crash never leaves a half written one behind
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+
+    os.replace(path + ".tmp", path)
+
+
+def remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class FileReader:
+    """Read a file part by part, keeping up to READ_AHEAD reads running in the executor.
+
+    Real files are read with ``os.pread`` at the part offsets, so the reads can run in parallel. In-memory files
+    are read inline and any other file-like object is read one part at a time, in the executor.
+    """
+
+    READ_AHEAD = 4
+
+    def __init__(self, fp: BinaryIO, part_size: int, offset: int, executor: Executor):
+        self.fp = fp
+        self.part_size = part_size
+        self.offset = offset
+        self.executor = executor
+
+        self.fileno = get_fileno(fp)
+        self.pending = deque()
+        self.loop = asyncio.get_event_loop()
+
+        if self.fileno is None:
+            fp.seek(offset)
+
+    def submit(self):
+        if self.fileno is not None:
+            future = self.loop.run_in_executor(self.executor, pread, self.fileno, self.part_size, self.offset)
+        else:
+            future = self.loop.run_in_executor(self.executor, self.fp.read, self.part_size)
+
+        self.pending.append(future)
+        self.offset += self.part_size
+
+    async def read(self) -> bytes:
+        """Return the next part, an empty bytes object at the end of the file."""
+        if isinstance(self.fp, io.BytesIO):
+            return self.fp.read(self.part_size)
+
+        if not self.pending:
+            self.submit()
+
+        # A plain file object can't be read concurrently, only pread allows more than one read in flight
+        while self.fileno is not None and len(self.pending) < self.READ_AHEAD:
+            self.submit()
+
+        chunk = await self.pending.popleft()
+
+        if self.fileno is None and chunk:
+            self.submit()
+
+        return chunk
+
+    async def close(self):
+        await asyncio.gather(*self.pending, return_exceptions=True)
+        self.pending.clear()
+
+
+class FileWriter:
+    """Write chunks at given offsets into a file, a buffer or an in-memory file.
+
+    Writes to real files go through ``os.pwrite`` in the executor, with up to WRITE_BEHIND of them in flight.
+    Buffers and in-memory files are written inline, other file-like objects one write at a time, in the executor.
+    Call :meth:`flush` before using the result.
+
+    ``written`` is the end of the chunks that were written in order without any failure so far. Once a write failed, it
+    doesn't advance anymore and ``failed`` is True.
+    """
+
+    WRITE_BEHIND = 4
+
+    def __init__(self, file: Union[BinaryIO, bytearray, memoryview], executor: Executor):
+        self.file = file
+        self.executor = executor
+
+        self.buffer = memoryview(file).cast("B") if isinstance(file, (bytearray, memoryview)) else None
+        self.fileno = get_fileno(file) if self.buffer is None else None
+        self.pending = deque()
+        self.size = 0
+        self.written = 0
+        self.failed = False
+        self.loop = asyncio.get_event_loop()
+
+    def write_at(self, data: bytes, offset: int):
+        self.file.seek(offset)
+        self.file.write(data)
+
+    async def write(self, data: bytes, offset: int):
+        self.size = max(self.size, offset + len(data))
+
+        if self.buffer is not None:
+            if offset + len(data) > len(self.buffer):
+                raise ValueError(f"The buffer is too small ({len(self.buffer)} B) to hold {self.size} B")
+
+            self.buffer[offset:offset + len(data)] = data
+            self.confirm(offset + len(data))
+        elif isinstance(self.file, io.BytesIO):
+            self.write_at(data, offset)
+            self.confirm(offset + len(data))
+        else:
+            if self.fileno is not None:
+                future = self.loop.run_in_executor(self.executor, pwrite, self.fileno, data, offset)
+            else:
+                future = self.loop.run_in_executor(self.executor, self.write_at, data, offset)
+
+            self.pending.append((future, offset + len(data)))
+
+            if len(self.pending) >= (self.WRITE_BEHIND if self.fileno is not None else 1):
+                await self.wait()
+
+    def confirm(self, end: int):
+        if not self.failed:
+            self.written = max(self.written, end)
+
+    async def wait(self):
+        future, end = self.pending[0]
+
+        # Unlike awaiting the future, this leaves the write alone if the download is cancelled meanwhile
+        await asyncio.wait([future])
+        self.pending.popleft()
+
+        if future.cancelled() or future.exception() is not None:
+            self.failed = True
+            future.result()
+
+        self.confirm(end)
+
+    async def flush(self):
+        try:
+            while self.pending:
+                await self.wait()
+        finally:
+            await asyncio.gather(*(future for future, _ in self.pending), return_exceptions=True)
+            self.pending.clear()
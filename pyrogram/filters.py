@@ -16,12 +16,13 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import dis
 import inspect
 import re
 from typing import Any, Callable, List, Literal, Optional, Pattern, Union
 
 import pyrogram
-from pyrogram import enums
+from pyrogram import enums, raw, utils
 from pyrogram.types import (
     Message,
     CallbackQuery,
@@ -38,6 +39,14 @@ class Filter:
     async def __call__(self, client: "pyrogram.Client", update: Update) -> None:
         raise NotImplementedError
 
+    def check_raw(self, client: "pyrogram.Client", update: "raw.base.Update", users: dict, chats: dict) -> bool:
+        """Cheap check on the raw update, run before it is parsed.
+
+        Return False only when the filter would surely reject the parsed update, so that parsing it can be skipped.
+        When the raw update is not enough to tell, return True.
+        """
+        return True
+
     def __invert__(self) -> "InvertFilter":
         return InvertFilter(self)
 
@@ -48,6 +57,31 @@ class Filter:
         return OrFilter(self, other)
 
 
+def check_raw(flt, client: "pyrogram.Client", update: "raw.base.Update", users: dict, chats: dict) -> bool:
+    """Run the raw pre-check of *flt*, if it has one (plain callables don't)."""
+    func = getattr(flt, "check_raw", None)
+
+    return func(client, update, users, chats) if func is not None else True
+
+
+def get_raw_message(update: "raw.base.Update") -> Optional["raw.base.Message"]:
+    message = getattr(update, "message", None)
+
+    return message if isinstance(message, (raw.types.Message, raw.types.MessageService, raw.types.MessageEmpty)) else None
+
+
+def get_raw_peer(update: "raw.base.Update") -> Optional["raw.base.Peer"]:
+    message = get_raw_message(update)
+    peer = getattr(message, "peer_id", None) if message is not None else getattr(update, "peer", None)
+
+    return peer if isinstance(peer, (raw.types.PeerUser, raw.types.PeerChat, raw.types.PeerChannel)) else None
+
+
+def is_megagroup(peer: "raw.base.Peer", chats: dict) -> Optional[bool]:
+    """Whether a channel peer is a supergroup, None when the chat is unknown."""
+    return getattr(chats.get(peer.channel_id), "megagroup", None)
+
+
 class InvertFilter(Filter):
     def __init__(self, base) -> None:
         self.base: Any = base
@@ -68,6 +102,12 @@ class AndFilter(Filter):
         self.base = base
         self.other = other
 
+    def check_raw(self, client: "pyrogram.Client", update: "raw.base.Update", users: dict, chats: dict) -> bool:
+        return (
+            check_raw(self.base, client, update, users, chats)
+            and check_raw(self.other, client, update, users, chats)
+        )
+
     async def __call__(
         self, client: "pyrogram.Client", update: Update
     ) -> Union[Any, Literal[False]]:
@@ -97,6 +137,12 @@ class OrFilter(Filter):
         self.base = base
         self.other = other
 
+    def check_raw(self, client: "pyrogram.Client", update: "raw.base.Update", users: dict, chats: dict) -> bool:
+        return (
+            check_raw(self.base, client, update, users, chats)
+            or check_raw(self.other, client, update, users, chats)
+        )
+
     async def __call__(
         self, client: "pyrogram.Client", update: Update
     ) -> Union[Any, Literal[True]]:
@@ -121,6 +167,131 @@ class OrFilter(Filter):
         return x or y
 
 
+# Opcodes through which a coroutine can suspend: await, async for and async with.
+SUSPENDING_OPCODES = {"GET_AWAITABLE", "GET_AITER", "GET_ANEXT", "BEFORE_ASYNC_WITH", "SETUP_ASYNC_WITH"}
+
+
+def never_suspends(func: Callable) -> bool:
+    """Whether the coroutine function *func* runs to completion without ever awaiting."""
+    code = getattr(getattr(func, "__func__", func), "__code__", None)
+
+    if code is None:
+        return False
+
+    return not any(i.opname in SUSPENDING_OPCODES for i in dis.get_instructions(code))
+
+
+def run_inline(coro) -> Any:
+    """Drive a coroutine that never suspends to its result, without going through the event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+
+    coro.close()
+    raise RuntimeError("Filter coroutine suspended while evaluated inline")
+
+
+def flatten(flt, kind: type) -> List:
+    """Operands of a chain of *kind* (AndFilter or OrFilter) filters, left to right."""
+    if type(flt) is not kind:
+        return [flt]
+
+    return flatten(flt.base, kind) + flatten(flt.other, kind)
+
+
+def compile_node(flt) -> tuple:
+    """Compile a filter tree into ``(is_sync, func)``.
+
+    Leaves are classified once: coroutines that never await are sync-pure and are driven inline, coroutines that
+    may await are awaited, and plain callables may block, so they keep running in the client executor.
+    When *is_sync* is True, *func* returns the result directly; otherwise it is a coroutine function.
+    """
+    if type(flt) is InvertFilter:
+        is_sync, base = compile_node(flt.base)
+
+        if is_sync:
+            return True, lambda client, update: not base(client, update)
+
+        async def invert(client, update):
+            return not await base(client, update)
+
+        return False, invert
+
+    if type(flt) in (AndFilter, OrFilter):
+        is_and = type(flt) is AndFilter
+        operands = [compile_node(f) for f in flatten(flt, type(flt))]
+
+        if not any(not is_sync for is_sync, _ in operands):
+            funcs = [func for _, func in operands]
+
+            def chain(client, update):
+                for func in funcs:
+                    x = func(client, update)
+
+                    # short circuit
+                    if is_and and not x:
+                        return False
+                    if not is_and and x:
+                        return True
+
+                return x
+
+            return True, chain
+
+        async def async_chain(client, update):
+            for is_sync, func in operands:
+                x = func(client, update) if is_sync else await func(client, update)
+
+                # short circuit
+                if is_and and not x:
+                    return False
+                if not is_and and x:
+                    return True
+
+            return x
+
+        return False, async_chain
+
+    call = flt.__call__
+
+    if inspect.iscoroutinefunction(call):
+        if never_suspends(call):
+            return True, lambda client, update: run_inline(flt(client, update))
+
+        return False, flt
+
+    async def blocking(client, update):
+        return await client.loop.run_in_executor(client.executor, flt, client, update)
+
+    return False, blocking
+
+
+def compile_filter(flt) -> Callable:
+    """Compile *flt* into a coroutine function ``(client, update)`` that gives the same result as calling it.
+
+    The And/Or/Invert tree is flattened and each leaf is looked at only once, instead of on every update.
+    """
+    is_sync, func = compile_node(flt)
+
+    if not is_sync:
+        return func
+
+    async def check(client, update):
+        return func(client, update)
+
+    return check
+
+
+def get_command_filter(flt) -> Optional[Filter]:
+    """The :meth:`command` filter every update accepted by *flt* must pass, if any."""
+    for f in flatten(flt, AndFilter):
+        if getattr(f, "route_keys", None) is not None:
+            return f
+
+    return None
+
+
 CUSTOM_FILTER_NAME = "CustomFilter"
 
 
@@ -146,6 +317,9 @@ def create(func: Callable, name: str = None, **kwargs) -> Filter:
         **kwargs (``any``, *optional*):
             Any keyword argument you would like to pass. Useful when creating parameterized custom filters, such as
             :meth:`~pyrogram.filters.command` or :meth:`~pyrogram.filters.regex`.
+            Pass *check_raw*, a function that accepts *(filter, client, update, users, chats)* where *update* is the
+            raw update, to let updates your filter would reject be dropped before they are parsed. It must return
+            False only when *func* would surely return False too.
     """
     return type(
         name or func.__name__ or CUSTOM_FILTER_NAME,
@@ -195,7 +369,14 @@ async def incoming_filter(_, __, m: Message) -> bool:
     return not m.outgoing
 
 
-incoming: Filter = create(incoming_filter)
+def incoming_raw_filter(_, __, update, ___, ____) -> bool:
+    message = get_raw_message(update)
+
+    # Service messages are parsed without outgoing, and are thus always incoming
+    return not (isinstance(message, raw.types.Message) and message.out)
+
+
+incoming: Filter = create(incoming_filter, check_raw=incoming_raw_filter)
 """Filter incoming messages. Messages sent to your own chat (Saved Messages) are also recognised as incoming."""
 
 
@@ -207,7 +388,13 @@ async def outgoing_filter(_, __, m: Message) -> bool:
     return m.outgoing
 
 
-outgoing = create(outgoing_filter)
+def outgoing_raw_filter(_, __, update, ___, ____) -> bool:
+    message = get_raw_message(update)
+
+    return message is None or bool(getattr(message, "out", False))
+
+
+outgoing = create(outgoing_filter, check_raw=outgoing_raw_filter)
 """Filter outgoing messages. Messages sent to your own chat (Saved Messages) are not recognized as outgoing."""
 
 
@@ -219,7 +406,13 @@ async def text_filter(_, __, m: Message) -> bool:
     return bool(m.text)
 
 
-text: Filter = create(text_filter)
+def text_raw_filter(_, __, update, ___, ____) -> bool:
+    message = get_raw_message(update)
+
+    return message is None or bool(getattr(message, "message", None))
+
+
+text: Filter = create(text_filter, check_raw=text_raw_filter)
 """Filter text messages."""
 
 
@@ -476,7 +669,13 @@ async def private_filter(_, __, m: Union[Message, CallbackQuery]) -> bool:
     return bool(m.chat and m.chat.type in {enums.ChatType.PRIVATE, enums.ChatType.BOT})
 
 
-private: Filter = create(private_filter)
+def private_raw_filter(_, __, update, ___, ____) -> bool:
+    peer = get_raw_peer(update)
+
+    return peer is None or isinstance(peer, raw.types.PeerUser)
+
+
+private: Filter = create(private_filter, check_raw=private_raw_filter)
 """Filter messages sent in private chats."""
 
 
@@ -495,7 +694,16 @@ async def group_filter(_, __, m: Union[Message, CallbackQuery]) -> bool:
     )
 
 
-group: Filter = create(group_filter)
+def group_raw_filter(_, __, update, ___, chats) -> bool:
+    peer = get_raw_peer(update)
+
+    if isinstance(peer, raw.types.PeerChannel):
+        return is_megagroup(peer, chats) is not False
+
+    return peer is None or isinstance(peer, raw.types.PeerChat)
+
+
+group: Filter = create(group_filter, check_raw=group_raw_filter)
 """Filter messages sent in group or supergroup chats."""
 
 
@@ -512,7 +720,16 @@ async def channel_filter(_, __, m: Union[Message, CallbackQuery]) -> bool:
     return bool(m.chat and m.chat.type == enums.ChatType.CHANNEL)
 
 
-channel: Filter = create(channel_filter)
+def channel_raw_filter(_, __, update, ___, chats) -> bool:
+    peer = get_raw_peer(update)
+
+    if isinstance(peer, raw.types.PeerChannel):
+        return is_megagroup(peer, chats) is not True
+
+    return peer is None
+
+
+channel: Filter = create(channel_filter, check_raw=channel_raw_filter)
 """Filter messages sent in channels."""
 
 
@@ -871,6 +1088,10 @@ linked_channel: Filter = create(linked_channel_filter)
 
 
 # region command_filter
+COMMAND_TOKEN_RE = re.compile(r"\S*")
+COMMAND_ESCAPE_RE = re.compile(r"\\([\"'])")
+
+
 def command(
     commands: Union[str, List[str]],
     prefixes: Union[str, List[str]] = "/",
@@ -896,6 +1117,64 @@ def command(
     """
     command_re: Pattern[str] = re.compile(pattern=r"([\"'])(.*?)(?<!\\)\1|(\S+)")
 
+    def match(flt, text: str, username: str) -> Optional[tuple]:
+        """Find the command *text* starts with, return (command, text after it) or None."""
+        for prefix in flt.prefixes:
+            if not text.startswith(prefix):
+                continue
+
+            without_prefix = text[len(prefix):]
+            token = COMMAND_TOKEN_RE.match(without_prefix).group()
+            # Commands are separated from their arguments by a single whitespace character
+            without_command = without_prefix[len(token) + 1:]
+            key = token if flt.case_sensitive else token.lower()
+
+            if key in flt.commands:
+                return key, without_command
+
+            # The command may be addressed to the bot: /start@username, or the legacy /startusername
+            if key.endswith(username if flt.case_sensitive else username.lower()):
+                key = key[:len(key) - len(username)]
+                key = key[:-1] if key.endswith("@") else key
+
+                if key in flt.commands:
+                    return key, without_command
+
+            for cmd, pattern in flt.get_patterns(username):
+                m = pattern.match(without_prefix)
+
+                if m is not None:
+                    return cmd, without_prefix[m.end():]
+
+        return None
+
+    def get_patterns(flt, username: str) -> List[tuple]:
+        """Compiled patterns of the commands that are regular expressions rather than plain words."""
+        patterns = flt.patterns.get(username)
+
+        if patterns is None:
+            patterns = flt.patterns[username] = [
+                (cmd, re.compile(rf"(?:{cmd}(?:@?{username})?)(?:\s|$)", 0 if flt.case_sensitive else re.IGNORECASE))
+                for cmd in flt.commands
+                if re.escape(cmd) != cmd
+            ]
+
+        return patterns
+
+    def route_keys(flt) -> Optional[set]:
+        """Words (prefix and command) a message must start with to be accepted, None if they can't be listed."""
+        if any(re.escape(cmd) != cmd for cmd in flt.commands):
+            return None
+
+        if any(COMMAND_TOKEN_RE.fullmatch(prefix) is None for prefix in flt.prefixes):
+            return None
+
+        return {
+            prefix + cmd if flt.case_sensitive else (prefix + cmd).lower()
+            for prefix in flt.prefixes
+            for cmd in flt.commands
+        }
+
     async def func(flt, client: pyrogram.Client, message: Message) -> bool:
         username: str = (client.me and client.me.username) or ""
         text: Str = message.text or message.caption
@@ -904,44 +1183,33 @@ def command(
         if not text:
             return False
 
-        for prefix in flt.prefixes:
-            if not text.startswith(prefix):
-                continue
+        match = flt.match(text, username)
 
-            without_prefix = text[len(prefix) :]
-
-            for cmd in flt.commands:
-                if not re.match(
-                    pattern=rf"^(?:{cmd}(?:@?{username})?)(?:\s|$)",
-                    string=without_prefix,
-                    flags=re.IGNORECASE if not flt.case_sensitive else 0,
-                ):
-                    continue
-
-                without_command: str = re.sub(
-                    pattern=rf"{cmd}(?:@?{username})?\s?",
-                    repl="",
-                    string=without_prefix,
-                    count=1,
-                    flags=re.IGNORECASE if not flt.case_sensitive else 0,
-                )
+        if match is None:
+            return False
 
-                # match.groups are 1-indexed, group(1) is the quote, group(2) is the text
-                # between the quotes, group(3) is unquoted, whitespace-split text
+        cmd, without_command = match
 
-                # Remove the escape character from the arguments
-                message.command = [cmd] + [
-                    re.sub(
-                        pattern=r"\\([\"'])",
-                        repl=r"\1",
-                        string=m.group(2) or m.group(3) or "",
-                    )
-                    for m in command_re.finditer(string=without_command)
-                ]
+        # match.groups are 1-indexed, group(1) is the quote, group(2) is the text
+        # between the quotes, group(3) is unquoted, whitespace-split text
 
-                return True
+        # Remove the escape character from the arguments
+        message.command = [cmd] + [
+            COMMAND_ESCAPE_RE.sub(r"\1", m.group(2) or m.group(3) or "")
+            for m in command_re.finditer(string=without_command)
+        ]
 
-        return False
+        return True
+
+    def raw_func(flt, client, update, __, ___) -> bool:
+        message = get_raw_message(update)
+
+        if message is None:
+            return True
+
+        text = getattr(message, "message", None)
+
+        return bool(text) and flt.match(text, (client.me and client.me.username) or "") is not None
 
     commands = commands if isinstance(commands, list) else [commands]
     commands = {c if case_sensitive else c.lower() for c in commands}
@@ -953,7 +1221,12 @@ def command(
     return create(
         func=func,
         name="CommandFilter",
+        check_raw=raw_func,
+        match=match,
+        get_patterns=get_patterns,
+        route_keys=route_keys,
         commands=commands,
+        patterns={},
         prefixes=prefixes,
         case_sensitive=case_sensitive,
     )
@@ -1101,6 +1374,15 @@ class chat(Filter, set):
             for c in chats
         )
 
+    def check_raw(self, client: "pyrogram.Client", update: "raw.base.Update", users: dict, chats: dict) -> bool:
+        peer = get_raw_peer(update)
+
+        # Usernames and "me" can't be told apart from the raw peer
+        if peer is None or any(not isinstance(c, int) for c in self):
+            return True
+
+        return utils.get_peer_id(peer) in self
+
     async def __call__(self, _, message: Message) -> bool:
         return message.chat and (
             message.chat.id in self
@@ -16,10 +16,10 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-import inspect
 from typing import Callable
 
 import pyrogram
+from pyrogram import filters
 from pyrogram.filters import Filter
 from pyrogram.types import Update
 
@@ -28,16 +28,28 @@ class Handler:
     def __init__(self, callback: Callable, filters: Filter = None):
         self.callback = callback
         self.filters = filters
+        self.compiled_filters = None
+
+    def compile_filters(self):
+        """Compile the filters once, so that checking an update doesn't inspect the filter tree again."""
+        if callable(self.filters):
+            self.compiled_filters = (self.filters, filters.compile_filter(self.filters))
+        else:
+            self.compiled_filters = None
 
     async def check(self, client: "pyrogram.Client", update: Update):
         if callable(self.filters):
-            if inspect.iscoroutinefunction(self.filters.__call__):
-                return await self.filters(client, update)
-            else:
-                return await client.loop.run_in_executor(
-                    client.executor,
-                    self.filters,
-                    client, update
-                )
+            # Filters may be replaced after the handler was registered
+            if self.compiled_filters is None or self.compiled_filters[0] is not self.filters:
+                self.compile_filters()
+
+            return await self.compiled_filters[1](client, update)
+
+        return True
+
+    def check_raw(self, client: "pyrogram.Client", update, users: dict, chats: dict) -> bool:
+        """Cheap check on the raw update: False if :meth:`check` would surely reject it once parsed."""
+        if callable(self.filters):
+            return filters.check_raw(self.filters, client, update, users, chats)
 
         return True
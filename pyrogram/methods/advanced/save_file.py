@@ -30,10 +30,26 @@ from typing import Union, BinaryIO, Callable
 import pyrogram
 from pyrogram import StopTransmission
 from pyrogram import raw
-from pyrogram.session import Session
+from pyrogram.file_io import FileReader
+from pyrogram.session import SessionPool
 
 log = logging.getLogger(__name__)
 
+# https://core.telegram.org/api/files#uploading-files
+MIN_PART_SIZE = 64 * 1024
+MAX_PART_SIZE = 512 * 1024
+# Files are split in about this many parts, so that even small ones are sent in parallel
+TARGET_PARTS = 16
+
+
+def get_part_size(file_size: int) -> int:
+    part_size = MIN_PART_SIZE
+
+    while part_size < MAX_PART_SIZE and file_size > part_size * TARGET_PARTS:
+        part_size *= 2
+
+    return part_size
+
 
 class SaveFile:
     async def save_file(
@@ -107,10 +123,8 @@ class SaveFile:
                 except Exception as e:
                     log.error(e)
 
-        part_size = 512 * 1024
-
         if isinstance(path, (str, PurePath)):
-            fp = open(path, "rb")
+            fp = await self.loop.run_in_executor(self.file_io_executor, open, path, "rb")
         elif isinstance(path, io.IOBase):
             fp = path
         else:
@@ -133,34 +147,39 @@ class SaveFile:
         if file_size > file_size_limit_mib * 1024 * 1024:
             raise ValueError(f"Can't upload files bigger than {file_size_limit_mib} MiB")
 
+        part_size = get_part_size(file_size)
         file_total_parts = int(math.ceil(file_size / part_size))
         is_big = file_size > 10 * 1024 * 1024
-        pool_size = 3 if is_big else 1
-        workers_count = 4 if is_big else 1
         is_missing_part = file_id is not None
         file_id = file_id or self.rnd_id()
         md5_sum = md5() if not is_big and not is_missing_part else None
-        pool = [
-            Session(
-                self, await self.storage.dc_id(), await self.storage.auth_key(),
-                await self.storage.test_mode(), is_media=True
-            ) for _ in range(pool_size)
-        ]
-        workers = [self.loop.create_task(worker(session)) for session in pool for _ in range(workers_count)]
-        queue = asyncio.Queue(16)
 
-        try:
-            for session in pool:
-                await session.start()
+        dc_id = await self.storage.dc_id()
+        pool = self.upload_pools.get(dc_id)
 
-            fp.seek(part_size * file_part)
+        if pool is None:
+            pool = self.upload_pools[dc_id] = SessionPool(self, dc_id, self.max_upload_sessions)
+
+        sessions = []
+        sessions_count = pool.size if is_big else 1
+        workers = []
+        workers_count = min(pool.workers, math.ceil((file_total_parts - file_part) / sessions_count))
+        queue = asyncio.Queue(2 * sessions_count * workers_count)
+        is_done = False
+        reader = FileReader(fp, part_size, part_size * file_part, self.file_io_executor)
+        start = self.loop.time()
+
+        try:
+            sessions = await pool.acquire(sessions_count)
+            workers = [self.loop.create_task(worker(session)) for session in sessions for _ in range(workers_count)]
 
             while True:
-                chunk = fp.read(part_size)
+                chunk = await reader.read()
 
                 if not chunk:
                     if not is_big and not is_missing_part:
                         md5_sum = "".join([hex(i)[2:].zfill(2) for i in md5_sum.digest()])
+                    is_done = True
                     break
 
                 if is_big:
@@ -224,7 +243,13 @@ class SaveFile:
 
             await asyncio.gather(*workers)
 
-            for session in pool:
-                await session.stop()
+            if sessions:
+                pool.release()
+
+                if is_big and is_done:
+                    pool.report(workers_count, file_size, self.loop.time() - start)
+
+            await reader.close()
+
             if isinstance(path, (str, PurePath)):
-                fp.close()
+                await self.loop.run_in_executor(self.file_io_executor, fp.close)
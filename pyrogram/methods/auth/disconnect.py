@@ -16,6 +16,8 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures.thread import ThreadPoolExecutor
+
 import pyrogram
 
 
@@ -36,5 +38,13 @@ class Disconnect:
             raise ConnectionError("Can't disconnect an initialized client")
 
         await self.session.stop()
+        await self.update_state_tracker.stop()
+        await self.peer_cache.stop()
         await self.storage.close()
+
+        # The crypto threads only end once the executor is shut down, which can't be done before the main session is
+        # stopped. The new executor starts no thread until the client connects again.
+        self.crypto_executor.shutdown()
+        self.crypto_executor = ThreadPoolExecutor(self.crypto_executor_workers, thread_name_prefix="CryptoWorker")
+
         self.is_connected = False
@@ -51,6 +51,16 @@ class Terminate:
 
         self.media_sessions.clear()
 
+        for upload_pool in self.upload_pools.values():
+            await upload_pool.stop()
+
+        self.upload_pools.clear()
+
+        for cdn_pool in self.cdn_pools.values():
+            await cdn_pool.stop()
+
+        self.cdn_pools.clear()
+
         self.updates_watchdog_event.set()
 
         if self.updates_watchdog_task is not None:
@@ -97,9 +97,12 @@ class GetForumTopics:
                     message,
                     users,
                     chats,
-                    replies=self.fetch_replies
+                    replies=self.fetch_replies,
+                    resolve_replies=False
                 )
 
+            await utils.fetch_reply_messages(self, list(messages.values()), self.fetch_replies)
+
             topics = []
 
             for topic in getattr(r, "topics", []):
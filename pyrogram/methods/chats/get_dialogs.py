@@ -92,9 +92,12 @@ class GetDialogs:
                     message,
                     users,
                     chats,
-                    replies=self.fetch_replies
+                    replies=self.fetch_replies,
+                    resolve_replies=False
                 )
 
+            await utils.fetch_reply_messages(self, list(messages.values()), self.fetch_replies)
+
             dialogs = []
 
             for dialog in r.dialogs:
@@ -28,6 +28,44 @@ from pyrogram.file_id import FileId, FileType, PHOTO_TYPES
 DEFAULT_DOWNLOAD_DIR = "downloads/"
 
 
+def get_media(client: "pyrogram.Client", message: Union["types.Message", "types.Story", str]):
+    media = message
+
+    if isinstance(message, types.Message):
+        if message.new_chat_photo:
+            media = message.new_chat_photo
+
+        elif (
+            not (client.me and client.me.is_bot) and
+            message.story or message.reply_to_story
+        ):
+            story_media = message.story or message.reply_to_story or None
+            if story_media and story_media.media:
+                media = getattr(story_media, story_media.media.value, None)
+            else:
+                media = None
+
+        else:
+            if message.media:
+                media = getattr(message, message.media.value, None)
+            else:
+                media = None
+
+    elif isinstance(message, str):
+        media = message
+
+    if isinstance(media, types.Story):
+        if (client.me and client.me.is_bot):
+            raise ValueError("This method cannot be used by bots")
+        else:
+            if media.media:
+                media = getattr(message, message.media.value, None)
+            else:
+                media = None
+
+    return media
+
+
 class DownloadMedia:
     async def download_media(
         self: "pyrogram.Client",
@@ -36,10 +74,15 @@ class DownloadMedia:
         in_memory: bool = False,
         block: bool = True,
         progress: Callable = None,
-        progress_args: tuple = ()
-    ) -> Optional[Union[str, BinaryIO]]:
+        progress_args: tuple = (),
+        buffer: Union[bytearray, memoryview] = None
+    ) -> Optional[Union[str, BinaryIO, memoryview]]:
         """Download the media from a message.
 
+        Downloads to disk are resumable: when one fails or is cancelled, the chunks already written are kept in the
+        ".temp" file and the next download of the same media into the same directory continues from there.
+        An expired file reference is refreshed by fetching the message again.
+
         .. include:: /_includes/usable-by/users-bots.rst
 
         Parameters:
@@ -73,6 +116,11 @@ class DownloadMedia:
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            buffer (``bytearray`` | ``memoryview``, *optional*):
+                Pass a preallocated writable buffer to download the media straight into it, chunk by chunk at their
+                offsets, without intermediate copies. It must be big enough to hold the whole file.
+                A memoryview over the downloaded bytes will be returned.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -89,9 +137,10 @@ class DownloadMedia:
             otherwise, in case the download failed or was deliberately stopped with
             :meth:`~pyrogram.Client.stop_transmission`, None is returned.
             Otherwise, in case ``in_memory=True``, a binary file-like object with its attribute ".name" set is returned.
+            Otherwise, in case *buffer* is passed, a memoryview over the downloaded part of the buffer is returned.
 
         Raises:
-            ValueError: if the message doesn't contain any downloadable media
+            ValueError: if the message doesn't contain any downloadable media or the buffer is too small
 
         Example:
             Download media to file
@@ -120,39 +169,7 @@ class DownloadMedia:
                 file_bytes = bytes(file.getbuffer())
         """
 
-        media = message
-
-        if isinstance(message, types.Message):
-            if message.new_chat_photo:
-                media = message.new_chat_photo
-
-            elif (
-                not (self.me and self.me.is_bot) and
-                message.story or message.reply_to_story
-            ):
-                story_media = message.story or message.reply_to_story or None
-                if story_media and story_media.media:
-                    media = getattr(story_media, story_media.media.value, None)
-                else:
-                    media = None
-
-            else:
-                if message.media:
-                    media = getattr(message, message.media.value, None)
-                else:
-                    media = None
-
-        elif isinstance(message, str):
-            media = message
-
-        if isinstance(media, types.Story):
-            if (self.me and self.me.is_bot):
-                raise ValueError("This method cannot be used by bots")
-            else:
-                if media.media:
-                    media = getattr(message, message.media.value, None)
-                else:
-                    media = None
+        media = get_media(self, message)
 
         if not media:
             raise ValueError(
@@ -203,8 +220,26 @@ class DownloadMedia:
                 extension
             )
 
+        refresh_file_id = None
+
+        if isinstance(message, (types.Message, types.Story)) and message.chat:
+            async def refresh_file_id() -> FileId:
+                # https://core.telegram.org/api/file_reference
+                if isinstance(message, types.Message):
+                    refreshed = await self.get_messages(chat_id=message.chat.id, message_ids=message.id)
+                else:
+                    refreshed = await self.get_stories(message.chat.id, message.id)
+
+                return FileId.decode(get_media(self, refreshed).file_id)
+
+        if buffer is not None and file_size and memoryview(buffer).nbytes < file_size:
+            raise ValueError(f"The buffer is too small ({memoryview(buffer).nbytes} B) for the file ({file_size} B)")
+
         downloader = self.handle_download(
-            (file_id_obj, directory, file_name, in_memory, file_size, progress, progress_args)
+            (
+                file_id_obj, directory, file_name, in_memory, file_size, progress, progress_args, buffer,
+                refresh_file_id
+            )
         )
 
         if block:
@@ -129,8 +129,11 @@ class ForwardMessages:
                         users,
                         chats,
                         is_scheduled=isinstance(i, raw.types.UpdateNewScheduledMessage),
-                        replies=self.fetch_replies
+                        replies=self.fetch_replies,
+                        resolve_replies=False
                     )
                 )
 
+        await utils.fetch_reply_messages(self, forwarded_messages, self.fetch_replies)
+
         return types.List(forwarded_messages) if is_iterable else forwarded_messages[0]
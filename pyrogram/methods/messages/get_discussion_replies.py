@@ -19,7 +19,7 @@
 from typing import Union, Optional, AsyncGenerator
 
 import pyrogram
-from pyrogram import types, raw
+from pyrogram import types, raw, utils
 
 
 class GetDiscussionReplies:
@@ -77,14 +77,22 @@ class GetDiscussionReplies:
             if not messages:
                 return
 
-            for message in messages:
-                yield await types.Message._parse(
+            messages = [
+                await types.Message._parse(
                     self,
                     message,
                     users,
                     chats,
-                    replies=self.fetch_replies
+                    replies=self.fetch_replies,
+                    resolve_replies=False
                 )
+                for message in messages
+            ]
+
+            await utils.fetch_reply_messages(self, messages, self.fetch_replies)
+
+            for message in messages:
+                yield message
 
                 current += 1
 
@@ -16,13 +16,17 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
 import math
 from typing import Union, Optional, BinaryIO
 
 import pyrogram
 from pyrogram import types
+from pyrogram.errors import BadRequest
 from pyrogram.file_id import FileId
 
+log = logging.getLogger(__name__)
+
 
 class StreamMedia:
     async def stream_media(
@@ -102,5 +106,12 @@ class StreamMedia:
             chunks = math.ceil(file_size / 1024 / 1024)
             offset += chunks
 
-        async for chunk in self.get_file(file_id_obj, file_size, limit, offset):
-            yield chunk
+        try:
+            async for chunk in self.get_file(file_id_obj, file_size, limit, offset):
+                yield chunk
+        except BadRequest as e:
+            # get_file raises them for download_media to refresh the file reference, streams still end as before
+            if e.ID not in self.FILE_REFERENCE_ERRORS:
+                raise
+
+            log.exception(e)
@@ -39,6 +39,10 @@ class RemoveHandler:
             group (``int``, *optional*):
                 The group identifier, defaults to 0.
 
+        Raises:
+            ValueError: In case the group doesn't exist or the handler is not in it. The handler is removed right
+                away, so the error is raised here rather than logged by a background task as it used to be.
+
         Example:
             .. code-block:: python
 
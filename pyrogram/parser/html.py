@@ -16,6 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import functools
 import html
 import logging
 import re
@@ -30,6 +31,8 @@ from . import utils
 
 log = logging.getLogger(__name__)
 
+PARSE_CACHE_SIZE = 512
+
 
 class Parser(HTMLParser):
     MENTION_RE = re.compile(r"tg://user\?id=(\d+)")
@@ -39,7 +42,10 @@ class Parser(HTMLParser):
 
         self.client = client
 
-        self.text = ""
+        # Text chunks, joined once at the end
+        self.text = []
+        # Length of the text so far, in UTF-16 code units like entity offsets
+        self.text_length = 0
         self.entities = []
         self.tag_entities = {}
 
@@ -86,26 +92,26 @@ class Parser(HTMLParser):
         if tag not in self.tag_entities:
             self.tag_entities[tag] = []
 
-        self.tag_entities[tag].append(entity(offset=len(self.text), length=0, **extra))
+        self.tag_entities[tag].append(entity(offset=self.text_length, length=0, **extra))
 
     def handle_data(self, data):
         data = html.unescape(data)
 
-        for entities in self.tag_entities.values():
-            for entity in entities:
-                entity.length += len(data)
-
-        self.text += data
+        self.text.append(data)
+        self.text_length += utils.utf16_length(data)
 
     def handle_endtag(self, tag):
         try:
-            self.entities.append(self.tag_entities[tag].pop())
+            entity = self.tag_entities[tag].pop()
         except (KeyError, IndexError):
             line, offset = self.getpos()
             offset += 1
 
             log.debug("Unmatched closing tag </%s> at line %s:%s", tag, line, offset)
         else:
+            entity.length = self.text_length - entity.offset
+            self.entities.append(entity)
+
             if not self.tag_entities[tag]:
                 self.tag_entities.pop(tag)
 
@@ -118,12 +124,40 @@ class HTML:
         self.client = client
 
     async def parse(self, text: str):
+        message, parsed_entities = HTML.parse_entities(text)
+        entities = []
+
+        for entity in parsed_entities:
+            # Parse results are cached, don't let the caller change them
+            entity = type(entity)(**{attr: getattr(entity, attr) for attr in entity.__slots__})
+
+            if isinstance(entity, raw.types.InputMessageEntityMentionName):
+                try:
+                    if self.client is not None:
+                        entity.user_id = await self.client.resolve_peer(entity.user_id)
+                except PeerIdInvalid:
+                    continue
+
+            entities.append(entity)
+
+        return {
+            "message": message,
+            "entities": entities or None
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def parse_entities(text: str) -> tuple:
+        """Parse *text* into the plain text and its non-empty entities sorted by offset, mentions unresolved.
+
+        Results are cached, since the same templates tend to be sent over and over.
+        """
         # Strip whitespaces from the beginning and the end, but preserve closing tags
         text = re.sub(r"^\s*(<[\w<>=\s\"]*>)\s*", r"\1", text)
         text = re.sub(r"\s*(</[\w</>]*>)\s*$", r"\1", text)
 
-        parser = Parser(self.client)
-        parser.feed(utils.add_surrogates(text))
+        parser = Parser(None)
+        parser.feed(text)
         parser.close()
 
         if parser.tag_entities:
@@ -134,25 +168,10 @@ class HTML:
 
             log.info("Unclosed tags: %s", ", ".join(unclosed_tags))
 
-        entities = []
-
-        for entity in parser.entities:
-            if isinstance(entity, raw.types.InputMessageEntityMentionName):
-                try:
-                    if self.client is not None:
-                        entity.user_id = await self.client.resolve_peer(entity.user_id)
-                except PeerIdInvalid:
-                    continue
-
-            entities.append(entity)
-
         # Remove zero-length entities
-        entities = list(filter(lambda x: x.length > 0, entities))
+        entities = [entity for entity in parser.entities if entity.length > 0]
 
-        return {
-            "message": utils.remove_surrogates(parser.text),
-            "entities": sorted(entities, key=lambda e: e.offset) or None
-        }
+        return "".join(parser.text), tuple(sorted(entities, key=lambda e: e.offset))
 
     @staticmethod
     def unparse(text: str, entities: list):
@@ -16,6 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import functools
 import html
 import logging
 import re
@@ -24,7 +25,7 @@ from typing import Optional
 import pyrogram
 from pyrogram.enums import MessageEntityType
 from . import utils
-from .html import HTML
+from .html import HTML, PARSE_CACHE_SIZE
 
 BOLD_DELIM = "**"
 ITALIC_DELIM = "__"
@@ -63,7 +64,8 @@ class Markdown:
     def __init__(self, client: Optional["pyrogram.Client"]):
         self.html = HTML(client)
 
-    def _parse_blockquotes(self, text: str):
+    @staticmethod
+    def _parse_blockquotes(text: str):
         text = html.unescape(text)
         lines = text.split('\n')
         result = []
@@ -99,21 +101,32 @@ class Markdown:
         return '\n'.join(result)
 
     async def parse(self, text: str, strict: bool = False):
+        return await self.html.parse(Markdown.to_html(text, strict))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def to_html(text: str, strict: bool = False) -> str:
+        """Turn the markdown delimiters of *text* into HTML tags, in a single pass over the text."""
         if strict:
             text = html.escape(text)
-        
 
-        text = self._parse_blockquotes(text)
+        text = Markdown._parse_blockquotes(text)
 
-        text = self._parse_blockquotes(text)
+        text = Markdown._parse_blockquotes(text)
 
+        chunks = []
+        # End of the text already copied to chunks
+        position = 0
         delims = set()
         is_fixed_width = False
 
-        for i, match in enumerate(re.finditer(MARKDOWN_RE, text)):
-            start, _ = match.span()
+        for match in MARKDOWN_RE.finditer(text):
+            start, end = match.span()
             delim, is_emoji, text_url, url = match.groups()
-            full = match.group(0)
+
+            # Part of a pre language line, already replaced
+            if start < position:
+                continue
 
             if delim in FIXED_WIDTH_DELIMS:
                 is_fixed_width = not is_fixed_width
@@ -122,48 +135,50 @@ class Markdown:
                 continue
 
             if not is_emoji and text_url:
-                text = utils.replace_once(text, full, URL_MARKUP.format(url, text_url), start)
-                continue
-
-            if is_emoji:
+                replacement = URL_MARKUP.format(url, text_url)
+            elif is_emoji:
                 emoji = text_url
                 emoji_id = url.lstrip("tg://emoji?id=")
-                text = utils.replace_once(text, full, EMOJI_MARKUP.format(emoji_id, emoji), start)
-                continue
-
-            if delim == BOLD_DELIM:
-                tag = "b"
-            elif delim == ITALIC_DELIM:
-                tag = "i"
-            elif delim == UNDERLINE_DELIM:
-                tag = "u"
-            elif delim == STRIKE_DELIM:
-                tag = "s"
-            elif delim == CODE_DELIM:
-                tag = "code"
-            elif delim == PRE_DELIM:
-                tag = "pre"
-            elif delim == SPOILER_DELIM:
-                tag = "spoiler"
-            else:
-                continue
-
-            if delim not in delims:
-                delims.add(delim)
-                tag = OPENING_TAG.format(tag)
+                replacement = EMOJI_MARKUP.format(emoji_id, emoji)
             else:
-                delims.remove(delim)
-                tag = CLOSING_TAG.format(tag)
-
-            if delim == PRE_DELIM and delim in delims:
-                delim_and_language = text[text.find(PRE_DELIM):].split("\n")[0]
-                language = delim_and_language[len(PRE_DELIM):]
-                text = utils.replace_once(text, delim_and_language, f'<pre language="{language}">', start)
-                continue
-
-            text = utils.replace_once(text, delim, tag, start)
-
-        return await self.html.parse(text)
+                if delim == BOLD_DELIM:
+                    tag = "b"
+                elif delim == ITALIC_DELIM:
+                    tag = "i"
+                elif delim == UNDERLINE_DELIM:
+                    tag = "u"
+                elif delim == STRIKE_DELIM:
+                    tag = "s"
+                elif delim == CODE_DELIM:
+                    tag = "code"
+                elif delim == PRE_DELIM:
+                    tag = "pre"
+                elif delim == SPOILER_DELIM:
+                    tag = "spoiler"
+                else:
+                    continue
+
+                if delim not in delims:
+                    delims.add(delim)
+                    replacement = OPENING_TAG.format(tag)
+                else:
+                    delims.remove(delim)
+                    replacement = CLOSING_TAG.format(tag)
+
+                if delim == PRE_DELIM and delim in delims:
+                    # The language follows the opening delimiter, up to the end of the line
+                    line_end = text.find("\n", end)
+                    line_end = len(text) if line_end == -1 else line_end
+                    replacement = f'<pre language="{text[end:line_end]}">'
+                    end = line_end
+
+            chunks.append(text[position:start])
+            chunks.append(replacement)
+            position = end
+
+        chunks.append(text[position:])
+
+        return "".join(chunks)
 
     @staticmethod
     def unparse(text: str, entities: list):
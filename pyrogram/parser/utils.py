@@ -37,5 +37,10 @@ def remove_surrogates(text):
     return text.encode("utf-16", "surrogatepass").decode("utf-16", "ignore")
 
 
+def utf16_length(text: str) -> int:
+    # SMP code points take two UTF-16 code units
+    return len(text) if text.isascii() else len(text.encode("utf-16-le", "surrogatepass")) // 2
+
+
 def replace_once(source: str, old: str, new: str, start: int):
     return source[:start] + source[start:].replace(old, new, 1)
@@ -51,3 +51,8 @@ class MsgContainer(TLObject):
             b.write(message.write())
 
         return b.getvalue()
+
+    def __len__(self) -> int:
+        # Avoid serializing the whole container only to compute its size:
+        # ID (4) + count (4) + msg_id (8), seq_no (4) and length (4) for each message
+        return 8 + sum(16 + message.length for message in self.messages)
@@ -21,9 +21,13 @@ from typing import Any
 
 from ..tl_object import TLObject
 
+# Constructor IDs as ints, compared against by the generated struct based readers
+BOOL_FALSE = 0xBC799737
+BOOL_TRUE = 0x997275B5
+
 
 class BoolFalse(bytes, TLObject):
-    ID = 0xBC799737
+    ID = BOOL_FALSE
     value = False
 
     @classmethod
@@ -35,7 +39,7 @@ class BoolFalse(bytes, TLObject):
 
 
 class BoolTrue(BoolFalse):
-    ID = 0x997275B5
+    ID = BOOL_TRUE
     value = True
 
 
@@ -17,14 +17,20 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
+from struct import pack, unpack
 from typing import cast, Union, Any
 
 from .bool import BoolFalse, BoolTrue, Bool
-from .int import Int, Long
+from .int import Int, Long, Int128, Int256
 from ..list import List
 from ..tl_object import TLObject
 
 
+# Fixed-width element types read and written in bulk instead of one element at a time
+STRUCT_FORMATS = {Int: "i", Long: "q"}
+WIDE_INTS = (Int128, Int256)
+
+
 class Vector(bytes, TLObject):
     ID = 0x1CB5C415
 
@@ -58,9 +64,24 @@ class Vector(bytes, TLObject):
     @classmethod
     def read(cls, data: BytesIO, t: Any = None, *args: Any) -> List:
         count = Int.read(data)
-        left = len(data.read())
+
+        if t in STRUCT_FORMATS:
+            return List(unpack(f"<{count}{STRUCT_FORMATS[t]}", data.read(count * t.SIZE)))
+
+        if t in WIDE_INTS:
+            size = t.SIZE
+            buffer = data.read(count * size)
+
+            return List(
+                int.from_bytes(buffer[i:i + size], "little", signed=True)
+                for i in range(0, len(buffer), size)
+            )
+
+        # Measure what's left by seeking to the end instead of reading (and copying) it
+        position = data.tell()
+        left = data.seek(0, 2) - position
         size = (left / count) if count else 0
-        data.seek(-left, 1)
+        data.seek(position)
 
         return List(
             t.read(data) if t
@@ -69,6 +90,9 @@ class Vector(bytes, TLObject):
         )
 
     def __new__(cls, value: list, t: Any = None) -> bytes:  # type: ignore
+        if t in STRUCT_FORMATS:
+            return pack(f"<Ii{len(value)}{STRUCT_FORMATS[t]}", cls.ID, len(value), *value)
+
         return b"".join(
             [Int(cls.ID, False), Int(len(value))]
             + [cast(bytes, t(i)) if t else i.write() for i in value]
@@ -47,6 +47,9 @@ class Auth:
         self.test_mode = test_mode
         self.ipv6 = client.ipv6
         self.proxy = client.proxy
+        self.connection_mode = client.connection_mode
+        self.crypto_executor = client.crypto_executor
+        self.crypto_inline_threshold = client.crypto_inline_threshold
 
         self.connection = None
 
@@ -81,7 +84,15 @@ class Auth:
         # The server may close the connection at any time, causing the auth key creation to fail.
         # If that happens, just try again up to MAX_RETRIES times.
         while True:
-            self.connection = Connection(self.dc_id, self.test_mode, self.ipv6, self.proxy)
+            self.connection = Connection(
+                self.dc_id,
+                self.test_mode,
+                self.ipv6,
+                self.proxy,
+                mode=self.connection_mode,
+                crypto_executor=self.crypto_executor,
+                crypto_inline_threshold=self.crypto_inline_threshold
+            )
 
             try:
                 log.info(f"Start creating a new auth key on DC{self.dc_id}")
@@ -18,17 +18,20 @@
 
 import asyncio
 import bisect
+import functools
 import logging
 import os
+from collections import deque
 from hashlib import sha1
 from io import BytesIO
+from typing import Optional
 
 import pyrogram
 from pyrogram import raw
 from pyrogram.connection import Connection
 from pyrogram.crypto import mtproto
 from pyrogram.errors import (
-    RPCError, InternalServerError, AuthKeyDuplicated,
+    RPCError, InternalServerError, AuthKeyDuplicated, AuthKeyUnregistered,
     FloodWait, FloodPremiumWait,
     ServiceUnavailable, BadMsgNotification,
     SecurityCheckMismatch,
@@ -55,6 +58,16 @@ class Session:
     PING_INTERVAL = 5
     STORED_MSG_IDS_MAX_SIZE = 1000 * 2
 
+    # Outgoing messages queued within this window (in seconds) are coalesced into a single MsgContainer.
+    # This delays every outgoing message by up to this amount, unless the queue already fills a container.
+    SEND_FLUSH_INTERVAL = 0.001
+    # https://core.telegram.org/mtproto/service_messages#simple-container
+    MAX_CONTAINER_LENGTH = 1020
+    MAX_CONTAINER_SIZE = 32 * 1024
+    # Packets up to this size (in bytes) are encrypted and decrypted inline, without the crypto executor round-trip
+    CRYPTO_INLINE_THRESHOLD = 2048
+    CONNECTION_MODE = 3
+
     TRANSPORT_ERRORS = {
         404: "auth key not found",
         429: "transport flood",
@@ -83,6 +96,10 @@ class Session:
         self.is_media = is_media
         self.is_cdn = is_cdn
 
+        self.crypto_executor = getattr(client, "crypto_executor", pyrogram.crypto_executor)
+        self.connection_mode = getattr(client, "connection_mode", Session.CONNECTION_MODE)
+        self.crypto_inline_threshold = getattr(client, "crypto_inline_threshold", Session.CRYPTO_INLINE_THRESHOLD)
+
         self.connection = None
 
         self.auth_key_id = sha1(auth_key).digest()[-8:]
@@ -98,29 +115,42 @@ class Session:
 
         self.stored_msg_ids = []
 
+        self.containers = {}
+
         self.ping_task = None
         self.ping_task_event = asyncio.Event()
 
         self.network_task = None
 
+        self.send_queue = deque()
+        self.send_queue_size = 0
+        self.send_queue_event = asyncio.Event()
+        self.send_task = None
+
         self.is_connected = asyncio.Event()
+        self.transport_error = None
 
         self.loop = asyncio.get_event_loop()
 
     async def start(self):
         while True:
+            self.transport_error = None
             self.connection = Connection(
                 self.dc_id,
                 self.test_mode,
                 self.client.ipv6,
                 self.client.proxy,
-                self.is_media
+                self.is_media,
+                self.connection_mode,
+                self.crypto_executor,
+                self.crypto_inline_threshold
             )
 
             try:
                 await self.connection.connect()
 
                 self.network_task = self.loop.create_task(self.network_worker())
+                self.send_task = self.loop.create_task(self.send_worker())
 
                 await self.send(raw.functions.Ping(ping_id=0), timeout=self.START_TIMEOUT)
 
@@ -158,6 +188,10 @@ class Session:
                 raise e
             except (OSError, TimeoutError, RPCError):
                 await self.stop()
+
+                # A media DC that forgot the key would keep rejecting it; let the caller negotiate a new one
+                if self.is_media and self.transport_error == -404:
+                    raise AuthKeyUnregistered(self.TRANSPORT_ERRORS[404])
             except Exception as e:
                 await self.stop()
                 raise e
@@ -178,8 +212,17 @@ class Session:
 
         self.ping_task_event.clear()
 
+        send_task, self.send_task = self.send_task, None
+
+        if send_task:
+            self.send_queue.appendleft(None)
+            self.send_queue_event.set()
+
         self.connection.close()
 
+        if send_task:
+            await send_task
+
         if self.network_task:
             await self.network_task
 
@@ -198,20 +241,52 @@ class Session:
         await self.stop()
         await self.start()
 
-    async def handle_packet(self, packet):
+    async def handle_packet(self, packet, previous: Optional[asyncio.Future], handled: asyncio.Future):
+        """Decrypt a packet and handle its messages once the previous packet is handled.
+
+        Packets are decrypted concurrently, small ones inline and big ones in the crypto executor, but their messages
+        (updates and RPC results) must be handled in the order the packets were received.
+        """
+        unpack = functools.partial(
+            mtproto.unpack,
+            packet,
+            self.session_id,
+            self.auth_key,
+            self.auth_key_id,
+            # self.stored_msg_ids
+        )
+
         try:
-            data = await self.loop.run_in_executor(
-                pyrogram.crypto_executor,
-                mtproto.unpack,
-                BytesIO(packet),
-                self.session_id,
-                self.auth_key,
-                self.auth_key_id,
-                # self.stored_msg_ids
-            )
-        except SecurityCheckMismatch:
-            return
+            try:
+                data = (
+                    unpack()
+                    if len(packet) <= self.crypto_inline_threshold
+                    else await self.loop.run_in_executor(self.crypto_executor, unpack)
+                )
+            except SecurityCheckMismatch:
+                data = None
+
+            if previous is not None:
+                # Not cancelled along with this task, the next packet waits for it as well
+                await asyncio.wait([previous])
+
+            if data is not None:
+                self.handle_messages(data)
+        finally:
+            if not handled.done():
+                handled.set_result(None)
+
+        if len(self.pending_acks) >= self.ACKS_THRESHOLD:
+            log.debug(f"Send {len(self.pending_acks)} acks")
+
+            try:
+                await self.send(raw.types.MsgsAck(msg_ids=list(self.pending_acks)), False)
+            except (OSError, TimeoutError):
+                pass
+            else:
+                self.pending_acks.clear()
 
+    def handle_messages(self, data):
         messages = (
             data.body.messages
             if isinstance(data.body, MsgContainer)
@@ -278,19 +353,11 @@ class Session:
                 if self.client is not None:
                     self.loop.create_task(self.client.handle_updates(msg.body))
 
-            if msg_id in self.results:
-                self.results[msg_id].value = getattr(msg.body, "result", msg.body)
-                self.results[msg_id].event.set()
-
-        if len(self.pending_acks) >= self.ACKS_THRESHOLD:
-            log.debug(f"Send {len(self.pending_acks)} acks")
-
-            try:
-                await self.send(raw.types.MsgsAck(msg_ids=list(self.pending_acks)), False)
-            except (OSError, TimeoutError):
-                pass
-            else:
-                self.pending_acks.clear()
+            # A notification about a container applies to every message that was packed inside it
+            for i in self.containers.pop(msg_id, [msg_id]):
+                if i in self.results:
+                    self.results[i].value = getattr(msg.body, "result", msg.body)
+                    self.results[i].event.set()
 
     async def ping_worker(self):
         log.info("PingTask started")
@@ -317,22 +384,118 @@ class Session:
     async def network_worker(self):
         log.info("NetworkTask started")
 
+        # Set once the last received packet is handled
+        handled = None
+
         while True:
             packet = await self.connection.recv()
 
             if packet is None or len(packet) == 4:
                 if packet:
-                    log.warning(f'Server sent "{Int.read(BytesIO(packet))}"')
+                    self.transport_error = Int.read(BytesIO(packet))
+                    log.warning(f'Server sent "{self.transport_error}"')
 
                 if self.is_connected.is_set():
                     self.loop.create_task(self.restart())
 
                 break
 
-            self.loop.create_task(self.handle_packet(packet))
+            previous, handled = handled, self.loop.create_future()
+            self.loop.create_task(self.handle_packet(packet, previous, handled))
 
         log.info("NetworkTask stopped")
 
+    async def send_worker(self):
+        log.info("SendTask started")
+
+        while True:
+            await self.send_queue_event.wait()
+
+            if self.send_queue[0] is None:
+                break
+
+            if self.send_queue_size < self.MAX_CONTAINER_SIZE:
+                # Give concurrent senders a chance to join the same container
+                await asyncio.sleep(self.SEND_FLUSH_INTERVAL)
+
+            batch = []
+            size = 0
+
+            while self.send_queue and self.send_queue[0] is not None:
+                message, _ = self.send_queue[0]
+
+                if batch and (
+                    len(batch) >= self.MAX_CONTAINER_LENGTH
+                    or size + message.length + 16 > self.MAX_CONTAINER_SIZE
+                ):
+                    break
+
+                batch.append(self.send_queue.popleft())
+                size += message.length + 16
+
+            self.send_queue_size -= size
+
+            if not self.send_queue:
+                self.send_queue_event.clear()
+
+            if batch:
+                await self.flush(batch)
+
+        while self.send_queue:
+            item = self.send_queue.popleft()
+
+            if item is not None and not item[1].done():
+                item[1].set_exception(OSError("Session stopped"))
+
+        self.send_queue_size = 0
+        self.send_queue_event.clear()
+
+        log.info("SendTask stopped")
+
+    async def flush(self, batch: list):
+        messages = [message for message, _ in batch]
+
+        if self.pending_acks and len(messages) < self.MAX_CONTAINER_LENGTH and not any(isinstance(i.body, raw.types.MsgsAck) for i in messages):
+            messages.append(self.msg_factory(raw.types.MsgsAck(msg_ids=list(self.pending_acks))))
+            self.pending_acks.clear()
+
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = self.msg_factory(MsgContainer(messages))
+
+            if len(self.containers) > Session.STORED_MSG_IDS_MAX_SIZE:
+                for key in list(self.containers)[:Session.STORED_MSG_IDS_MAX_SIZE // 2]:
+                    del self.containers[key]
+
+            self.containers[message.msg_id] = [i.msg_id for i in messages]
+
+        pack = functools.partial(
+            mtproto.pack,
+            message,
+            self.salt,
+            self.session_id,
+            self.auth_key,
+            self.auth_key_id
+        )
+
+        try:
+            payload = (
+                pack()
+                if message.length <= self.crypto_inline_threshold
+                else await self.loop.run_in_executor(self.crypto_executor, pack)
+            )
+
+            await self.connection.send(payload)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
     async def send(
         self,
         data: TLObject,
@@ -350,18 +513,20 @@ class Session:
         log.debug(f"Sent:")
         log.debug(message)
 
-        payload = await self.loop.run_in_executor(
-            pyrogram.crypto_executor,
-            mtproto.pack,
-            message,
-            self.salt,
-            self.session_id,
-            self.auth_key,
-            self.auth_key_id
-        )
+        if self.send_task is None:
+            self.results.pop(msg_id, None)
+            raise OSError("Session is not running")
+
+        future = self.loop.create_future()
+
+        self.send_queue.append((message, future))
+        # The send worker waits SEND_FLUSH_INTERVAL (1 ms) for more messages to coalesce before flushing,
+        # which adds up to that much latency to every outgoing message
+        self.send_queue_size += message.length + 16
+        self.send_queue_event.set()
 
         try:
-            await self.connection.send(payload)
+            await future
         except OSError as e:
             self.results.pop(msg_id, None)
             raise e
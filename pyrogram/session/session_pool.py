@@ -0,0 +1,163 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+import logging
+from typing import List
+
+import pyrogram
+from pyrogram import raw
+from .session import Session
+
+log = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Long-lived media sessions to one DC, shared by every upload (or, with *is_cdn*, by every download redirected to
+    that CDN DC) instead of being created for each file.
+
+    Sessions are started on demand, up to *size*. A pool that has no users gets its sessions pinged every
+    HEALTH_CHECK_INTERVAL seconds (the ones not answering are dropped) and is emptied after IDLE_TIMEOUT seconds.
+    The pool also tracks how many parallel requests yield the best throughput, see :meth:`report`.
+    """
+
+    IDLE_TIMEOUT = 300
+    HEALTH_CHECK_INTERVAL = 60
+    HEALTH_CHECK_TIMEOUT = 5
+
+    # Bounds for the number of parallel requests per session
+    MIN_WORKERS = 1
+    MAX_WORKERS = 16
+    WORKERS = 4
+
+    def __init__(self, client: "pyrogram.Client", dc_id: int, size: int, is_cdn: bool = False):
+        self.client = client
+        self.dc_id = dc_id
+        self.size = max(size, 1)
+        self.is_cdn = is_cdn
+
+        self.sessions = []  # type: List[Session]
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+        self.workers = self.WORKERS
+        self.throughput = 0.0
+
+        self.loop = asyncio.get_event_loop()
+        self.last_used = self.loop.time()
+        self.idle_event = asyncio.Event()
+        self.idle_task = None
+
+    async def create_session(self) -> Session:
+        if self.is_cdn:
+            return await self.client.create_media_session(self.dc_id, is_cdn=True)
+
+        session = Session(
+            self.client, self.dc_id, await self.client.storage.auth_key(),
+            await self.client.storage.test_mode(), is_media=True
+        )
+
+        await session.start()
+
+        return session
+
+    async def acquire(self, count: int) -> List[Session]:
+        """Return *count* started sessions (at most the pool size). Must be paired with :meth:`release`."""
+        count = min(max(count, 1), self.size)
+
+        async with self.lock:
+            missing = count - len(self.sessions)
+
+            if missing > 0:
+                self.sessions.extend(await asyncio.gather(*[self.create_session() for _ in range(missing)]))
+
+            self.users += 1
+
+            if self.idle_task is None:
+                self.idle_task = self.loop.create_task(self.idle_worker())
+
+            return self.sessions[:count]
+
+    def release(self):
+        self.users -= 1
+        self.last_used = self.loop.time()
+
+    def report(self, workers: int, size: int, elapsed: float):
+        """Feed the throughput of a transfer that ran *workers* parallel requests per session.
+
+        The per-session worker count is nudged up while throughput keeps improving and backed off when it drops.
+        Transfers that couldn't use all the workers tell nothing about them and are ignored.
+        """
+        if workers < self.workers or elapsed <= 0:
+            return
+
+        throughput = size / elapsed
+
+        if throughput > self.throughput * 1.1:
+            self.workers = min(self.workers + 1, self.MAX_WORKERS)
+        elif throughput < self.throughput * 0.8:
+            self.workers = max(self.workers - 1, self.MIN_WORKERS)
+
+        self.throughput = throughput
+
+    async def check_health(self):
+        async with self.lock:
+            for session in list(self.sessions):
+                try:
+                    await session.send(raw.functions.Ping(ping_id=0), timeout=self.HEALTH_CHECK_TIMEOUT)
+                except Exception as e:
+                    log.info("Dropping media session to DC%s: %s", self.dc_id, e)
+                    self.sessions.remove(session)
+                    await session.stop()
+
+    async def idle_worker(self):
+        while self.sessions or self.users:
+            try:
+                await asyncio.wait_for(self.idle_event.wait(), self.HEALTH_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+
+            if self.users:
+                continue
+
+            if self.loop.time() - self.last_used >= self.IDLE_TIMEOUT:
+                async with self.lock:
+                    if not self.users:
+                        await self.close_sessions()
+            else:
+                await self.check_health()
+
+        self.idle_task = None
+
+    async def close_sessions(self):
+        sessions, self.sessions = self.sessions, []
+
+        for session in sessions:
+            await session.stop()
+
+    async def stop(self):
+        self.idle_event.set()
+
+        if self.idle_task is not None:
+            await self.idle_task
+
+        self.idle_event.clear()
+
+        async with self.lock:
+            await self.close_sessions()
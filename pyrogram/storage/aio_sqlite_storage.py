@@ -16,13 +16,13 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-import inspect
 import aiosqlite  # aiosqlite==0.20.0
 import os
 import time
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Dict
 
 from pyrogram import raw
+from .file_storage import USERNAMES_SCHEMA, UPDATE_STATE_SCHEMA, AUTH_KEYS_SCHEMA
 from .storage import Storage
 from .. import utils
 from pathlib import Path
@@ -65,6 +65,12 @@ CREATE TABLE update_state
     seq  INTEGER
 );
 
+CREATE TABLE auth_keys
+(
+    dc_id    INTEGER PRIMARY KEY,
+    auth_key BLOB
+);
+
 CREATE TABLE version
 (
     number INTEGER PRIMARY KEY
@@ -107,44 +113,57 @@ def get_input_peer(peer_id: int, access_hash: int, peer_type: str):
 
 
 class AioSQLiteStorage(Storage):
-    VERSION = 5
+    VERSION = 6
     USERNAME_TTL = 8 * 60 * 60
+    SESSION_FIELDS = ("dc_id", "api_id", "test_mode", "auth_key", "date", "user_id", "is_bot")
 
     def __init__(self, name: str):
         super().__init__(name)
 
         self.conn = None  # type: aiosqlite.Connection
+        # In-memory copy of the single sessions row; loaded on first access, written through on every change
+        self.session = None  # type: Dict[str, Any] | None
 
     async def update(self):
-        version = await self.version()
+        # Every open used to add 4 to the version, whether the steps ran or not: files opened more than once are at
+        # or past VERSION without the auth_keys table, which is therefore created on every open below
+        version = min(await self.version(), self.VERSION)
 
         if version == 1:
             await self.conn.execute("DELETE FROM peers")
             await self.conn.commit()
 
-        version += 1
+            version += 1
 
         if version == 2:
             await self.conn.execute("ALTER TABLE sessions ADD api_id INTEGER")
             await self.conn.commit()
 
-        version += 1
+            version += 1
 
         if version == 3:
             await self.conn.executescript(USERNAMES_SCHEMA)
             await self.conn.commit()
 
-        version += 1
+            version += 1
 
         if version == 4:
             await self.conn.executescript(UPDATE_STATE_SCHEMA)
             await self.conn.commit()
 
-        version += 1
+            version += 1
+
+        if version == 5:
+            version += 1
+
+        await self.conn.executescript(AUTH_KEYS_SCHEMA)
+        await self.conn.commit()
 
         await self.version(version)
 
     async def create(self):
+        self.session = None
+
         await self.conn.executescript(SCHEMA)
 
         await self.conn.execute(
@@ -180,6 +199,7 @@ class AioSQLiteStorage(Storage):
 
     async def close(self):
         await self.conn.close()
+        self.session = None
 
     async def delete(self):
         os.remove(self.name)
@@ -223,6 +243,14 @@ class AioSQLiteStorage(Storage):
             )
             await self.conn.commit()
 
+    async def update_states(self, values: List[Tuple[int, int, int, int, int]]):
+        await self.conn.executemany(
+            "REPLACE INTO update_state (id, pts, qts, date, seq)"
+            "VALUES (?, ?, ?, ?, ?)",
+            values
+        )
+        await self.conn.commit()
+
     async def get_peer_by_id(self, peer_id: int):
         q = await self.conn.execute(
             "SELECT id, access_hash, type FROM peers WHERE id = ?",
@@ -268,46 +296,70 @@ class AioSQLiteStorage(Storage):
 
         return get_input_peer(*r)
 
-    async def _get(self):
-        attr = inspect.stack()[2].function
-
-        r = await self.conn.execute(
-            f"SELECT {attr} FROM sessions"
-        )
-        return (await r.fetchone())[0]
+    async def _get(self, attr: str):
+        if self.session is None:
+            r = await self.conn.execute(
+                f"SELECT {', '.join(self.SESSION_FIELDS)} FROM sessions"
+            )
+            self.session = dict(zip(self.SESSION_FIELDS, await r.fetchone()))
 
-    async def _set(self, value: Any):
-        attr = inspect.stack()[2].function
+        return self.session[attr]
 
+    async def _set(self, attr: str, value: Any):
         await self.conn.execute(
             f"UPDATE sessions SET {attr} = ?",
             (value,)
         )
         await self.conn.commit()
 
-    async def _accessor(self, value: Any = object):
-        return await self._get() if value == object else await self._set(value)
+        if self.session is not None:
+            self.session[attr] = value
+
+    async def _accessor(self, attr: str, value: Any = object):
+        return await self._get(attr) if value == object else await self._set(attr, value)
+
+    async def dc_auth_key(self, dc_id: int, value: bytes = object):
+        if value == object:
+            r = await self.conn.execute(
+                "SELECT auth_key FROM auth_keys WHERE dc_id = ?",
+                (dc_id,)
+            )
+            r = await r.fetchone()
+
+            return r[0] if r else None
+        else:
+            if value is None:
+                await self.conn.execute(
+                    "DELETE FROM auth_keys WHERE dc_id = ?",
+                    (dc_id,)
+                )
+            else:
+                await self.conn.execute(
+                    "REPLACE INTO auth_keys (dc_id, auth_key) VALUES (?, ?)",
+                    (dc_id, value)
+                )
+            await self.conn.commit()
 
     async def dc_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("dc_id", value)
 
     async def api_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("api_id", value)
 
     async def test_mode(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("test_mode", value)
 
     async def auth_key(self, value: bytes = object):
-        return await self._accessor(value)
+        return await self._accessor("auth_key", value)
 
     async def date(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("date", value)
 
     async def user_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("user_id", value)
 
     async def is_bot(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("is_bot", value)
 
     async def version(self, value: int = object):
         if value == object:
@@ -52,6 +52,14 @@ CREATE TABLE update_state
 );
 """
 
+AUTH_KEYS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS auth_keys
+(
+    dc_id    INTEGER PRIMARY KEY,
+    auth_key BLOB
+);
+"""
+
 
 class FileStorage(SQLiteStorage):
     FILE_EXTENSION = ".session"
@@ -105,6 +113,12 @@ class FileStorage(SQLiteStorage):
 
             version += 1
 
+        if version == 6:
+            with self.conn:
+                self.conn.executescript(AUTH_KEYS_SCHEMA)
+
+            version += 1
+
         await self.version(version)
 
     async def open(self):
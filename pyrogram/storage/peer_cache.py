@@ -0,0 +1,182 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from pyrogram import raw
+from .sqlite_storage import get_input_peer
+from .storage import Storage
+from .write_behind import WriteBehind
+
+# Usernames and phone number of a peer that was loaded from the storage, which only returns its InputPeer
+UNKNOWN = object()
+
+
+class PeerCache(WriteBehind):
+    """In-process cache in front of the peers of a :obj:`~pyrogram.storage.Storage`.
+
+    Peers are kept by id, username and phone number, up to *size* ids in least recently used order. Peers passed to
+    :meth:`update_peers` are only written when their access hash, type, usernames or phone number changed, or when they
+    have usernames and were last written more than REWRITE_INTERVAL seconds ago: the storage only resolves usernames
+    updated within USERNAME_TTL. The changed rows are written in one :meth:`Storage.update_peers <pyrogram.storage.Storage.update_peers>` call every
+    FLUSH_INTERVAL seconds, as soon as FLUSH_THRESHOLD rows are pending, and on :meth:`stop`.
+    """
+
+    FLUSH_THRESHOLD = 1000
+    USERNAME_TTL = 8 * 60 * 60
+    REWRITE_INTERVAL = USERNAME_TTL // 2
+
+    def __init__(self, storage: Storage, size: int):
+        super().__init__()
+
+        self.storage = storage
+        self.size = max(size, 1)
+
+        # id -> (access_hash, type, usernames, phone_number, time it was last written)
+        self.peers = OrderedDict()  # type: OrderedDict[int, tuple]
+        # username -> (id, time it was last seen)
+        self.usernames = {}  # type: Dict[str, Tuple[int, float]]
+        self.phone_numbers = {}  # type: Dict[str, int]
+        # id -> row not yet written, in the format Storage.update_peers accepts
+        self.pending = {}  # type: Dict[int, Tuple[int, int, str, Optional[List[str]], Optional[str]]]
+
+    def update_peers(self, peers: List[Tuple[int, int, str, Optional[List[str]], Optional[str]]]):
+        """Record peers seen in an update or a response, in the format Storage.update_peers accepts."""
+        now = time.time()
+
+        for row in peers:
+            id, access_hash, type, usernames, phone_number = row
+            peer = (access_hash, type, tuple(usernames) if usernames else None, phone_number)
+
+            for username in peer[2] or ():
+                self.usernames[username] = (id, now)
+
+            old = self.peers.get(id)
+
+            if old is not None and old[:4] == peer and (not peer[2] or now - old[4] < self.REWRITE_INTERVAL):
+                self.peers.move_to_end(id)
+                continue
+
+            if old is not None:
+                self.forget(id, old, peer)
+
+            self.peers[id] = peer + (now,)
+            self.peers.move_to_end(id)
+
+            if phone_number:
+                self.phone_numbers[phone_number] = id
+
+            self.pending[id] = row
+
+        while len(self.peers) > self.size:
+            self.forget(*self.peers.popitem(last=False))
+
+        if self.pending:
+            self.schedule(len(self.pending) >= self.FLUSH_THRESHOLD)
+
+    def forget(self, id: int, peer: tuple, new_peer: tuple = (None, None, None, None, None)):
+        """Drop the usernames and phone number of *peer* that still point to it and are not in *new_peer*."""
+        if peer[2] is not UNKNOWN:
+            for username in peer[2] or ():
+                if username not in (new_peer[2] or ()) and self.usernames.get(username, (None,))[0] == id:
+                    del self.usernames[username]
+
+        if peer[3] is not UNKNOWN and peer[3] and peer[3] != new_peer[3] and self.phone_numbers.get(peer[3]) == id:
+            del self.phone_numbers[peer[3]]
+
+    def get(self, peer_id: int) -> Optional[raw.base.InputPeer]:
+        peer = self.peers.get(peer_id)
+
+        if peer is not None:
+            self.peers.move_to_end(peer_id)
+            return get_input_peer(peer_id, peer[0], peer[1])
+
+        # Evicted before being written
+        row = self.pending.get(peer_id)
+
+        if row is not None:
+            return get_input_peer(*row[:3])
+
+        return None
+
+    def add(self, peer_id: int, input_peer: raw.base.InputPeer) -> raw.base.InputPeer:
+        """Cache a peer read from the storage."""
+        if isinstance(peer_id, int) and peer_id not in self.peers and peer_id not in self.pending:
+            if isinstance(input_peer, raw.types.InputPeerUser):
+                peer_type = "user"
+            elif isinstance(input_peer, raw.types.InputPeerChat):
+                peer_type = "group"
+            else:
+                peer_type = "channel"
+
+            self.peers[peer_id] = (getattr(input_peer, "access_hash", 0), peer_type, UNKNOWN, UNKNOWN, 0)
+
+            while len(self.peers) > self.size:
+                self.forget(*self.peers.popitem(last=False))
+
+        return input_peer
+
+    async def get_peer_by_id(self, peer_id: int) -> raw.base.InputPeer:
+        input_peer = self.get(peer_id)
+
+        if input_peer is not None:
+            return input_peer
+
+        # resolve_peer looks usernames up by id first, no stored id can match them
+        if isinstance(peer_id, str) and not peer_id.lstrip("-").isdigit():
+            raise KeyError(f"ID not found: {peer_id}")
+
+        return self.add(peer_id, await self.storage.get_peer_by_id(peer_id))
+
+    async def get_peer_by_username(self, username: str) -> raw.base.InputPeer:
+        id, date = self.usernames.get(username, (None, 0))
+
+        if id is not None and time.time() - date <= self.USERNAME_TTL:
+            input_peer = self.get(id)
+
+            if input_peer is not None:
+                return input_peer
+
+        # The storage knows since when it has the username, the cache only trusts the ones it has seen itself
+        return await self.storage.get_peer_by_username(username)
+
+    async def get_peer_by_phone_number(self, phone_number: str) -> raw.base.InputPeer:
+        id = self.phone_numbers.get(phone_number)
+
+        if id is not None:
+            input_peer = self.get(id)
+
+            if input_peer is not None:
+                return input_peer
+
+        input_peer = await self.storage.get_peer_by_phone_number(phone_number)
+
+        return self.add(input_peer.user_id, input_peer)
+
+    async def write(self, rows: Dict[int, Tuple[int, int, str, Optional[List[str]], Optional[str]]]):
+        await self.storage.update_peers(list(rows.values()))
+
+    async def stop(self):
+        """Write the pending rows and empty the cache, the storage may be replaced or deleted afterwards."""
+        await super().stop()
+
+        self.peers.clear()
+        self.usernames.clear()
+        self.phone_numbers.clear()
@@ -22,11 +22,10 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import inspect
 import sqlite3
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Dict
 
 from pyrogram import raw
 from .storage import Storage
@@ -70,6 +69,12 @@ CREATE TABLE update_state
     seq  INTEGER
 );
 
+CREATE TABLE auth_keys
+(
+    dc_id    INTEGER PRIMARY KEY,
+    auth_key BLOB
+);
+
 CREATE TABLE version
 (
     number INTEGER PRIMARY KEY
@@ -113,8 +118,9 @@ def get_input_peer(peer_id: int, access_hash: int, peer_type: str):
 
 
 class SQLiteStorage(Storage):
-    VERSION = 6
+    VERSION = 7
     USERNAME_TTL = 8 * 60 * 60
+    SESSION_FIELDS = ("dc_id", "api_id", "test_mode", "auth_key", "date", "user_id", "is_bot")
 
     def __init__(self, name: str):
         super().__init__(name)
@@ -122,6 +128,8 @@ class SQLiteStorage(Storage):
         self.executor = ThreadPoolExecutor(1)
         self.loop = asyncio.get_event_loop()
         self.conn = None  # type: sqlite3.Connection | None
+        # In-memory copy of the single sessions row; loaded on first access, written through on every change
+        self.session = None  # type: Dict[str, Any] | None
 
     def _create_impl(self):
         with self.conn:
@@ -138,6 +146,7 @@ class SQLiteStorage(Storage):
             )
 
     async def create(self):
+        self.session = None
         return await self.loop.run_in_executor(self.executor, self._create_impl)
 
     async def open(self):
@@ -150,6 +159,7 @@ class SQLiteStorage(Storage):
     async def close(self):
         await self.loop.run_in_executor(self.executor, self.conn.close)
         self.executor.shutdown()
+        self.session = None
 
     async def delete(self):
         raise NotImplementedError
@@ -208,6 +218,17 @@ class SQLiteStorage(Storage):
     async def update_state(self, value: Tuple[int, int, int, int, int] = object):
         return await self.loop.run_in_executor(self.executor, self._update_state_impl, value)
 
+    def _update_states_impl(self, values: List[Tuple[int, int, int, int, int]]):
+        with self.conn:
+            self.conn.executemany(
+                "REPLACE INTO update_state (id, pts, qts, date, seq)"
+                "VALUES (?, ?, ?, ?, ?)",
+                values
+            )
+
+    async def update_states(self, values: List[Tuple[int, int, int, int, int]]):
+        return await self.loop.run_in_executor(self.executor, self._update_states_impl, values)
+
     def _get_peer_by_id_impl(self, peer_id: int):
         with self.conn:
             return self.conn.execute(
@@ -259,33 +280,55 @@ class SQLiteStorage(Storage):
 
         return get_input_peer(*r)
 
-    def _get_impl(self, attr: str):
+    def _get_session_impl(self):
         with self.conn:
-            return self.conn.execute(f"SELECT {attr} FROM sessions").fetchone()[0]
+            row = self.conn.execute(f"SELECT {', '.join(self.SESSION_FIELDS)} FROM sessions").fetchone()
+
+        return dict(zip(self.SESSION_FIELDS, row))
 
-    # async def _get(self, attr: str):
-    #     return await self.loop.run_in_executor(self.executor, self._get_impl, attr)
+    async def _get(self, attr: str):
+        if self.session is None:
+            self.session = await self.loop.run_in_executor(self.executor, self._get_session_impl)
 
-    async def _get(self):
-        attr = inspect.stack()[2].function
-        return await self.loop.run_in_executor(self.executor, self._get_impl, attr)
+        return self.session[attr]
 
-    def _set_impl(self, attr: str, value: any):
+    def _set_impl(self, attr: str, value: Any):
         with self.conn:
             return self.conn.execute(f"UPDATE sessions SET {attr} = ?", (value,))
 
-    # async def _set(self, attr: str, value: Any):
-    #     return await self.loop.run_in_executor(self.executor, self._set_impl, attr, value)
+    async def _set(self, attr: str, value: Any):
+        await self.loop.run_in_executor(self.executor, self._set_impl, attr, value)
+
+        if self.session is not None:
+            self.session[attr] = value
+
+    async def _accessor(self, attr: str, value: Any = object):
+        return await self._get(attr) if value == object else await self._set(attr, value)
 
-    async def _set(self, value: Any):
-        attr = inspect.stack()[2].function
+    def _dc_auth_key_impl(self, dc_id: int, value: bytes = object):
+        if value == object:
+            r = self.conn.execute(
+                "SELECT auth_key FROM auth_keys WHERE dc_id = ?",
+                (dc_id,)
+            ).fetchone()
+
+            return r[0] if r else None
+        else:
+            with self.conn:
+                if value is None:
+                    self.conn.execute(
+                        "DELETE FROM auth_keys WHERE dc_id = ?",
+                        (dc_id,)
+                    )
+                else:
+                    self.conn.execute(
+                        "REPLACE INTO auth_keys (dc_id, auth_key) VALUES (?, ?)",
+                        (dc_id, value)
+                    )
 
-        return await self.loop.run_in_executor(self.executor, self._set_impl, attr, value)
+    async def dc_auth_key(self, dc_id: int, value: bytes = object):
+        return await self.loop.run_in_executor(self.executor, self._dc_auth_key_impl, dc_id, value)
 
-    async def _accessor(self, value: Any = object):
-        # return await self._get(attr) if value == object else await self._set(attr, value)
-        return await self._get() if value == object else await self._set(value)
-    
     def _get_version_impl(self):
         with self.conn:
             return self.conn.execute("SELECT number FROM version").fetchone()[0]
@@ -295,25 +338,25 @@ class SQLiteStorage(Storage):
             return self.conn.execute("UPDATE version SET number = ?", (value,))
 
     async def dc_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("dc_id", value)
 
     async def api_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("api_id", value)
 
     async def test_mode(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("test_mode", value)
 
     async def auth_key(self, value: bytes = object):
-        return await self._accessor(value)
+        return await self._accessor("auth_key", value)
 
     async def date(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("date", value)
 
     async def user_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("user_id", value)
 
     async def is_bot(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("is_bot", value)
 
     async def version(self, value: int = object):
         if value == object:
@@ -97,6 +97,18 @@ class Storage(ABC):
         """
         raise NotImplementedError
 
+    async def update_states(self, update_states: List[Tuple[int, int, int, int, int]]):
+        """Set the update state of several entities at once.
+
+        Storage engines that support transactions should override this to write all the states in a single one.
+
+        Parameters:
+            update_states (List of ``Tuple[int, int, int, int, int]``): The update states to set, in the same format
+                :meth:`update_state` accepts.
+        """
+        for update_state in update_states:
+            await self.update_state(update_state)
+
     @abstractmethod
     async def get_peer_by_id(self, peer_id: int):
         """Retrieve a peer by its ID.
@@ -167,6 +179,21 @@ class Storage(ABC):
         """
         raise NotImplementedError
 
+    async def dc_auth_key(self, dc_id: int, value: bytes = object):
+        """Get or set the authorization key used for a DC other than the one of the current session.
+
+        Storage engines that don't override this keep no such key: media sessions for other DCs then exchange a new
+        authorization key every time they are created.
+
+        Parameters:
+            dc_id (``int``):
+                The DC ID the key belongs to.
+
+            value (``bytes``, *optional*):
+                The authorization key to set. Pass None to remove the stored key.
+        """
+        return None
+
     @abstractmethod
     async def date(self, value: int = object):
         """Get or set the date of the current session.
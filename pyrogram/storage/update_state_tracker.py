@@ -0,0 +1,67 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Dict, List, Optional, Tuple
+
+from .storage import Storage
+from .write_behind import WriteBehind
+
+
+class UpdateStateTracker(WriteBehind):
+    """Write-behind buffer in front of :meth:`Storage.update_state <pyrogram.storage.Storage.update_state>`.
+
+    The latest (id, pts, qts, date, seq) row of every channel (0 for the common box) is kept in memory and rows are
+    written in one transaction every FLUSH_INTERVAL seconds, as soon as FLUSH_THRESHOLD states were recorded since the
+    last flush, and on :meth:`stop`.
+
+    A state is recorded at the same point it used to be written, so the stored one can only lag behind: after a crash,
+    recover_gaps asks the server for the difference since an older pts and gets some updates twice, never a gap.
+    """
+
+    FLUSH_THRESHOLD = 500
+
+    def __init__(self, storage: Storage):
+        super().__init__()
+
+        self.storage = storage
+
+        self.pending = {}  # type: Dict[int, Tuple[int, int, Optional[int], int, Optional[int]]]
+        self.recorded = 0
+
+    def set(self, state: Tuple[int, int, Optional[int], int, Optional[int]]):
+        """Record the latest state of a channel, replacing the one not yet written."""
+        self.pending[state[0]] = state
+        self.recorded += 1
+
+        self.schedule(self.recorded >= self.FLUSH_THRESHOLD)
+
+    async def get(self) -> List[Tuple[int, int, int, int, int]]:
+        """Write the pending states and return all the stored ones."""
+        await self.flush()
+
+        return await self.storage.update_state()
+
+    async def delete(self, id: int):
+        async with self.lock:
+            self.pending.pop(id, None)
+            await self.storage.update_state(id)
+
+    async def write(self, states: Dict[int, Tuple[int, int, Optional[int], int, Optional[int]]]):
+        self.recorded = 0
+
+        await self.storage.update_states(list(states.values()))
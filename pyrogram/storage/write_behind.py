@@ -0,0 +1,91 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from typing import Dict
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """Rows kept in memory, by key, and written to the storage in the background.
+
+    Subclasses add rows to ``pending``, call :meth:`schedule` and implement :meth:`write`. The pending rows are written
+    every FLUSH_INTERVAL seconds, as soon as :meth:`schedule` is asked to, and on :meth:`stop`.
+    """
+
+    FLUSH_INTERVAL = 1
+
+    def __init__(self):
+        self.pending = {}  # type: Dict
+
+        self.lock = asyncio.Lock()
+        self.flush_event = asyncio.Event()
+        self.flush_task = None
+
+    def schedule(self, now: bool = False):
+        """Start writing the pending rows in the background, without waiting for FLUSH_INTERVAL if *now* is True."""
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_worker())
+
+        if now:
+            self.flush_event.set()
+
+    async def write(self, rows: Dict):
+        raise NotImplementedError
+
+    async def flush(self):
+        async with self.lock:
+            if not self.pending:
+                return
+
+            rows, self.pending = self.pending, {}
+
+            try:
+                await self.write(rows)
+            except BaseException:
+                # Put back the rows that were not replaced meanwhile, they will be written by the next flush
+                for key, row in rows.items():
+                    self.pending.setdefault(key, row)
+
+                raise
+
+    async def flush_worker(self):
+        while self.flush_task is not None:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), self.FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+            self.flush_event.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                log.exception(e)
+
+    async def stop(self):
+        """Stop the background writes and write the pending rows."""
+        if self.flush_task is not None:
+            flush_task, self.flush_task = self.flush_task, None
+
+            self.flush_event.set()
+            await flush_task
+
+        await self.flush()
@@ -23,7 +23,7 @@ from typing import List, Match, Union, BinaryIO, Optional, Callable
 
 import pyrogram
 from pyrogram import raw, enums, types, utils
-from pyrogram.errors import MessageIdsEmpty, PeerIdInvalid
+from pyrogram.errors import PeerIdInvalid
 from pyrogram.parser import utils as parser_utils, Parser
 from ..object import Object
 from ..update import Update
@@ -654,7 +654,9 @@ class Message(Object, Update):
         is_scheduled: bool = False,
         replies: int = 1,
         business_connection_id: str = None,
-        raw_reply_to_message: raw.base.Message = None
+        raw_reply_to_message: raw.base.Message = None,
+        resolve_replies: bool = True,
+        cache: bool = True
     ):
         peer_id = utils.get_raw_peer_id(message.peer_id)
 
@@ -1038,32 +1040,9 @@ class Message(Object, Update):
                 client=client
             )
 
-            if isinstance(action, raw.types.MessageActionPinMessage):
-                try:
-                    parsed_message.pinned_message = await client.get_messages(
-                        chat_id=parsed_message.chat.id,
-                        reply_to_message_ids=message.id,
-                        replies=0
-                    )
-                    parsed_message.service = enums.MessageServiceType.PINNED_MESSAGE
-                except MessageIdsEmpty:
-                    pass
-
             if isinstance(action, raw.types.MessageActionGameScore):
                 parsed_message.game_high_score = types.GameHighScore._parse_action(client, message, users)
 
-                if message.reply_to and replies:
-                    try:
-                        parsed_message.reply_to_message = await client.get_messages(
-                            chat_id=parsed_message.chat.id,
-                            reply_to_message_ids=message.id,
-                            replies=0
-                        )
-
-                        parsed_message.service = enums.MessageServiceType.GAME_HIGH_SCORE
-                    except MessageIdsEmpty:
-                        pass
-
         if isinstance(message, raw.types.Message):
             entities = [types.MessageEntity._parse(client, entity, users) for entity in message.entities]
             entities = types.List(filter(lambda x: x is not None, entities))
@@ -1388,22 +1367,6 @@ class Message(Object, Update):
             if isinstance(message.reply_to, raw.types.MessageReplyStoryHeader):
                 parsed_message.reply_to_story = await types.Story._parse(client, users, chats, None, message.reply_to, None, None, None)
 
-            if replies:
-                try:
-                    key = (parsed_message.chat.id, parsed_message.reply_to_message_id)
-                    reply_to_message = client.message_cache[key]
-
-                    if not reply_to_message:
-                        reply_to_message = await client.get_messages(
-                            chat_id=parsed_message.chat.id,
-                            reply_to_message_ids=message.id,
-                            replies=replies - 1
-                        )
-
-                    parsed_message.reply_to_message = reply_to_message
-                except MessageIdsEmpty:
-                    pass
-
         if business_connection_id:
             parsed_message.business_connection_id = business_connection_id
         if raw_reply_to_message:
@@ -1416,11 +1379,19 @@ class Message(Object, Update):
                 replies=0
             )
 
-        if not parsed_message.poll:  # Do not cache poll messages
-            client.message_cache[(parsed_message.chat.id, parsed_message.id)] = parsed_message
-
         parsed_message._raw = message
 
+        if cache and not parsed_message.poll:  # Do not cache poll messages
+            client.message_cache[(parsed_message.chat.id, parsed_message.id)] = (
+                utils.pack_message(message, users, chats)
+                if client.compact_message_cache and not business_connection_id and not is_scheduled
+                else parsed_message
+            )
+
+        # Replied, pinned and game score messages are fetched apart, so that a page of messages needs one request
+        if resolve_replies:
+            await utils.fetch_reply_messages(client, [parsed_message], replies)
+
         return parsed_message
 
     @property
@@ -4987,7 +4958,8 @@ class Message(Object, Update):
         in_memory: bool = False,
         block: bool = True,
         progress: Callable = None,
-        progress_args: tuple = ()
+        progress_args: tuple = (),
+        buffer: Union[bytearray, memoryview] = None
     ) -> str:
         """Bound method *download* of :obj:`~pyrogram.types.Message`.
 
@@ -5029,6 +5001,10 @@ class Message(Object, Update):
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            buffer (``bytearray`` | ``memoryview``, *optional*):
+                Pass a preallocated writable buffer to download the media straight into it.
+                A memoryview over the downloaded bytes will be returned.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -5054,6 +5030,7 @@ class Message(Object, Update):
             block=block,
             progress=progress,
             progress_args=progress_args,
+            buffer=buffer,
         )
 
     async def vote(
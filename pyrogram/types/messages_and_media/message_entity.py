@@ -106,18 +106,18 @@ class MessageEntity(Object):
         args = self.__dict__.copy()
 
         for arg in ("_client", "type", "user"):
-            args.pop(arg)
+            args.pop(arg, None)
 
         if self.user:
             args["user_id"] = await self._client.resolve_peer(self.user.id)
 
         if not self.url:
-            args.pop("url")
+            args.pop("url", None)
 
         if self.language is None:
-            args.pop("language")
+            args.pop("language", None)
 
-        args.pop("custom_emoji_id")
+        args.pop("custom_emoji_id", None)
         if self.custom_emoji_id is not None:
             args["document_id"] = self.custom_emoji_id
 
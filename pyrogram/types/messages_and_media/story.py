@@ -452,7 +452,8 @@ class Story(Object, Update):
         in_memory: bool = False,
         block: bool = True,
         progress: Callable = None,
-        progress_args: tuple = ()
+        progress_args: tuple = (),
+        buffer: Union[bytearray, memoryview] = None
     ) -> str:
         """Bound method *download* of :obj:`~pyrogram.types.Story`.
 
@@ -494,6 +495,10 @@ class Story(Object, Update):
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            buffer (``bytearray`` | ``memoryview``, *optional*):
+                Pass a preallocated writable buffer to download the media straight into it.
+                A memoryview over the downloaded bytes will be returned.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -519,6 +524,7 @@ class Story(Object, Update):
             block=block,
             progress=progress,
             progress_args=progress_args,
+            buffer=buffer,
         )
 
     @property
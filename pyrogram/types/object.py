@@ -16,6 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import inspect
 import typing
 from datetime import datetime
 from enum import Enum
@@ -24,7 +25,47 @@ from json import dumps
 import pyrogram
 
 
-class Object:
+class Meta(type):
+    """Keeps the fields left to None out of the instances, so that unset optional fields cost no memory.
+
+    Every ``__init__`` parameter of a class becomes a class attribute defaulting to None (unless the class already has
+    an attribute with that name) and, once an instance is built, its attributes that are still None are dropped from
+    its ``__dict__``: reading them falls back to the class attribute.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+
+        fields = set(getattr(cls, "_none_fields", ()))
+
+        if "__init__" in namespace:
+            for parameter in list(inspect.signature(cls.__init__).parameters.values())[1:]:
+                if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD) or parameter.name == "client":
+                    continue
+
+                if not hasattr(cls, parameter.name):
+                    setattr(cls, parameter.name, None)
+
+                if getattr(cls, parameter.name) is None:
+                    fields.add(parameter.name)
+
+        cls._none_fields = frozenset(fields)
+
+    def __call__(cls, *args, **kwargs):
+        obj = super().__call__(*args, **kwargs)
+
+        # Some classes build objects of other types in __new__
+        if isinstance(obj, cls):
+            fields = cls._none_fields
+            obj.__dict__ = {k: v for k, v in obj.__dict__.items() if v is not None or k not in fields}
+
+        return obj
+
+
+class Object(metaclass=Meta):
+    _client = None
+    _none_fields = frozenset({"_client"})
+
     def __init__(self, client: "pyrogram.Client" = None):
         self._client = client
 
@@ -90,7 +131,8 @@ class Object:
         )
 
     def __eq__(self, other: "Object") -> bool:
-        for attr in self.__dict__:
+        # Fields left to None are only stored by the objects they were set to None on after being built
+        for attr in self.__dict__.keys() | getattr(other, "__dict__", {}).keys():
             try:
                 if attr.startswith("_"):
                     continue
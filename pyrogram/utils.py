@@ -26,11 +26,13 @@ import struct
 from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime, timezone
 from getpass import getpass
+from io import BytesIO
 from typing import Union, List, Dict, Optional
 
 import pyrogram
 from pyrogram import raw, enums
 from pyrogram import types
+from pyrogram.errors import MessageIdsEmpty
 from pyrogram.file_id import FileId, FileType, PHOTO_TYPES, DOCUMENT_TYPES
 
 
@@ -118,7 +120,8 @@ async def parse_messages(
                         users,
                         chats,
                         is_scheduled=isinstance(u, raw.types.UpdateNewScheduledMessage),
-                        replies=replies
+                        replies=replies,
+                        resolve_replies=False
                     )
                 )
 
@@ -140,6 +143,12 @@ async def parse_messages(
                     )
                 )
 
+        await fetch_reply_messages(
+            client,
+            [m for m in parsed_messages if not m.business_connection_id],
+            replies
+        )
+
         return types.List(parsed_messages)
 
     users = {i.id: i for i in messages.users}
@@ -156,42 +165,174 @@ async def parse_messages(
                 users,
                 chats,
                 is_scheduled=is_scheduled,
-                replies=replies
+                replies=replies,
+                resolve_replies=False
             )
         )
 
-    if replies and False:  # TODO
-        messages_with_replies = {
-            # TODO: fix this logic someday
-            i.id: i.reply_to.reply_to_msg_id
-            for i in messages.messages
-            if not isinstance(i, raw.types.MessageEmpty) and i.reply_to
+    await fetch_reply_messages(client, parsed_messages, replies)
+
+    return types.List(parsed_messages)
+
+
+async def fetch_reply_messages(client, messages: List["types.Message"], replies: int):
+    """Attach the replied messages (up to *replies* levels deep), pinned messages and game score messages of
+    *messages*, which were parsed with ``resolve_replies=False``.
+
+    The ones missing from the message cache are fetched with one get_messages call per chat.
+    """
+    # chat id -> messages whose target must be fetched from that chat
+    pending = {}  # type: Dict[int, List[types.Message]]
+
+    for message in messages:
+        raw_message = message._raw
+        reply_to = getattr(raw_message, "reply_to", None)
+
+        if isinstance(raw_message, raw.types.MessageService):
+            action = raw_message.action
+
+            if not (
+                isinstance(action, raw.types.MessageActionPinMessage)
+                or isinstance(action, raw.types.MessageActionGameScore) and reply_to and replies
+            ):
+                continue
+        elif isinstance(raw_message, raw.types.Message) and replies:
+            if not isinstance(reply_to, raw.types.MessageReplyHeader) or not reply_to.reply_to_msg_id:
+                continue
+
+            reply_to_message = await client.message_cache.get((message.chat.id, message.reply_to_message_id))
+
+            if reply_to_message:
+                message.reply_to_message = reply_to_message
+                continue
+        else:
+            continue
+
+        pending.setdefault(message.chat.id, []).append(message)
+
+    for chat_id, chat_messages in pending.items():
+        try:
+            reply_messages = await get_reply_messages(
+                client, chat_id, [m.id for m in chat_messages], max(replies - 1, 0)
+            )
+        except MessageIdsEmpty:
+            continue
+
+        reply_messages = {
+            (m.chat.id, m.id): m
+            for m in reply_messages
+            if m and not m.empty and m.chat
         }
 
-        if messages_with_replies:
-            # We need a chat id, but some messages might be empty (no chat attribute available)
-            # Scan until we find a message with a chat available (there must be one, because we are fetching replies)
-            for m in parsed_messages:
-                if m.chat:
-                    chat_id = m.chat.id
-                    break
+        for message in chat_messages:
+            reply_to = getattr(message._raw, "reply_to", None)
+            reply_to_chat_id = (
+                get_peer_id(reply_to.reply_to_peer_id)
+                if getattr(reply_to, "reply_to_peer_id", None)
+                else chat_id
+            )
+            reply_to_message = reply_messages.get((reply_to_chat_id, getattr(reply_to, "reply_to_msg_id", None)))
+
+            if isinstance(message._raw, raw.types.Message):
+                message.reply_to_message = reply_to_message
+            elif isinstance(message._raw.action, raw.types.MessageActionPinMessage):
+                message.pinned_message = reply_to_message
+                message.service = enums.MessageServiceType.PINNED_MESSAGE
             else:
-                chat_id = 0
+                message.reply_to_message = reply_to_message
+                message.service = enums.MessageServiceType.GAME_HIGH_SCORE
 
-            reply_messages = await client.get_messages(
-                chat_id=chat_id,
-                reply_to_message_ids=messages_with_replies.keys(),
-                replies=replies - 1
-            )
 
-            for message in parsed_messages:
-                reply_id = messages_with_replies.get(message.id, None)
+# Most message ids messages.GetMessages and channels.GetMessages accept in one request
+GET_MESSAGES_LIMIT = 200
 
-                for reply in reply_messages:
-                    if reply.id == reply_id:
-                        message.reply_to_message = reply
 
-    return types.List(parsed_messages)
+async def get_reply_messages(client, chat_id: int, message_ids: List[int], replies: int) -> List["types.Message"]:
+    """Same as ``client.get_messages(chat_id, reply_to_message_ids=message_ids, replies=replies)``, but the calls
+    for the same chat and depth made while the event loop is on the same iteration (e.g. by the dispatcher workers
+    parsing a burst of updates) share the requests, of up to GET_MESSAGES_LIMIT ids each.
+    """
+    key = (chat_id, replies)
+    batch = client.reply_message_batches.get(key)
+
+    if batch is None:
+        loop = asyncio.get_running_loop()
+        # The task is kept with the batch, the event loop only holds a weak reference to it
+        batch = client.reply_message_batches[key] = (
+            set(), loop.create_future(), loop.create_task(fetch_reply_message_batch(client, key))
+        )
+
+    batch[0].update(message_ids)
+
+    return await asyncio.shield(batch[1])
+
+
+async def fetch_reply_message_batch(client, key: tuple):
+    # Let the other callers running on this loop iteration add their ids first
+    await asyncio.sleep(0)
+
+    message_ids, future, _ = client.reply_message_batches.pop(key)
+    message_ids = sorted(message_ids)
+
+    try:
+        reply_messages = await asyncio.gather(*[
+            client.get_messages(
+                chat_id=key[0],
+                reply_to_message_ids=message_ids[i:i + GET_MESSAGES_LIMIT],
+                replies=key[1]
+            )
+            for i in range(0, len(message_ids), GET_MESSAGES_LIMIT)
+        ])
+    except Exception as e:
+        future.set_exception(e)
+        # Don't warn about an exception nobody waits for anymore
+        future.exception()
+    else:
+        future.set_result([m for chunk in reply_messages for m in chunk])
+
+
+def get_ints(obj: "raw.core.TLObject", ints: set):
+    """Collect the int values of a raw object and of its nested objects."""
+    for attr in obj.__slots__:
+        value = getattr(obj, attr)
+
+        for item in value if isinstance(value, list) else (value,):
+            if isinstance(item, raw.core.TLObject):
+                get_ints(item, ints)
+            elif type(item) is int:
+                ints.add(item)
+
+
+def pack_message(message: "raw.base.Message", users: dict, chats: dict) -> bytes:
+    """Serialize a raw message together with the users and chats it refers to, see unpack_message.
+
+    Message._parse looks users and chats up by ids held in attributes of any name, so every user and chat whose id is
+    one of the ints of the message is kept: an unrelated int that happens to match an id only costs a few bytes.
+    """
+    ints = set()
+    get_ints(message, ints)
+
+    return raw.types.messages.Messages(
+        messages=[message],
+        chats=[chats[i] for i in ints if i in chats],
+        users=[users[i] for i in ints if i in users]
+    ).write()
+
+
+async def unpack_message(client: "pyrogram.Client", data: bytes) -> "types.Message":
+    """Parse a message serialized by pack_message, without fetching its replied or pinned message."""
+    r = raw.core.TLObject.read(BytesIO(data))
+
+    return await types.Message._parse(
+        client,
+        r.messages[0],
+        {i.id: i for i in r.users},
+        {i.id: i for i in r.chats},
+        replies=0,
+        resolve_replies=False,
+        # Already in the message cache, packed
+        cache=False
+    )
 
 
 def pack_inline_message_id(msg_id: "raw.base.InputBotInlineMessageID"):
@@ -0,0 +1,82 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+from pyrogram.connection.transport import TCP, TCPAbridged, TCPIntermediate
+
+FRAME = bytes(range(256)) * 16
+
+
+async def receive(chunks: int, delay: float):
+    tcp = TCPIntermediate(False, {})
+    tcp.reader = asyncio.StreamReader()
+    tcp.reader.feed_data(len(FRAME).to_bytes(4, "little"))
+
+    async def feed():
+        for i in range(chunks):
+            await asyncio.sleep(delay)
+            tcp.reader.feed_data(FRAME[i * len(FRAME) // chunks:(i + 1) * len(FRAME) // chunks])
+
+    feeder = asyncio.ensure_future(feed())
+
+    try:
+        return await tcp.recv()
+    finally:
+        feeder.cancel()
+        tcp.socket.close()
+
+
+def test_slow_frame_is_received(monkeypatch):
+    # The frame takes four times TIMEOUT to arrive, within the time its length allows at MIN_RATE
+    monkeypatch.setattr(TCP, "TIMEOUT", 0.05)
+    monkeypatch.setattr(TCP, "MIN_RATE", len(FRAME) / 0.5)
+
+    assert asyncio.run(receive(10, 0.02)) == FRAME
+
+
+def test_stalled_frame_times_out(monkeypatch):
+    monkeypatch.setattr(TCP, "TIMEOUT", 0.05)
+    monkeypatch.setattr(TCP, "MIN_RATE", len(FRAME) / 0.05)
+
+    assert asyncio.run(receive(10, 1)) is None
+
+
+def test_abridged_header_has_one_deadline(monkeypatch):
+    monkeypatch.setattr(TCP, "TIMEOUT", 0.1)
+
+    async def main():
+        tcp = TCPAbridged(False, {})
+        tcp.reader = asyncio.StreamReader()
+
+        async def feed():
+            # Each part of the long header arrives within TIMEOUT, the whole header doesn't
+            await asyncio.sleep(0.07)
+            tcp.reader.feed_data(b"\x7f")
+            await asyncio.sleep(0.07)
+            tcp.reader.feed_data(b"\x01\x00\x00" + bytes(4))
+
+        feeder = asyncio.ensure_future(feed())
+
+        try:
+            return await tcp.recv()
+        finally:
+            feeder.cancel()
+            tcp.socket.close()
+
+    assert asyncio.run(main()) is None
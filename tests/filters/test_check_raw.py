@@ -0,0 +1,130 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from io import BytesIO
+
+import pyrogram
+from pyrogram import filters, raw, types, utils
+from pyrogram.raw.core import TLObject
+from tests.filters import Client
+
+c = Client()
+
+
+def update(text: str = "", peer=None, out: bool = False):
+    return raw.types.UpdateNewMessage(
+        message=raw.types.Message(
+            id=1,
+            peer_id=peer or raw.types.PeerUser(user_id=1),
+            date=0,
+            message=text,
+            out=out
+        ),
+        pts=0,
+        pts_count=0
+    )
+
+
+def check(f, u, chats=None) -> bool:
+    return f.check_raw(c, u, {}, chats or {})
+
+
+def test_text():
+    assert check(filters.text, update("hello"))
+    assert not check(filters.text, update(""))
+
+
+def test_outgoing():
+    assert check(filters.outgoing, update(out=True))
+    assert not check(filters.outgoing, update(out=False))
+    assert check(filters.incoming, update(out=False))
+    assert not check(filters.incoming, update(out=True))
+
+
+def test_outgoing_service_message():
+    message = TLObject.read(BytesIO(raw.types.MessageService(
+        id=1,
+        peer_id=raw.types.PeerChat(chat_id=1),
+        from_id=raw.types.PeerUser(user_id=1),
+        date=0,
+        action=raw.types.MessageActionChatEditTitle(title="title"),
+        out=True
+    ).write()))
+    users = {1: TLObject.read(BytesIO(raw.types.User(id=1, first_name="User").write()))}
+    chats = {
+        1: raw.types.Chat(id=1, title="title", photo=raw.types.ChatPhotoEmpty(), participants_count=1, date=0, version=1)
+    }
+    u = raw.types.UpdateNewMessage(message=message, pts=0, pts_count=0)
+
+    async def main():
+        client = pyrogram.Client("test", in_memory=True)
+        parsed = await types.Message._parse(client, message, users, chats, replies=0)
+
+        for f in (filters.incoming, filters.outgoing, ~filters.outgoing):
+            # The raw pre-check may only reject updates the parsed filter rejects too
+            if not f.check_raw(client, u, users, chats):
+                assert not await f(client, parsed)
+
+        assert await filters.incoming(client, parsed)
+
+    asyncio.run(main())
+
+
+def test_chat_type():
+    group = raw.types.PeerChannel(channel_id=1)
+    chats = {1: raw.types.Channel(id=1, title="", photo=raw.types.ChatPhotoEmpty(), date=0, megagroup=True)}
+
+    assert check(filters.private, update())
+    assert not check(filters.group, update())
+    assert check(filters.group, update(peer=group), chats)
+    assert not check(filters.channel, update(peer=group), chats)
+    # Unknown channels may be either
+    assert check(filters.group, update(peer=group))
+    assert check(filters.channel, update(peer=group))
+
+
+def test_chat():
+    peer = raw.types.PeerChannel(channel_id=1)
+
+    assert check(filters.chat(utils.get_channel_id(1)), update(peer=peer))
+    assert not check(filters.chat(utils.get_channel_id(2)), update(peer=peer))
+    assert check(filters.chat("username"), update(peer=peer))
+
+
+def test_command():
+    assert check(filters.command("start"), update("/start"))
+    assert not check(filters.command("start"), update("start"))
+    assert not check(filters.command("start"), update(""))
+
+
+def test_combined():
+    f = filters.text & ~filters.outgoing
+
+    assert check(f, update("hello"))
+    assert not check(f, update(""))
+    assert check(filters.text | filters.outgoing, update("", out=True))
+    assert not check(filters.text | filters.outgoing, update(""))
+
+
+def test_other_updates():
+    u = raw.types.UpdateUserStatus(user_id=1, status=raw.types.UserStatusEmpty())
+
+    assert check(filters.text, u)
+    assert check(filters.outgoing, u)
+    assert check(filters.command("start"), u)
@@ -146,3 +146,28 @@ async def test_no_text():
 
     m = Message()
     assert not await f(c, m)
+
+
+@pytest.mark.asyncio
+async def test_pattern():
+    f = filters.command(["st.rt", "help"])
+
+    m = Message("/stArt now")
+    assert await f(c, m)
+    assert m.command == ["st.rt", "now"]
+
+    m = Message("/help")
+    assert await f(c, m)
+
+    m = Message("/starting")
+    assert not await f(c, m)
+
+
+def test_route_keys():
+    assert filters.command(["Start", "help"], prefixes=["/", "!"]).route_keys() == {"/start", "/help", "!start", "!help"}
+    assert filters.command("Start", case_sensitive=True).route_keys() == {"/Start"}
+    assert filters.command("st.rt").route_keys() is None
+
+    f = filters.command("start")
+    assert filters.get_command_filter(filters.private & (f & filters.text)) is f
+    assert filters.get_command_filter(filters.private | f) is None
@@ -0,0 +1,64 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import filters
+from tests.filters import Client, Message
+
+c = Client()
+
+
+async def suspending_filter(_, __, m):
+    await asyncio.sleep(0)
+    return m.text == "/start"
+
+
+suspending = filters.create(suspending_filter)
+
+
+@pytest.mark.asyncio
+async def test_same_result():
+    trees = [
+        filters.text & filters.command("start"),
+        filters.caption | ~filters.text,
+        ~(filters.command("help") | filters.caption) & filters.text,
+        filters.text & suspending,
+        ~suspending | filters.caption,
+    ]
+
+    for f in trees:
+        compiled = filters.compile_filter(f)
+
+        for m in (Message("/start"), Message("/help"), Message("hi"), Message(caption="cap"), Message()):
+            assert bool(await compiled(c, m)) == bool(await f(c, m))
+
+
+def test_classify():
+    assert filters.compile_node(filters.text & ~filters.command("start"))[0]
+    assert not filters.compile_node(filters.text & suspending)[0]
+    assert not filters.compile_node(filters.create(lambda _, __, m: True))[0]
+
+
+def test_flatten():
+    a, b, c_, d = filters.text, filters.caption, filters.me, filters.bot
+
+    assert filters.flatten(a & b & (c_ & d), filters.AndFilter) == [a, b, c_, d]
+    assert filters.flatten(a | (b & c_), filters.OrFilter)[0] is a
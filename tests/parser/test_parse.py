@@ -0,0 +1,87 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram import enums, raw
+from pyrogram.parser import Parser
+from pyrogram.parser.markdown import Markdown
+
+parser = Parser(None)
+
+
+@pytest.mark.asyncio
+async def test_html_parse_nested():
+    result = await parser.parse("<b>bold 😀 <i>italic</i></b> &amp; <u>under</u>", enums.ParseMode.HTML)
+
+    assert result["message"] == "bold 😀 italic & under"
+    assert result["entities"] == [
+        raw.types.MessageEntityBold(offset=0, length=14),
+        raw.types.MessageEntityItalic(offset=8, length=6),
+        raw.types.MessageEntityUnderline(offset=17, length=5),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_markdown_parse():
+    result = await parser.parse("**bold __italic__** [link](https://pyrogram.org) `code **not bold**`")
+
+    assert result["message"] == "bold italic link code **not bold**"
+    assert result["entities"] == [
+        raw.types.MessageEntityBold(offset=0, length=11),
+        raw.types.MessageEntityItalic(offset=5, length=6),
+        raw.types.MessageEntityTextUrl(offset=12, length=4, url="https://pyrogram.org"),
+        raw.types.MessageEntityCode(offset=17, length=17),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_markdown_parse_pre():
+    result = await parser.parse("```python\nprint(1)\n```")
+
+    assert result["message"] == "print(1)"
+    assert result["entities"] == [raw.types.MessageEntityPre(offset=0, length=8, language="python")]
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Unclosed delimiters open a tag that is never closed
+    ("**bold", "<b>bold"),
+    ("`code", "<code>code"),
+    ("`code **not bold", "<code>code **not bold"),
+    # Overlapping delimiters are closed in the order they appear, not nested
+    ("**a __b** c__", "<b>a <i>b</b> c</i>"),
+    ("~~a ||b~~ c", "<s>a <spoiler>b</s> c"),
+    # Delimiters inside a code span stay literal, the same delimiter after the span is converted
+    ("`||`||", "<code>||</code><spoiler>"),
+    ("b--`--`--", "b<u><code>--</code></u>"),
+    # The pre language is the rest of the opening line, taken literally
+    ("```c`\nx```", '<pre language="c`">\nx</pre>'),
+    ("``````py\nx```", '<pre language="```py">\nx</pre>'),
+])
+def test_markdown_to_html_malformed(text, expected):
+    assert Markdown.to_html(text) == expected
+
+
+@pytest.mark.asyncio
+async def test_parse_cached_copy():
+    first = await parser.parse("<b>bold</b>", enums.ParseMode.HTML)
+    first["entities"][0].length = 1
+
+    second = await parser.parse("<b>bold</b>", enums.ParseMode.HTML)
+
+    assert second["entities"] == [raw.types.MessageEntityBold(offset=0, length=4)]
@@ -0,0 +1,78 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from io import BytesIO
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.raw.core import TLObject
+from pyrogram.raw.core.primitives import Int, Long, Int128, Int256, Vector
+
+
+def read(data: bytes) -> TLObject:
+    return TLObject.read(BytesIO(data))
+
+
+@pytest.mark.parametrize("t, values", [
+    (Int, [0, 1, -1, 2 ** 31 - 1, -2 ** 31]),
+    (Long, [0, -1, 2 ** 63 - 1, -2 ** 63]),
+    (Int128, [0, -1, 2 ** 127 - 1]),
+    (Int256, [0, -2 ** 255, 12345]),
+    (Int, [])
+])
+def test_vector_of_ints(t, values):
+    data = Vector(values, t)
+
+    assert data == b"".join([Int(Vector.ID, False), Int(len(values))] + [t(value) for value in values])
+    assert Vector.read(BytesIO(data[4:]), t) == values
+
+
+def test_fixed_width_fields():
+    peer = raw.types.InputPeerUser(user_id=123456789, access_hash=-987654321987654321)
+    data = peer.write()
+
+    assert data == Int(peer.ID, False) + Long(123456789) + Long(-987654321987654321)
+    assert read(data) == peer
+
+
+def test_flags_and_bools():
+    update = raw.types.UpdateReadChannelInbox(channel_id=1, max_id=2, still_unread_count=3, pts=4, folder_id=5)
+    assert read(update.write()) == update
+
+    settings = raw.types.InputPeerNotifySettings(silent=False, show_previews=True, mute_until=10)
+    parsed = read(settings.write())
+
+    assert parsed.silent is False
+    assert parsed.show_previews is True
+    assert parsed.mute_until == 10
+
+
+def test_empty_optional_vector_roundtrip():
+    message = raw.types.Message(
+        id=1,
+        peer_id=raw.types.PeerUser(user_id=1),
+        date=0,
+        message="hello",
+        reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=1),
+        replies=raw.types.MessageReplies(replies=0, replies_pts=0)
+    )
+    parsed = read(message.write())
+
+    assert parsed.entities == []
+    assert read(parsed.write()).write() == parsed.write()
@@ -0,0 +1,64 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from pyrogram.session import session
+from pyrogram.session.session import Session
+
+
+class FakeConnection:
+    def __init__(self, packets):
+        self.packets = list(packets)
+
+    async def recv(self):
+        return self.packets.pop(0) if self.packets else None
+
+
+def test_packets_are_handled_in_receive_order(monkeypatch):
+    # Big packets are decrypted in the executor, the first ones slower than the next ones
+    packets = [bytes(8192 - i) for i in range(4)] + [bytes(16), bytes(8192), bytes(16)] * 3
+
+    def unpack(packet, *args):
+        if len(packet) > 4096:
+            time.sleep((len(packet) - 8180) / 1000)
+
+        return packet
+
+    monkeypatch.setattr(session.mtproto, "unpack", unpack)
+
+    async def main():
+        s = Session(None, 2, bytes(256), False)
+        s.crypto_executor = ThreadPoolExecutor(4)
+        s.connection = FakeConnection(packets)
+
+        handled = []
+        s.handle_messages = handled.append
+
+        await s.network_worker()
+
+        while len(handled) < len(packets):
+            await asyncio.sleep(0.01)
+
+        s.crypto_executor.shutdown()
+
+        return handled
+
+    assert asyncio.run(main()) == packets
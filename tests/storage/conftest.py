@@ -0,0 +1,46 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from pyrogram.storage import MemoryStorage
+
+
+class CountingStorage(MemoryStorage):
+    """In-memory storage recording the rows written by update_peers and update_states, and the peers read by id."""
+
+    def __init__(self):
+        super().__init__("test")
+        self.writes = []
+        self.reads = 0
+
+    async def update_peers(self, peers):
+        self.writes.append(peers)
+        await super().update_peers(peers)
+
+    async def update_states(self, values):
+        self.writes.append(values)
+        await super().update_states(values)
+
+    async def get_peer_by_id(self, peer_id):
+        self.reads += 1
+        return await super().get_peer_by_id(peer_id)
+
+
+async def open_storage() -> CountingStorage:
+    storage = CountingStorage()
+    await storage.open()
+    return storage
@@ -0,0 +1,64 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import sqlite3
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from pyrogram.storage.aio_sqlite_storage import AioSQLiteStorage, SCHEMA
+
+# Schema before auth_keys was added
+OLD_SCHEMA = SCHEMA.replace("""
+CREATE TABLE auth_keys
+(
+    dc_id    INTEGER PRIMARY KEY,
+    auth_key BLOB
+);
+""", "")
+
+
+@pytest.mark.parametrize("version", [5, 6, 9, 13])
+def test_reopened_session_has_auth_keys(tmp_path, version):
+    # Opening a file used to add 4 to its version even when no step ran
+    path = tmp_path / "test.session"
+
+    with sqlite3.connect(str(path)) as conn:
+        conn.executescript(OLD_SCHEMA)
+        conn.execute("INSERT INTO version VALUES (?)", (version,))
+        conn.execute("INSERT INTO sessions VALUES (2, NULL, NULL, NULL, 0, NULL, NULL)")
+
+    conn.close()
+
+    async def main():
+        storage = AioSQLiteStorage(str(path))
+        await storage.open()
+
+        try:
+            assert await storage.dc_auth_key(4) is None
+
+            await storage.dc_auth_key(4, bytes(256))
+
+            assert await storage.dc_auth_key(4) == bytes(256)
+            assert await storage.version() == AioSQLiteStorage.VERSION
+        finally:
+            await storage.close()
+
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.storage.peer_cache import PeerCache
+from .conftest import open_storage
+
+
+@pytest.mark.asyncio
+async def test_skips_unchanged_peers():
+    storage = await open_storage()
+    cache = PeerCache(storage, 100)
+
+    cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "bot", None, None)])
+    cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "bot", None, None)])
+    cache.update_peers([(1, 11, "user", ["one"], None)])
+    await cache.flush()
+
+    assert storage.writes == [[(1, 11, "user", ["one"], None), (2, 20, "bot", None, None)]]
+
+    cache.update_peers([(1, 11, "user", ["one"], None)])
+    await cache.flush()
+
+    assert len(storage.writes) == 1
+
+    await cache.stop()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_rewrites_stale_usernames(monkeypatch):
+    storage = await open_storage()
+    cache = PeerCache(storage, 100)
+    now = 1700000000
+
+    monkeypatch.setattr("pyrogram.storage.peer_cache.time.time", lambda: now)
+
+    cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "bot", None, None)])
+    await cache.flush()
+
+    now += PeerCache.REWRITE_INTERVAL - 1
+    cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "bot", None, None)])
+    await cache.flush()
+
+    assert len(storage.writes) == 1
+
+    # Written again so that the storage keeps resolving the username after a restart, peers without one are not
+    now += 1
+    cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "bot", None, None)])
+    cache.update_peers([(1, 10, "user", ["one"], None)])
+    await cache.flush()
+
+    assert storage.writes[1:] == [[(1, 10, "user", ["one"], None)]]
+
+    await cache.stop()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_lookups():
+    storage = await open_storage()
+    cache = PeerCache(storage, 100)
+
+    cache.update_peers([(1, 10, "user", ["one"], "123"), (-1000000000002, 20, "supergroup", ["group"], None)])
+
+    assert await cache.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await cache.get_peer_by_username("group") == raw.types.InputPeerChannel(channel_id=2, access_hash=20)
+    assert await cache.get_peer_by_phone_number("123") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    with pytest.raises(KeyError):
+        await cache.get_peer_by_id("one")
+
+    cache.update_peers([(1, 10, "user", ["uno"], "123")])
+
+    with pytest.raises(KeyError):
+        await cache.get_peer_by_username("one")
+
+    assert await cache.get_peer_by_username("uno") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert storage.reads == 0
+
+    await cache.stop()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    storage = await open_storage()
+    cache = PeerCache(storage, 2)
+
+    cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "user", ["two"], None)])
+    await cache.get_peer_by_id(1)
+    cache.update_peers([(3, 30, "user", ["three"], None)])
+
+    assert list(cache.peers) == [1, 3]
+    assert "two" not in cache.usernames
+
+    # Evicted before being written, still served from the pending rows
+    assert await cache.get_peer_by_id(2) == raw.types.InputPeerUser(user_id=2, access_hash=20)
+    assert storage.reads == 0
+
+    await cache.flush()
+
+    assert await cache.get_peer_by_id(2) == raw.types.InputPeerUser(user_id=2, access_hash=20)
+    assert storage.reads == 1
+    assert list(cache.peers) == [3, 2]
+
+    await cache.stop()
+    await storage.close()
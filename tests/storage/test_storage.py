@@ -0,0 +1,34 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+from pyrogram.storage import Storage
+
+
+def test_dc_auth_key_is_optional():
+    async def method(*args):
+        pass
+
+    # A storage engine written before dc_auth_key existed, implementing the abstract methods only
+    OldStorage = type("OldStorage", (Storage,), {name: method for name in Storage.__abstractmethods__ - {"dc_auth_key"}})
+    storage = OldStorage("test")
+
+    assert asyncio.run(storage.dc_auth_key(4)) is None
+    assert asyncio.run(storage.dc_auth_key(4, b"key")) is None
@@ -0,0 +1,77 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram.storage.update_state_tracker import UpdateStateTracker
+from .conftest import open_storage
+
+
+@pytest.mark.asyncio
+async def test_coalesces_states():
+    storage = await open_storage()
+    tracker = UpdateStateTracker(storage)
+
+    for pts in range(1, 11):
+        tracker.set((-1001, pts, None, pts, None))
+        tracker.set((0, pts, None, pts, 1))
+
+    assert await storage.update_state() == []
+
+    await tracker.stop()
+
+    assert storage.writes == [[(-1001, 10, None, 10, None), (0, 10, None, 10, 1)]]
+    assert sorted(await storage.update_state()) == [(-1001, 10, None, 10, None), (0, 10, None, 10, 1)]
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_threshold():
+    storage = await open_storage()
+    tracker = UpdateStateTracker(storage)
+    tracker.FLUSH_INTERVAL = 60
+    tracker.FLUSH_THRESHOLD = 5
+
+    for pts in range(1, 6):
+        tracker.set((0, pts, None, pts, None))
+
+    await asyncio.sleep(0.1)
+
+    assert await storage.update_state() == [(0, 5, None, 5, None)]
+
+    await tracker.stop()
+
+    assert len(storage.writes) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_and_delete():
+    storage = await open_storage()
+    tracker = UpdateStateTracker(storage)
+    tracker.FLUSH_INTERVAL = 60
+
+    tracker.set((-1001, 3, None, 3, None))
+
+    assert await tracker.get() == [(-1001, 3, None, 3, None)]
+
+    tracker.set((-1001, 4, None, 4, None))
+    await tracker.delete(-1001)
+    await tracker.stop()
+
+    assert await storage.update_state() == []
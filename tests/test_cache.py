@@ -0,0 +1,132 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from io import BytesIO
+
+from pyrogram import Client, raw, types
+from pyrogram.client import Cache
+from pyrogram.raw.core import TLObject
+
+
+def test_evicts_least_recently_used():
+    cache = Cache(3)
+
+    for i in range(3):
+        cache[i] = str(i)
+
+    assert cache[0] == "0"
+
+    cache[3] = "3"
+
+    assert cache[1] is None
+    assert list(cache.store) == [2, 0, 3]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+
+def test_replace_does_not_evict():
+    cache = Cache(2)
+    cache[0] = "a"
+    cache[1] = "b"
+    cache[0] = "c"
+
+    assert list(cache.store.items()) == [(1, "b"), (0, "c")]
+    assert cache.evictions == 0
+
+
+def test_group_size():
+    cache = Cache(10, max_group_size=2)
+
+    cache[(1, 1)] = "a"
+    cache[(2, 1)] = "b"
+    cache[(1, 2)] = "c"
+    cache[(1, 1)]
+    cache[(1, 3)] = "d"
+
+    assert list(cache.store) == [(2, 1), (1, 1), (1, 3)]
+    assert list(cache.groups[1]) == [(1, 1), (1, 3)]
+
+
+def test_max_bytes():
+    cache = Cache(10, max_bytes=10)
+
+    cache["a"] = b"1234"
+    cache["b"] = b"1234"
+    cache["c"] = b"12345"
+
+    assert list(cache.store) == ["b", "c"]
+    assert cache.bytes == 9
+
+    # Larger than the whole budget, not kept
+    cache["d"] = b"12345678901"
+
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+
+def test_packed_entries():
+    async def unpack(data: bytes) -> str:
+        return data.decode()
+
+    cache = Cache(10, unpack=unpack)
+    cache["a"] = b"packed"
+
+    assert cache["a"] is None
+    assert asyncio.run(cache.get("a")) == "packed"
+    assert asyncio.run(cache.get("b")) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_unpack_failure_is_a_miss():
+    async def unpack(data: bytes):
+        raise KeyError(7)
+
+    cache = Cache(10, unpack=unpack)
+    cache["a"] = b"packed"
+
+    assert asyncio.run(cache.get("a")) is None
+    assert "a" not in cache
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 1, 1)
+
+
+def test_compact_message_cache():
+    async def main():
+        client = Client("test", in_memory=True, compact_message_cache=True)
+        # Through the wire format, like real responses, so that optional vectors are filled in
+        users = {
+            i: TLObject.read(BytesIO(raw.types.User(id=i, access_hash=i, first_name=f"User {i}").write()))
+            for i in (1, 7)
+        }
+        message = raw.types.MessageService(
+            id=1,
+            peer_id=raw.types.PeerUser(user_id=1),
+            from_id=raw.types.PeerUser(user_id=1),
+            date=1700000000,
+            # auto_setting_from is looked up in users without being named like an user id
+            action=raw.types.MessageActionSetMessagesTTL(period=86400, auto_setting_from=7)
+        )
+
+        parsed = await types.Message._parse(client, message, users, {}, replies=0, resolve_replies=False)
+        cached = await client.message_cache.get((parsed.chat.id, parsed.id))
+
+        assert isinstance(client.message_cache.store[(parsed.chat.id, parsed.id)], bytes)
+        assert cached.id == parsed.id
+        assert cached.from_user.id == 1
+        assert cached.message_auto_delete_timer_changed.from_user.id == 7
+
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+from pyrogram import Client
+
+
+class FakeSession:
+    async def stop(self):
+        pass
+
+
+def test_disconnect_ends_crypto_threads():
+    async def main():
+        client = Client("test", in_memory=True)
+        await client.storage.open()
+        client.session = FakeSession()
+        client.is_connected = True
+
+        executor = client.crypto_executor
+        await client.loop.run_in_executor(executor, lambda: None)
+        threads = set(executor._threads)
+
+        await client.disconnect()
+
+        assert threads and not any(t.is_alive() for t in threads)
+        assert client.crypto_executor is not executor
+        assert not client.crypto_executor._threads
+
+        client.crypto_executor.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from io import BytesIO
+
+from pyrogram import Client, filters, raw
+from pyrogram.handlers import MessageHandler
+from pyrogram.raw.core import TLObject
+
+CHANNEL_ID = 1234567890
+USER_ID = 777000
+
+
+def wire(obj: "raw.core.TLObject") -> "raw.core.TLObject":
+    return TLObject.read(BytesIO(obj.write()))
+
+
+def update(message_id: int) -> tuple:
+    message = wire(raw.types.Message(
+        id=message_id,
+        peer_id=raw.types.PeerChannel(channel_id=CHANNEL_ID),
+        from_id=raw.types.PeerUser(user_id=USER_ID),
+        date=0,
+        message="hello"
+    ))
+    users = {USER_ID: wire(raw.types.User(id=USER_ID, access_hash=1, first_name="User"))}
+    chats = {
+        CHANNEL_ID: wire(raw.types.Channel(
+            id=CHANNEL_ID, title="Group", photo=raw.types.ChatPhotoEmpty(), date=0, access_hash=1, megagroup=True
+        ))
+    }
+
+    return raw.types.UpdateNewChannelMessage(message=message, pts=0, pts_count=0), users, chats
+
+
+def test_unparsed_messages_are_cached():
+    async def main():
+        client = Client("test", in_memory=True)
+        # Rejects every message before parsing
+        client.dispatcher.add_handler(MessageHandler(lambda *_: None, filters.outgoing), 0)
+
+        await client.dispatcher.handle_update(update(1))
+
+        client.dispatcher.remove_handler(client.dispatcher.groups[0][0], 0)
+
+        await client.dispatcher.handle_update(update(2))
+
+        for message_id in (1, 2):
+            key = (-1000000000000 - CHANNEL_ID, message_id)
+
+            assert isinstance(client.message_cache.store[key], bytes)
+            assert (await client.message_cache.get(key)).text == "hello"
+
+        client.crypto_executor.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import errno
+import gzip
+from concurrent.futures.thread import ThreadPoolExecutor
+
+import pytest
+
+from pyrogram import file_io
+from pyrogram.file_io import FileReader, FileWriter
+
+CHUNK = 4
+
+
+def write_chunks(path, chunks: int) -> FileWriter:
+    async def main():
+        with open(path, "wb") as f, ThreadPoolExecutor(2) as executor:
+            writer = FileWriter(f, executor)
+
+            try:
+                for i in range(chunks):
+                    await writer.write(bytes([i]) * CHUNK, i * CHUNK)
+
+                await writer.flush()
+            except OSError:
+                await writer.flush()
+
+            return writer
+
+    return asyncio.run(main())
+
+
+def test_written(tmp_path):
+    writer = write_chunks(tmp_path / "file", 10)
+
+    assert writer.written == 10 * CHUNK
+    assert not writer.failed
+    assert (tmp_path / "file").read_bytes() == b"".join(bytes([i]) * CHUNK for i in range(10))
+
+
+@pytest.mark.parametrize("fail_at", [0, 3, 9])
+def test_written_stops_at_failed_write(tmp_path, monkeypatch, fail_at):
+    pwrite = file_io.pwrite
+
+    def failing_pwrite(fd, data, offset):
+        if offset == fail_at * CHUNK:
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        pwrite(fd, data, offset)
+
+    monkeypatch.setattr(file_io, "pwrite", failing_pwrite)
+
+    writer = write_chunks(tmp_path / "file", 10)
+
+    assert writer.failed
+    assert writer.written <= fail_at * CHUNK
+
+
+def test_compressed_file_is_read_decompressed(tmp_path):
+    data = bytes(range(256)) * 1000
+
+    with gzip.open(tmp_path / "file.gz", "wb") as f:
+        f.write(data)
+
+    async def main():
+        with gzip.open(tmp_path / "file.gz", "rb") as f, ThreadPoolExecutor(2) as executor:
+            # fileno() is the one of the compressed file, which pread would read
+            assert file_io.get_fileno(f) is None
+
+            reader = FileReader(f, 4096, 0, executor)
+            chunks = []
+
+            while True:
+                chunk = await reader.read()
+
+                if not chunk:
+                    break
+
+                chunks.append(chunk)
+
+            await reader.close()
+
+            return b"".join(chunks)
+
+    assert asyncio.run(main()) == data
+
+
+def test_plain_file_uses_pread(tmp_path):
+    (tmp_path / "file").write_bytes(b"data")
+
+    with open(tmp_path / "file", "rb") as f:
+        assert file_io.get_fileno(f) == f.fileno()
+
+    with open(tmp_path / "file", "rb", buffering=0) as f:
+        assert file_io.get_fileno(f) == f.fileno()
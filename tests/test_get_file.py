@@ -0,0 +1,164 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+from hashlib import sha256
+
+import pytest
+
+from pyrogram import Client, raw
+from pyrogram.crypto import aes
+from pyrogram.file_id import FileId, FileType
+
+CHUNK_SIZE = 1024
+HASH_SIZE = 256
+# GetCdnFileHashes answers with the hashes of one chunk at most
+WINDOW = CHUNK_SIZE // HASH_SIZE
+KEY = bytes(range(32))
+IV = bytes(16)
+
+
+class FakeCdn:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.hash_offsets = []
+
+    def encrypt(self, offset: int) -> bytes:
+        chunk = self.data[offset:offset + CHUNK_SIZE]
+
+        return aes.ctr256_decrypt(chunk, KEY, bytearray(IV[:-4] + (offset // 16).to_bytes(4, "big")))
+
+    def hashes(self, offset: int) -> list:
+        return [
+            raw.types.FileHash(
+                offset=i,
+                limit=len(self.data[i:i + HASH_SIZE]),
+                hash=sha256(self.data[i:i + HASH_SIZE]).digest()
+            )
+            for i in range(offset, min(offset + WINDOW * HASH_SIZE, len(self.data)), HASH_SIZE)
+        ]
+
+
+class FakeSession:
+    def __init__(self, cdn: FakeCdn):
+        self.cdn = cdn
+
+    async def invoke(self, query, *args, **kwargs):
+        if isinstance(query, raw.functions.upload.GetFile):
+            return raw.types.upload.FileCdnRedirect(
+                dc_id=203, file_token=b"token", encryption_key=KEY, encryption_iv=IV, file_hashes=[]
+            )
+
+        if isinstance(query, raw.functions.upload.GetCdnFileHashes):
+            self.cdn.hash_offsets.append(query.offset)
+            return self.cdn.hashes(query.offset)
+
+        if isinstance(query, raw.functions.upload.GetCdnFile):
+            return raw.types.upload.CdnFile(bytes=self.cdn.encrypt(query.offset))
+
+        raise AssertionError(query)
+
+
+class FakePool:
+    def __init__(self, session: FakeSession):
+        self.session = session
+
+    async def acquire(self, count: int) -> list:
+        return [self.session]
+
+    def release(self):
+        pass
+
+
+# The last chunk starts on a hash window boundary and the file ends within it
+@pytest.mark.parametrize("file_size", [
+    CHUNK_SIZE + HASH_SIZE,
+    CHUNK_SIZE + 100,
+    2 * CHUNK_SIZE,
+    2 * CHUNK_SIZE + 3 * HASH_SIZE + 1
+])
+def test_cdn_hashes_within_file(file_size):
+    cdn = FakeCdn(os.urandom(file_size))
+
+    async def main():
+        client = Client("test", in_memory=True)
+        client.DOWNLOAD_CHUNK_SIZE = CHUNK_SIZE
+        client.media_sessions[2] = FakeSession(cdn)
+        client.cdn_pools[203] = FakePool(FakeSession(cdn))
+
+        file_id = FileId(file_type=FileType.DOCUMENT, dc_id=2, media_id=0, access_hash=0, file_reference=b"")
+
+        try:
+            return b"".join([chunk async for chunk in client.get_file(file_id, file_size)])
+        finally:
+            client.crypto_executor.shutdown()
+
+    assert asyncio.run(main()) == cdn.data
+    assert all(offset < file_size for offset in cdn.hash_offsets), cdn.hash_offsets
+
+
+def test_download_resumes_only_to_the_same_path(tmp_path):
+    data = os.urandom(4 * CHUNK_SIZE)
+    offsets = []
+
+    async def get_file(file_id, file_size, limit, offset, *args):
+        offsets.append(offset)
+
+        for i in range(offset, len(data) // CHUNK_SIZE):
+            if fail and i == 2:
+                raise ConnectionError
+
+            yield data[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE]
+
+    async def download(file_name: str):
+        return await client.handle_download(
+            (file_id, str(tmp_path), file_name, False, len(data), None, (), None, None)
+        )
+
+    async def main():
+        nonlocal client, fail
+        client = Client("test", in_memory=True)
+        client.DOWNLOAD_CHUNK_SIZE = CHUNK_SIZE
+        client.DOWNLOAD_STATE_INTERVAL = 1
+        client.get_file = get_file
+
+        try:
+            fail = True
+            assert await download("first") is None
+
+            fail = False
+            second = await download("second")
+            first = await download("first")
+        finally:
+            client.crypto_executor.shutdown()
+            client.file_io_executor.shutdown()
+
+        return first, second
+
+    client = fail = None
+    file_id = FileId(file_type=FileType.DOCUMENT, dc_id=2, media_id=1, access_hash=0, file_reference=b"")
+
+    first, second = asyncio.run(main())
+
+    assert second == str(tmp_path / "second")
+    assert first == str(tmp_path / "first")
+    # Only the download to the interrupted path resumes
+    assert offsets == [0, 0, 2]
+    assert (tmp_path / "first").read_bytes() == (tmp_path / "second").read_bytes() == data
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["first", "second"]
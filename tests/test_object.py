@@ -0,0 +1,73 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+from datetime import datetime
+
+from pyrogram import types
+
+
+def test_unset_fields_are_not_stored():
+    message = types.Message(id=1, text="hello")
+
+    assert message.__dict__ == {"id": 1, "text": "hello"}
+    assert message.caption is None
+    assert message.reply_to_message is None
+
+    message.caption = None
+
+    assert "caption" in message.__dict__
+
+
+def test_eq():
+    assert types.Message(id=1, text="hello") == types.Message(id=1, text="hello")
+    assert types.Message(id=1) != types.Message(id=1, text="hello")
+    assert types.Message(id=1, text="hello") != types.Message(id=1)
+
+    message = types.Message(id=1)
+    message.text = None
+
+    assert message == types.Message(id=1)
+
+
+def test_repr_and_str_skip_unset_fields():
+    user = types.User(id=1, first_name="User")
+
+    assert repr(user) == "pyrogram.types.User(id=1, first_name='User')"
+    assert eval(repr(user), {"pyrogram": __import__("pyrogram")}) == user
+    assert '"last_name"' not in str(user)
+
+
+def test_bind():
+    message = types.Message(id=1, from_user=types.User(id=1))
+    client = object()
+
+    message.bind(client)
+
+    assert message._client is client
+    assert message.from_user._client is client
+
+
+def test_pickle():
+    message = types.Message(id=1, date=datetime.fromtimestamp(1700000000), from_user=types.User(id=1))
+    message = pickle.loads(pickle.dumps(message))
+
+    assert message.date == datetime.fromtimestamp(1700000000)
+    assert message.from_user == types.User(id=1)
+    assert message.text is None
+    assert message._client is None
@@ -0,0 +1,164 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from io import BytesIO
+
+from pyrogram import Client, enums, raw, types, utils
+from pyrogram.raw.core import TLObject
+
+CHANNEL_ID = 1234567890
+OTHER_CHANNEL_ID = 1234567891
+USER_ID = 777000
+
+
+def wire(obj: "raw.core.TLObject") -> "raw.core.TLObject":
+    # Go through the wire format, like real responses do, so that optional vectors are filled in
+    return TLObject.read(BytesIO(obj.write()))
+
+
+USERS = {USER_ID: wire(raw.types.User(id=USER_ID, access_hash=1, first_name="User"))}
+CHATS = {
+    i: wire(raw.types.Channel(
+        id=i, title="Group", photo=raw.types.ChatPhotoEmpty(), date=0, access_hash=1, megagroup=True
+    ))
+    for i in (CHANNEL_ID, OTHER_CHANNEL_ID)
+}
+
+
+def message(message_id: int, reply_to_msg_id: int = None, channel_id: int = CHANNEL_ID, **kwargs) -> raw.types.Message:
+    return wire(raw.types.Message(
+        id=message_id,
+        peer_id=raw.types.PeerChannel(channel_id=channel_id),
+        from_id=raw.types.PeerUser(user_id=USER_ID),
+        date=message_id,
+        message=f"message {message_id}",
+        reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=reply_to_msg_id, **kwargs) if reply_to_msg_id else None
+    ))
+
+
+class Server:
+    """Answers get_messages(reply_to_message_ids=...) with the messages the ids reply to."""
+
+    def __init__(self, client: Client, targets: dict):
+        # message id -> raw message it replies to, None if it was deleted
+        self.targets = targets
+        self.requests = []
+
+        async def get_messages(chat_id, reply_to_message_ids, replies):
+            self.requests.append((chat_id, list(reply_to_message_ids)))
+            await asyncio.sleep(0)
+
+            return [
+                await types.Message._parse(client, target, USERS, CHATS, replies=0, cache=False)
+                if target is not None
+                else await types.Message._parse(
+                    client,
+                    raw.types.MessageEmpty(id=0, peer_id=raw.types.PeerChannel(channel_id=CHANNEL_ID)),
+                    USERS,
+                    CHATS
+                )
+                for target in (self.targets[i] for i in reply_to_message_ids)
+            ]
+
+        client.get_messages = get_messages
+
+
+def parse(client: Client, raw_message: "raw.base.Message") -> "types.Message":
+    return types.Message._parse(client, raw_message, USERS, CHATS, replies=1)
+
+
+def test_cached_reply_is_not_fetched():
+    async def main():
+        client = Client("test", in_memory=True)
+        server = Server(client, {})
+
+        replied = await parse(client, message(1))
+        reply = await parse(client, message(2, 1))
+
+        assert server.requests == []
+        assert reply.reply_to_message.id == replied.id == 1
+
+    asyncio.run(main())
+
+
+def test_reply_in_other_chat():
+    async def main():
+        client = Client("test", in_memory=True)
+        server = Server(client, {2: message(1, channel_id=OTHER_CHANNEL_ID)})
+
+        reply = await parse(
+            client, message(2, 1, reply_to_peer_id=raw.types.PeerChannel(channel_id=OTHER_CHANNEL_ID))
+        )
+
+        assert server.requests == [(utils.get_channel_id(CHANNEL_ID), [2])]
+        assert reply.reply_to_message.chat.id == utils.get_channel_id(OTHER_CHANNEL_ID)
+        assert reply.reply_to_message.id == 1
+
+    asyncio.run(main())
+
+
+def test_pinned_message():
+    async def main():
+        client = Client("test", in_memory=True)
+        server = Server(client, {2: message(1)})
+
+        pin = await parse(client, wire(raw.types.MessageService(
+            id=2,
+            peer_id=raw.types.PeerChannel(channel_id=CHANNEL_ID),
+            from_id=raw.types.PeerUser(user_id=USER_ID),
+            date=2,
+            action=raw.types.MessageActionPinMessage(),
+            reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=1)
+        )))
+
+        assert server.requests == [(utils.get_channel_id(CHANNEL_ID), [2])]
+        assert pin.service == enums.MessageServiceType.PINNED_MESSAGE
+        assert pin.pinned_message.id == 1
+        assert pin.reply_to_message is None
+
+    asyncio.run(main())
+
+
+def test_deleted_reply():
+    async def main():
+        client = Client("test", in_memory=True)
+        Server(client, {2: None})
+
+        reply = await parse(client, message(2, 1))
+
+        assert reply.reply_to_message_id == 1
+        assert reply.reply_to_message is None
+
+    asyncio.run(main())
+
+
+def test_concurrent_parses_share_requests():
+    async def main():
+        count = 2 * utils.GET_MESSAGES_LIMIT + 50
+        client = Client("test", in_memory=True)
+        server = Server(client, {i: message(i - count) for i in range(count + 1, 2 * count + 1)})
+
+        replies = await asyncio.gather(*[parse(client, message(i, i - count)) for i in range(count + 1, 2 * count + 1)])
+
+        assert [len(ids) for _, ids in server.requests] == [utils.GET_MESSAGES_LIMIT, utils.GET_MESSAGES_LIMIT, 50]
+        assert sorted(i for _, ids in server.requests for i in ids) == list(range(count + 1, 2 * count + 1))
+        assert [m.reply_to_message.id for m in replies] == list(range(1, count + 1))
+        assert client.reply_message_batches == {}
+
+    asyncio.run(main())